@@ -1,9 +1,16 @@
 from django.contrib import admin
 
 from django.contrib import admin
-from .models import InterviewSession, InterviewQuestion, UserAnswer
+from .models import InterviewSession, InterviewQuestion, QuestionBankEntry, UserAnswer
 
 admin.site.register(InterviewSession)
 admin.site.register(InterviewQuestion)
 admin.site.register(UserAnswer)
 
+
+
+@admin.register(QuestionBankEntry)
+class QuestionBankEntryAdmin(admin.ModelAdmin):
+    list_display = ('job_role', 'session_type', 'difficulty_level', 'question_text', 'times_used', 'last_used_at')
+    list_filter = ('job_role', 'session_type', 'difficulty_level')
+    search_fields = ('question_text',)
@@ -0,0 +1,147 @@
+"""
+The interview question bank.
+
+Every question generated by the LLM is kept as a QuestionBankEntry for its
+job role, session type and difficulty, and ``generate_question`` draws from
+the bank before asking the LLM. Draws favour the least used entries and
+never repeat a question within a session. ``fill`` (the
+``fill_question_bank`` command) tops up every combination offered by
+InterviewSetupForm ahead of time, so that interviews normally start and run
+without waiting for question generation at all. Combinations are filled
+in parallel, but the questions of one combination are generated one after
+another, each steered away from those generated before it.
+"""
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.db.models import Count, F
+from django.utils import timezone
+
+from . import generation
+from .forms import InterviewSetupForm
+from .models import InterviewSession, QuestionBankEntry
+
+logger = logging.getLogger(__name__)
+
+# Draw at random among this many of the least used candidates.
+DRAW_POOL = 5
+# Previous questions shown to the LLM when filling, to steer it away from them.
+FILL_AVOID = 15
+
+
+def draw(session, difficulty):
+    """
+    Take a bank entry for ``session`` at ``difficulty`` that the session has
+    not used yet and count the use, or return None if there is none.
+    """
+    used = session.questions.exclude(bank_entry=None).values('bank_entry_id')
+    candidates = list(
+        QuestionBankEntry.objects.filter(
+            job_role=session.job_role, session_type=session.session_type, difficulty_level=difficulty,
+        ).exclude(pk__in=used).order_by('times_used').values_list('pk', flat=True)[:DRAW_POOL]
+    )
+    if not candidates:
+        return None
+    entry = QuestionBankEntry.objects.get(pk=random.choice(candidates))
+    record_use(entry)
+    return entry
+
+
+def record_use(entry):
+    entry.last_used_at = timezone.now()
+    QuestionBankEntry.objects.filter(pk=entry.pk).update(times_used=F('times_used') + 1, last_used_at=entry.last_used_at)
+    entry.times_used += 1
+
+
+def add(job_role, session_type, generated):
+    """Store a ``generation.generate`` result; returns ``(entry, created)``."""
+    return QuestionBankEntry.objects.get_or_create(
+        job_role=job_role, session_type=session_type, difficulty_level=generated['difficulty'],
+        question_text=generated['question'], defaults={'ai_hint': generated['hint']},
+    )
+
+
+def combinations():
+    """Every (job role, session type, difficulty) an interview can ask for."""
+    return [
+        (job_role, session_type, difficulty)
+        for job_role, _ in InterviewSetupForm.JOB_ROLE_CHOICES
+        for session_type, _ in InterviewSetupForm.SESSION_TYPE_CHOICES
+        for difficulty in generation.DIFFICULTIES
+    ]
+
+
+def shortfall(per_combination):
+    """``{(job role, session type, difficulty): entries missing}`` to reach ``per_combination`` each."""
+    counts = {
+        (row['job_role'], row['session_type'], row['difficulty_level']): row['n']
+        for row in QuestionBankEntry.objects.values('job_role', 'session_type', 'difficulty_level')
+        .annotate(n=Count('id')).order_by()
+    }
+    missing = {}
+    for combination in combinations():
+        n = per_combination - counts.get(combination, 0)
+        if n > 0:
+            missing[combination] = n
+    return missing
+
+
+def _generate(client, combination, avoid):
+    job_role, session_type, difficulty = combination
+    session = InterviewSession(job_role=job_role, session_type=session_type)
+    generated = generation.generate(client, session, generation.question_number_for(difficulty), avoid, difficulty)
+    # File it under the difficulty that was asked for, whatever the model called it.
+    return dict(generated, difficulty=difficulty)
+
+
+def _generate_many(client, combination, n, avoid):
+    """
+    ``n`` questions for ``combination`` in sequence, each added to ``avoid``
+    for the next. Returns ``(generated, errors)``.
+    """
+    avoid = list(avoid)
+    generated, errors = [], []
+    for _ in range(n):
+        try:
+            question = _generate(client, combination, avoid)
+        except Exception as exc:
+            errors.append(exc)
+            continue
+        generated.append(question)
+        avoid.append(question['question'])
+    return generated, errors
+
+
+def fill(client, per_combination, concurrency=4):
+    """
+    Generate questions until every combination has ``per_combination``
+    entries, with at most ``concurrency`` combinations (and LLM requests)
+    in flight. Only this thread touches the database. Returns
+    ``(added, failed)``.
+    """
+    missing = shortfall(per_combination)
+    avoid = {
+        combination: list(
+            QuestionBankEntry.objects.filter(
+                job_role=combination[0], session_type=combination[1], difficulty_level=combination[2],
+            ).order_by('-created_at').values_list('question_text', flat=True)[:FILL_AVOID]
+        )
+        for combination in missing
+    }
+    added = failed = 0
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='question-bank') as executor:
+        futures = {
+            executor.submit(_generate_many, client, combination, n, avoid[combination]): combination
+            for combination, n in missing.items()
+        }
+        for future in as_completed(futures):
+            job_role, session_type, _ = futures[future]
+            generated, errors = future.result()
+            for exc in errors:
+                failed += 1
+                logger.warning('Could not generate a %s %s question: %s', job_role, session_type, exc)
+            for question in generated:
+                if add(job_role, session_type, question)[1]:
+                    added += 1
+    return added, failed
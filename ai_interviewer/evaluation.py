@@ -0,0 +1,200 @@
+"""
+Evaluating interview answers, with a cache of LLM evaluations.
+
+Many submitted answers repeat: blank answers, "I don't know", double
+submissions and retries. An LLM evaluation is cached under a hash of the
+normalised question and answer, the difficulty, the role and session type
+the prompt mentions, and ``PROMPT_VERSION``, so a repeat is answered from
+the cache without a Groq call. Bump ``PROMPT_VERSION`` whenever the prompt
+or its parsing changes, which orphans every earlier entry.
+
+Entries live in the ``evaluations`` cache (see ``CACHES``), shared between
+workers when Redis is configured. Its ``TIMEOUT`` is the TTL; once it is
+full the least recently used entries are evicted (LocMemCache culls by LRU,
+and Redis should run with ``maxmemory-policy allkeys-lru``). Hits and misses
+are counted in the same cache; see the ``evaluation_cache_stats`` command.
+"""
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .generation import MODEL
+from .prompts import evaluation_answer
+
+PROMPT_VERSION = 2
+CACHE_ALIAS = 'evaluations'
+KEY_PREFIX = 'interview:evaluation'
+COUNTER_KEYS = {
+    'hits': 'interview:evaluation_cache:hits',
+    'misses': 'interview:evaluation_cache:misses',
+}
+
+_SPACE_RE = re.compile(r'\s+')
+
+
+def get_cache():
+    return caches[CACHE_ALIAS if CACHE_ALIAS in settings.CACHES else 'default']
+
+
+def normalize(text):
+    """Case, spacing and trailing punctuation do not change an evaluation."""
+    return _SPACE_RE.sub(' ', (text or '').casefold()).strip().rstrip('.!?').strip()
+
+
+def cache_key(session, question, answer_text):
+    parts = [
+        str(PROMPT_VERSION), session.job_role, session.session_type, question.difficulty_level,
+        normalize(question.question_text), normalize(answer_text),
+    ]
+    digest = hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+    return '%s:%s' % (KEY_PREFIX, digest)
+
+
+def _count(outcome):
+    cache = get_cache()
+    key = COUNTER_KEYS[outcome]
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr().
+        cache.add(key, 1, None)
+
+
+def stats():
+    values = get_cache().get_many(COUNTER_KEYS.values())
+    return {outcome: values.get(key, 0) for outcome, key in COUNTER_KEYS.items()}
+
+
+def reset_stats():
+    get_cache().delete_many(COUNTER_KEYS.values())
+
+
+def build_prompt(session, question, answer_text):
+    return f"""You are an expert {session.job_role} interviewer evaluating this answer:
+
+    Question: "{question.question_text}"
+    Answer: "{evaluation_answer(answer_text)}"
+    Difficulty: {question.difficulty_level}
+    Session Type: {session.session_type}
+
+    Provide a comprehensive evaluation with this EXACT format:
+
+    Feedback: [Detailed constructive feedback about the answer quality, accuracy, and completeness]
+    Rating: [Single number from 1-10]
+    Strengths: [What the candidate did well in their answer]
+    Improvements: [Specific suggestions for improvement]
+
+    Be professional, constructive, and specific. Consider the difficulty level and session type when rating."""
+
+
+def parse_evaluation(response_text):
+    """
+    The UserAnswer fields in a completion written in the prompt's format.
+    Raises IndexError or ValueError when it does not follow the format.
+    """
+    rating_str = response_text.split("Rating:")[1].split("Strengths:")[0].strip()
+    return {
+        'feedback': response_text.split("Feedback:")[1].split("Rating:")[0].strip(),
+        'rating': int(''.join(filter(str.isdigit, rating_str.split('/')[0]))),
+        'strengths': response_text.split("Strengths:")[1].split("Improvements:")[0].strip(),
+        'suggested_improvement': response_text.split("Improvements:")[1].strip(),
+    }
+
+
+def unparsed_evaluation(response_text):
+    return {
+        'feedback': "Could not parse detailed AI feedback. Raw response: " + response_text[:200] + "...",
+        'rating': 5,
+        'strengths': "Response provided",
+        'suggested_improvement': "Please provide more detailed answers",
+    }
+
+
+def error_evaluation(exc):
+    return {
+        'feedback': f"Error getting AI feedback: {str(exc)}",
+        'rating': 5,
+        'suggested_improvement': "Please try again later.",
+    }
+
+
+def offline_evaluation(answer_text):
+    """A rough evaluation by length, for when no Groq client is configured."""
+    word_count = len((answer_text or '').split())
+    feedback = f"Thank you for your {word_count}-word response. "
+    if word_count > 100:
+        feedback += "Your answer is comprehensive and detailed."
+        rating = 7
+    elif word_count > 50:
+        feedback += "Your answer covers the key points."
+        rating = 6
+    else:
+        feedback += "Consider providing more detailed examples and explanations."
+        rating = 5
+    return {
+        'feedback': feedback,
+        'rating': rating,
+        'strengths': "Clear communication" if word_count > 30 else "Concise response",
+        'suggested_improvement': "Set up Groq API key for detailed AI evaluation and feedback.",
+    }
+
+
+def _lookup(session, question, answer_text):
+    key = cache_key(session, question, answer_text)
+    result = get_cache().get(key)
+    _count('misses' if result is None else 'hits')
+    return key, result
+
+
+def _finish(key, response_text):
+    try:
+        result = parse_evaluation(response_text)
+    except (IndexError, ValueError):
+        # Not cached: the next submission gets another chance.
+        return unparsed_evaluation(response_text)
+    get_cache().set(key, result)
+    return result
+
+
+def _messages(session, question, answer_text):
+    return [{"role": "system", "content": build_prompt(session, question, answer_text)}]
+
+
+def evaluate(client, session, question, answer_text):
+    """The UserAnswer fields evaluating ``answer_text``, from the cache when possible."""
+    key, result = _lookup(session, question, answer_text)
+    if result is not None:
+        return result
+    completion = client.chat.completions.create(
+        messages=_messages(session, question, answer_text),
+        model=MODEL,
+        temperature=0.3,  # Lower temperature for consistent evaluation
+    )
+    return _finish(key, completion.choices[0].message.content)
+
+
+def stream_evaluation(client, session, question, answer_text):
+    """
+    Evaluate ``answer_text`` as a stream of ``('token', text)`` pairs, one
+    per piece of the completion as Groq sends it, ending with one
+    ``('result', fields)``. A cached evaluation is only the result.
+    """
+    key, result = _lookup(session, question, answer_text)
+    if result is None:
+        stream = client.chat.completions.create(
+            messages=_messages(session, question, answer_text),
+            model=MODEL,
+            temperature=0.3,
+            stream=True,
+        )
+        pieces = []
+        for chunk in stream:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                pieces.append(text)
+                yield 'token', text
+        result = _finish(key, ''.join(pieces))
+    yield 'result', result
@@ -0,0 +1,188 @@
+"""
+Interview question generation.
+
+One completion returns the question, its hint and its difficulty together as
+a JSON object, which is checked against ``QUESTION_SCHEMA`` before use. When
+the model does not produce valid output, the question and the hint are asked
+for as two plain-text completions. Those run concurrently, so the fallback
+costs two sequential round trips (the failed JSON one, then the pair) rather
+than three.
+"""
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from groq import BadRequestError
+
+from . import prompts
+
+logger = logging.getLogger(__name__)
+
+MODEL = "llama3-8b-8192"
+DIFFICULTIES = ('easy', 'medium', 'hard')
+# Questions get harder as the interview goes on.
+DIFFICULTY_BY_NUMBER = {1: 'easy', 2: 'easy', 3: 'medium', 4: 'medium', 5: 'hard'}
+
+QUESTION_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'question': {'type': 'string', 'minLength': 10},
+        'hint': {'type': 'string', 'minLength': 10},
+        'difficulty': {'type': 'string', 'enum': list(DIFFICULTIES)},
+    },
+    'required': ['question', 'hint', 'difficulty'],
+}
+
+SESSION_TYPE_PROMPTS = {
+    'theoretical': "Generate a theoretical question #{number} for a {role} interview. Focus on concepts, principles, and knowledge.",
+    'problem-solving': "Create a problem-solving question #{number} for a {role} interview. Present a realistic scenario or challenge.",
+    'database': "Generate a database-related question #{number} for a {role} interview. Focus on SQL, optimization, design, or architecture.",
+    'mcq': "Create a technical question #{number} for a {role} interview about tools, technologies, or best practices.",
+}
+
+
+class InvalidOutput(ValueError):
+    """The completion did not match ``QUESTION_SCHEMA``."""
+
+
+_JSON_TYPES = {'object': dict, 'string': str, 'array': list, 'integer': int, 'boolean': bool}
+
+
+def validate(instance, schema, path='$'):
+    """
+    Check ``instance`` against ``schema``, raising InvalidOutput on the first
+    mismatch. Covers the subset of JSON Schema used in this module: ``type``,
+    ``properties``, ``required``, ``enum`` and ``minLength``.
+    """
+    expected = schema.get('type')
+    if expected and not isinstance(instance, _JSON_TYPES[expected]):
+        raise InvalidOutput('%s should be of type %s' % (path, expected))
+    if 'enum' in schema and instance not in schema['enum']:
+        raise InvalidOutput('%s should be one of %s' % (path, ', '.join(map(str, schema['enum']))))
+    if 'minLength' in schema and len(instance.strip()) < schema['minLength']:
+        raise InvalidOutput('%s is too short' % path)
+    for key in schema.get('required', ()):
+        if key not in instance:
+            raise InvalidOutput('%s is missing %r' % (path, key))
+    for key, subschema in schema.get('properties', {}).items():
+        if key in instance:
+            validate(instance[key], subschema, '%s.%s' % (path, key))
+
+
+def expected_difficulty(question_number):
+    return DIFFICULTY_BY_NUMBER.get(question_number, 'medium')
+
+
+def question_number_for(difficulty):
+    """The first question of the interview pitched at ``difficulty``."""
+    return min(number for number, level in DIFFICULTY_BY_NUMBER.items() if level == difficulty)
+
+
+def question_brief(session, question_number, previous_questions):
+    """What to ask about: the part of the prompt both generation paths share."""
+    brief = SESSION_TYPE_PROMPTS.get(
+        session.session_type, "Generate interview question #{number} for {role} position"
+    ).format(number=question_number, role=session.job_role)
+    if previous_questions:
+        brief += " Make it different from these previous questions:\n%s" % prompts.previous_questions(previous_questions)
+    return brief
+
+
+def _clean(text):
+    return text.strip().strip('"').strip("'")
+
+
+def _complete(client, prompt, temperature, **options):
+    completion = client.chat.completions.create(
+        messages=[{"role": "system", "content": prompt}],
+        model=MODEL,
+        temperature=temperature,
+        **options
+    )
+    return completion.choices[0].message.content
+
+
+def parse_structured(text):
+    """The ``{'question', 'hint', 'difficulty'}`` dict encoded in ``text``."""
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError) as exc:
+        raise InvalidOutput('Not JSON: %s' % exc)
+    validate(data, QUESTION_SCHEMA)
+    return {
+        'question': _clean(data['question']),
+        'hint': _clean(data['hint']),
+        'difficulty': data['difficulty'],
+    }
+
+
+def generate_structured(client, session, question_number, previous_questions, difficulty=None):
+    """Question, hint and difficulty from a single JSON-mode completion."""
+    difficulty = difficulty or expected_difficulty(question_number)
+    prompt = f"""You are an expert technical interviewer with 10+ years of experience.
+    {question_brief(session, question_number, previous_questions)}
+
+    Guidelines:
+    - Make the question specific to {session.job_role}
+    - Ensure it's question #{question_number} in difficulty progression, pitched at "{difficulty}" level
+    - Keep it clear, professional, and interview-appropriate
+    - Make it unique and different from previous questions
+    - Also write a hint that guides the thinking process without giving away the answer,
+      suggests what areas to cover, is encouraging, and is 1-2 sentences long
+
+    Respond with a JSON object only, matching this JSON Schema:
+    {json.dumps(QUESTION_SCHEMA)}"""
+    text = _complete(client, prompt, 0.8, response_format={"type": "json_object"})
+    return parse_structured(text)
+
+
+def generate_concurrently(client, session, question_number, previous_questions, difficulty=None):
+    """
+    The question and the hint from two plain-text completions sent at the
+    same time. The hint cannot see the question, so it is written for the
+    same brief instead.
+    """
+    difficulty = difficulty or expected_difficulty(question_number)
+    brief = question_brief(session, question_number, previous_questions)
+    question_prompt = f"""You are an expert technical interviewer with 10+ years of experience.
+    {brief}
+
+    Guidelines:
+    - Make the question specific to {session.job_role}
+    - Ensure it's question #{question_number} in difficulty progression, pitched at "{difficulty}" level
+    - Keep it clear, professional, and interview-appropriate
+    - Only return the question text, nothing else
+    - Make it unique and different from previous questions"""
+    hint_prompt = f"""A {session.job_role} candidate is about to answer an interview question written for this brief:
+    {brief}
+
+    Provide a helpful hint that:
+    - Guides the thinking process without giving away the answer
+    - Suggests what areas to cover or approach to take
+    - Is encouraging and constructive
+    - Is 1-2 sentences long
+
+    Only return the hint text, nothing else."""
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix='question') as executor:
+        question = executor.submit(_complete, client, question_prompt, 0.8)
+        hint = executor.submit(_complete, client, hint_prompt, 0.7)
+        return {
+            'question': _clean(question.result()),
+            'hint': _clean(hint.result()),
+            'difficulty': difficulty,
+        }
+
+
+def generate(client, session, question_number, previous_questions, difficulty=None):
+    """
+    A new question as ``{'question', 'hint', 'difficulty'}``: structured
+    output first, the concurrent pair of completions if that fails. API
+    errors other than a rejected JSON completion propagate. ``difficulty``
+    overrides the one that follows from ``question_number``.
+    """
+    try:
+        return generate_structured(client, session, question_number, previous_questions, difficulty)
+    except (InvalidOutput, BadRequestError) as exc:
+        # Groq answers 400 when JSON mode could not produce a valid object.
+        logger.info('Structured question generation failed, falling back: %s', exc)
+    return generate_concurrently(client, session, question_number, previous_questions, difficulty)
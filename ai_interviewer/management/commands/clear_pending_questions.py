@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from ai_interviewer.prefetch import ABANDONED_AFTER, abandoned_questions
+
+
+class Command(BaseCommand):
+    help = ('Delete questions generated ahead of time that were never shown, '
+            'because their session finished or was abandoned')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age-hours', type=float, default=ABANDONED_AFTER.total_seconds() / 3600,
+                            help='Treat unclaimed pending questions older than this as abandoned')
+        parser.add_argument('--dry-run', action='store_true', help='Report without deleting')
+
+    def handle(self, *args, **options):
+        questions = abandoned_questions(timedelta(hours=options['max_age_hours']))
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"Would delete {questions.count()} pending questions."))
+            return
+        deleted = questions.delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} pending questions."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from ai_interviewer import evaluation
+
+
+class Command(BaseCommand):
+    help = 'Show how often interview answer evaluations were served from the cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zero the counters after reporting')
+
+    def handle(self, *args, **options):
+        counts = evaluation.stats()
+        total = counts['hits'] + counts['misses']
+        rate = 100 * counts['hits'] / total if total else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['hits']} hits, {counts['misses']} misses ({rate:.1f}% served from the cache)."
+        ))
+        if options['reset']:
+            evaluation.reset_stats()
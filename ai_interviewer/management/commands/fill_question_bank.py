@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from ai_interviewer import bank
+
+
+class Command(BaseCommand):
+    help = ('Generate interview questions ahead of time until every job role, session type and '
+            'difficulty has enough of them in the question bank')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--per-combination', type=int, default=10,
+                            help='Questions to keep per job role, session type and difficulty')
+        parser.add_argument('--concurrency', type=int, default=4, help='Combinations filled at once, one LLM request each')
+        parser.add_argument('--dry-run', action='store_true', help='Report what is missing without generating')
+
+    def handle(self, *args, **options):
+        missing = bank.shortfall(options['per_combination'])
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f"Would generate {sum(missing.values())} questions for {len(missing)} combinations."
+            ))
+            return
+        from ai_interviewer.views import client
+        if client is None:
+            raise CommandError('The Groq client is not configured; set GROQ_API_KEY.')
+        added, failed = bank.fill(client, options['per_combination'], max(options['concurrency'], 1))
+        self.stdout.write(self.style.SUCCESS(f"Added {added} questions to the bank; {failed} requests failed."))
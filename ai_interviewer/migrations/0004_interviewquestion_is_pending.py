@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_interviewer', '0003_interviewquestion_ai_hint_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interviewquestion',
+            name='is_pending',
+            field=models.BooleanField(default=False, help_text='Generated ahead of time and not shown to the candidate yet'),
+        ),
+        migrations.AddIndex(
+            model_name='interviewquestion',
+            index=models.Index(fields=['is_pending', 'created_at'], name='question_pending_idx'),
+        ),
+    ]
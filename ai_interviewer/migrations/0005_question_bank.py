@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_interviewer', '0004_interviewquestion_is_pending'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionBankEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_role', models.CharField(max_length=100)),
+                ('session_type', models.CharField(choices=[('theoretical', 'Theoretical Q&A'), ('database', 'Database Focused'), ('problem-solving', 'Problem Solving'), ('mcq', 'Quick MCQs')], max_length=50)),
+                ('difficulty_level', models.CharField(choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], max_length=20)),
+                ('question_text', models.TextField()),
+                ('ai_hint', models.TextField(blank=True, default='')),
+                ('times_used', models.PositiveIntegerField(default=0)),
+                ('last_used_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'question bank entries',
+                'indexes': [models.Index(fields=['job_role', 'session_type', 'difficulty_level', 'times_used'], name='question_bank_draw_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='interviewquestion',
+            name='bank_entry',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='uses', to='ai_interviewer.questionbankentry'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_interviewer', '0005_question_bank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='useranswer',
+            name='is_evaluated',
+            field=models.BooleanField(default=True, help_text='False while the evaluation task has not run yet'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_interviewer', '0006_useranswer_is_evaluated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='useranswer',
+            name='summary',
+            field=models.TextField(blank=True, default='', help_text='Short summary of a long answer, for session-wide prompts'),
+        ),
+    ]
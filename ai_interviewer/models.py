@@ -18,6 +18,36 @@ class InterviewSession(models.Model):
     def __str__(self):
         return f"Interview for {self.user.username} - {self.job_role}"
 
+class QuestionBankEntry(models.Model):
+    """A reusable question for one job role, session type and difficulty."""
+    job_role = models.CharField(max_length=100)
+    session_type = models.CharField(max_length=50, choices=[
+        ('theoretical', 'Theoretical Q&A'),
+        ('database', 'Database Focused'),
+        ('problem-solving', 'Problem Solving'),
+        ('mcq', 'Quick MCQs'),
+    ])
+    difficulty_level = models.CharField(max_length=20, choices=[
+        ('easy', 'Easy'),
+        ('medium', 'Medium'),
+        ('hard', 'Hard'),
+    ])
+    question_text = models.TextField()
+    ai_hint = models.TextField(blank=True, default='')
+    times_used = models.PositiveIntegerField(default=0)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = 'question bank entries'
+        indexes = [
+            models.Index(fields=['job_role', 'session_type', 'difficulty_level', 'times_used'],
+                         name='question_bank_draw_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.job_role} / {self.session_type} / {self.difficulty_level}: {self.question_text[:50]}"
+
 class InterviewQuestion(models.Model):
     session = models.ForeignKey(InterviewSession, related_name='questions', on_delete=models.CASCADE)
     question_text = models.TextField()
@@ -32,8 +62,16 @@ class InterviewQuestion(models.Model):
         ('coding', 'Coding'),
         ('mcq', 'Multiple Choice'),
     ], default='theory')
+    bank_entry = models.ForeignKey(QuestionBankEntry, related_name='uses', null=True, blank=True,
+                                   on_delete=models.SET_NULL)
+    is_pending = models.BooleanField(default=False, help_text="Generated ahead of time and not shown to the candidate yet")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_pending', 'created_at'], name='question_pending_idx'),
+        ]
+
     def __str__(self):
         return self.question_text[:50] + "..."
 
@@ -46,6 +84,8 @@ class UserAnswer(models.Model):
     weaknesses = models.TextField(blank=True, null=True)
     strengths = models.TextField(blank=True, null=True)
     time_taken = models.IntegerField(null=True, blank=True, help_text="Time taken in seconds")
+    summary = models.TextField(blank=True, default='', help_text="Short summary of a long answer, for session-wide prompts")
+    is_evaluated = models.BooleanField(default=True, help_text="False while the evaluation task has not run yet")
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
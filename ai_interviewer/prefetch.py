@@ -0,0 +1,88 @@
+"""
+Generating the next interview question ahead of time.
+
+While the candidate reads and answers question N, question N+1 is generated
+by a background task (``tasks.prefetch_question``) and saved with
+``is_pending=True``, hidden from the session. The GET that follows the
+answer promotes it instead of calling the LLM. When it is not ready yet the
+page shows that it is being prepared and polls until it is.
+
+Pending questions left behind by abandoned sessions are removed by the
+``clear_pending_questions`` command.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import InterviewQuestion, InterviewSession
+
+ABANDONED_AFTER = timedelta(hours=2)
+# While this key exists the question is queued or being generated, so
+# repeated page loads and polls do not queue it again.
+SCHEDULED_KEY = 'interview:prefetch:%s:%s'
+SCHEDULED_TIMEOUT = 120
+
+
+def visible_questions(session):
+    """The questions the candidate has been shown, leaving out pending ones."""
+    return session.questions.filter(is_pending=False)
+
+
+def generate_pending(session_id, question_number):
+    """
+    Generate question ``question_number`` of the session as a pending
+    question, unless the session is over, already has one waiting, or has
+    been given that question in the meantime.
+    """
+    from .views import generate_question
+
+    session = InterviewSession.objects.filter(pk=session_id, completed_at__isnull=True).first()
+    if session is None or session.questions.filter(is_pending=True).exists():
+        return None
+    if visible_questions(session).count() >= question_number:
+        return None
+    return generate_question(session, question_number, pending=True)
+
+
+def schedule_next(session, question_number):
+    """Queue the generation of question ``question_number`` once the transaction commits."""
+    from .tasks import prefetch_question
+
+    key = SCHEDULED_KEY % (session.pk, question_number)
+    if cache.add(key, True, SCHEDULED_TIMEOUT):
+        transaction.on_commit(lambda: prefetch_question.delay(session.pk, question_number))
+
+
+def scheduled_done(session_id, question_number):
+    cache.delete(SCHEDULED_KEY % (session_id, question_number))
+
+
+def has_pending(session):
+    return session.questions.filter(is_pending=True).exists()
+
+
+def claim_next(session):
+    """
+    Promote the session's pending question to the current one and return
+    it, or None if there is none yet.
+    """
+    question = session.questions.filter(is_pending=True).order_by('created_at').first()
+    # Only the request that flips the flag gets the question.
+    if question is None or not InterviewQuestion.objects.filter(pk=question.pk, is_pending=True).update(is_pending=False):
+        return None
+    question.is_pending = False
+    return question
+
+
+def discard_pending(session):
+    session.questions.filter(is_pending=True).delete()
+
+
+def abandoned_questions(max_age=ABANDONED_AFTER):
+    """Pending questions of finished sessions, and those nobody claimed within ``max_age``."""
+    return InterviewQuestion.objects.filter(is_pending=True).filter(
+        Q(session__completed_at__isnull=False) | Q(created_at__lt=timezone.now() - max_age)
+    )
@@ -0,0 +1,148 @@
+"""
+Token budgets for the AI interviewer's prompts.
+
+Prompt size drives both latency and cost, and candidates' answers can be
+any length. Everything variable that goes into a prompt passes through
+here and is held to a budget: previous questions are listed newest first
+until their budget runs out, answers are truncated, and the overall
+feedback prompt works from a short summary of each long answer. Summaries
+are written once, by the evaluation task, and kept on the answer
+(``UserAnswer.summary``), so the overall-feedback prompt stays the same size
+however verbose the candidate was.
+
+Token counts are estimates (there is no Llama tokenizer at hand), biased
+to overcount so budgets hold.
+"""
+import math
+import re
+
+from . import generation
+
+CHARS_PER_TOKEN = 4
+# Budgets, in tokens.
+QUESTION_HISTORY_BUDGET = 300
+QUESTION_HISTORY_ITEM_BUDGET = 60
+EVALUATION_ANSWER_BUDGET = 1500
+FEEDBACK_SESSION_BUDGET = 1500
+# Answers longer than this are summarised for the overall feedback.
+SUMMARY_THRESHOLD = 120
+SUMMARY_MAX_TOKENS = 100
+# Longest overall feedback the model may write.
+FEEDBACK_MAX_TOKENS = 800
+
+_PIECE_RE = re.compile(r'\w+|[^\w\s]')
+ELLIPSIS = ' …'
+
+
+def count_tokens(text):
+    """Estimated tokens in ``text``: whichever is larger of its characters / 4 and its words and symbols."""
+    if not text:
+        return 0
+    return max(math.ceil(len(text) / CHARS_PER_TOKEN), len(_PIECE_RE.findall(text)))
+
+
+def truncate(text, budget):
+    """``text`` cut at a word boundary to fit ``budget`` tokens, marked with an ellipsis if cut."""
+    text = (text or '').strip()
+    if count_tokens(text) <= budget:
+        return text
+    limit = budget * CHARS_PER_TOKEN
+    while limit > 0:
+        cut = text[:limit]
+        if len(cut.split()) > 1:
+            cut = cut.rsplit(None, 1)[0]
+        if count_tokens(cut + ELLIPSIS) <= budget:
+            return cut + ELLIPSIS
+        limit = int(limit * 0.9)
+    return ''
+
+
+def previous_questions(questions, budget=QUESTION_HISTORY_BUDGET, item_budget=QUESTION_HISTORY_ITEM_BUDGET):
+    """
+    A bulleted list of ``questions`` (oldest first) within ``budget``,
+    keeping the newest when they do not all fit.
+    """
+    lines = []
+    used = 0
+    for question in reversed(questions):
+        line = '- ' + truncate(question, item_budget)
+        cost = count_tokens(line)
+        if used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+    return '\n'.join(reversed(lines))
+
+
+def evaluation_answer(answer_text):
+    return truncate(answer_text, EVALUATION_ANSWER_BUDGET)
+
+
+# Answer summaries -------------------------------------------------------------
+
+def needs_summary(answer_text):
+    return count_tokens(answer_text) > SUMMARY_THRESHOLD
+
+
+def summarize(client, question_text, answer_text):
+    """A short LLM summary of a long answer, for prompts that cover a whole session."""
+    completion = client.chat.completions.create(
+        messages=[{
+            "role": "system",
+            "content": f"""Summarise this interview answer in at most 60 words. Keep the key points, technical
+            claims and any mistakes; leave out filler. Only return the summary.
+
+            Question: "{truncate(question_text, QUESTION_HISTORY_ITEM_BUDGET)}"
+            Answer: "{evaluation_answer(answer_text)}"
+            """,
+        }],
+        model=generation.MODEL,
+        temperature=0.2,
+        max_tokens=SUMMARY_MAX_TOKENS,
+    )
+    return completion.choices[0].message.content.strip()
+
+
+def ensure_summary(client, answer):
+    """
+    Summarise ``answer`` (a UserAnswer) and keep the summary on it, unless it
+    is short or already summarised. Returns the text to use for the answer.
+    """
+    from .models import UserAnswer
+
+    if answer.summary or not needs_summary(answer.answer_text):
+        return answer_digest(answer)
+    answer.summary = summarize(client, answer.question.question_text, answer.answer_text)
+    UserAnswer.objects.filter(pk=answer.pk).update(summary=answer.summary)
+    return answer.summary
+
+
+def answer_digest(answer):
+    return answer.summary or answer.answer_text
+
+
+# Overall feedback -----------------------------------------------------------
+
+def overall_feedback_prompt(session, answered_questions, budget=FEEDBACK_SESSION_BUDGET):
+    """
+    The overall feedback prompt for ``answered_questions`` (with their
+    answers), with the per-question part held to ``budget`` tokens split
+    evenly between the questions.
+    """
+    item_budget = budget // max(len(answered_questions), 1)
+    items = []
+    for number, question in enumerate(answered_questions, 1):
+        answer = question.answer
+        header = f"Q{number} ({question.difficulty_level}, rated {answer.rating}/10): "
+        # Question, answer and the evaluator's feedback share the item budget 1:2:1.
+        share = max(item_budget - count_tokens(header) - 8, 12) // 4
+        items.append(
+            header + truncate(question.question_text, share)
+            + "\n  Answer: " + truncate(answer_digest(answer), 2 * share)
+            + "\n  Feedback: " + truncate(answer.feedback, share)
+        )
+    return (
+        f"Based on this {session.job_role} interview session, provide overall feedback.\n\n"
+        + "\n".join(items)
+        + "\n\nGive a summary of strengths, areas for improvement, and next steps."
+    )
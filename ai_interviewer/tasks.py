@@ -0,0 +1,113 @@
+"""
+Background tasks of the AI interviewer.
+
+Every LLM call a candidate would otherwise wait for runs here, on a Celery
+worker, so slow completions never hold one of the few web workers: the views
+save what they have, queue a task and return at once, and the pages poll
+``interview_status`` until the results are in. Without a broker the tasks
+run inline (see ``CELERY_TASK_ALWAYS_EAGER``).
+"""
+import logging
+
+from celery import shared_task
+from groq import APIConnectionError, RateLimitError
+
+from . import evaluation, generation, prefetch, prompts
+from .models import InterviewSession, UserAnswer
+
+logger = logging.getLogger(__name__)
+
+# Worth another try after a short wait.
+TRANSIENT_ERRORS = (APIConnectionError, RateLimitError)
+
+
+def run_inline():
+    """Whether tasks run in the calling process: no broker is configured."""
+    return evaluate_answer.app.conf.task_always_eager
+
+
+def _client():
+    from .views import client
+    return client
+
+
+@shared_task(bind=True, max_retries=3)
+def evaluate_answer(self, answer_id):
+    """Evaluate a saved answer and fill in its feedback."""
+    answer = (UserAnswer.objects.select_related('question__session')
+              .filter(pk=answer_id, is_evaluated=False).first())
+    if answer is None:
+        return
+    question = answer.question
+    client = _client()
+    try:
+        if client:
+            result = evaluation.evaluate(client, question.session, question, answer.answer_text)
+        else:
+            result = evaluation.offline_evaluation(answer.answer_text)
+    except TRANSIENT_ERRORS as exc:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=exc, countdown=2 ** self.request.retries)
+        result = evaluation.error_evaluation(exc)
+    except Exception as exc:
+        logger.exception('Could not evaluate answer %s', answer_id)
+        result = evaluation.error_evaluation(exc)
+    if client and not run_inline():
+        # Ahead of the overall feedback, which reads it. Inline, this would be
+        # another LLM call inside the answer's request; write_overall_feedback
+        # summarises whatever is still missing instead.
+        try:
+            prompts.ensure_summary(client, answer)
+        except Exception:
+            logger.exception('Could not summarise answer %s', answer_id)
+    UserAnswer.objects.filter(pk=answer_id, is_evaluated=False).update(is_evaluated=True, **result)
+
+
+@shared_task
+def prefetch_question(session_id, question_number):
+    """Generate question ``question_number`` of a session as a pending question."""
+    try:
+        prefetch.generate_pending(session_id, question_number)
+    finally:
+        prefetch.scheduled_done(session_id, question_number)
+
+
+@shared_task(bind=True, max_retries=30)
+def write_overall_feedback(self, session_id):
+    """Summarise a completed session once all of its answers are evaluated."""
+    session = InterviewSession.objects.filter(pk=session_id, completed_at__isnull=False).first()
+    if session is None or session.overall_feedback:
+        return
+    answered_questions = list(
+        prefetch.visible_questions(session).filter(answer__isnull=False)
+        .select_related('answer').order_by('created_at')
+    )
+    if not all(q.answer.is_evaluated for q in answered_questions) and self.request.retries < self.max_retries:
+        # The ratings go into the prompt.
+        raise self.retry(countdown=2)
+
+    client = _client()
+    if client:
+        try:
+            for question in answered_questions:
+                try:
+                    prompts.ensure_summary(client, question.answer)
+                except Exception:
+                    # The prompt truncates the answer instead.
+                    logger.exception('Could not summarise answer %s', question.answer.pk)
+            feedback_prompt = prompts.overall_feedback_prompt(session, answered_questions)
+
+            chat_completion = client.chat.completions.create(
+                messages=[{"role": "system", "content": feedback_prompt}],
+                model=generation.MODEL,
+                max_tokens=prompts.FEEDBACK_MAX_TOKENS,
+            )
+            feedback = chat_completion.choices[0].message.content
+        except Exception:
+            logger.exception('Could not write the overall feedback of session %s', session_id)
+            feedback = (f"Interview completed! You answered {len(answered_questions)} questions. "
+                        "Review your individual feedback for detailed insights.")
+    else:
+        feedback = (f"Interview completed! You answered {len(answered_questions)} questions "
+                    f"for the {session.job_role} position.")
+    InterviewSession.objects.filter(pk=session_id, overall_feedback='').update(overall_feedback=feedback)
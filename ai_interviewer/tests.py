@@ -1,3 +1,335 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import httpx
+from groq import APIConnectionError, BadRequestError
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.users.models import User
+from . import evaluation, generation, prefetch, tasks, views
+from .models import InterviewQuestion, InterviewSession, UserAnswer
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+@mock.patch.object(views, 'client', None)
+class AnswerEvaluationTests(TestCase):
+    """Answers are saved first and evaluated by a task (inline here)."""
+
+    def setUp(self):
+        self.user = User.objects.create(username='candidate', role='applicant')
+        self.client.force_login(self.user)
+        self.session = InterviewSession.objects.create(
+            user=self.user, job_role='Software Engineer', session_type='theoretical',
+        )
+        self.question = InterviewQuestion.objects.create(
+            session=self.session, question_text='What is a database index?', difficulty_level='easy',
+        )
+
+    def test_typed_answer(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('ai_interviewer:interview_session', args=[self.session.id]),
+                {'question_id': self.question.id, 'answer': 'A structure that speeds up lookups.'},
+            )
+        self.assertEqual(response.status_code, 302)
+        answer = UserAnswer.objects.get(question=self.question)
+        self.assertTrue(answer.is_evaluated)
+        self.assertEqual(answer.rating, 5)
+
+    def test_voice_answer(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('ai_interviewer:voice_answer'),
+                json.dumps({'question_id': self.question.id, 'answer': 'It speeds up lookups.'}),
+                content_type='application/json',
+            )
+        self.assertEqual(response.json()['status_url'],
+                         reverse('ai_interviewer:interview_status', args=[self.session.id]))
+        self.assertTrue(UserAnswer.objects.get(question=self.question).is_evaluated)
+
+        # The evaluation shows up in the status the page polls.
+        status = self.client.get(reverse('ai_interviewer:interview_status', args=[self.session.id])).json()
+        self.assertTrue(status['answers'][0]['evaluated'])
+
+    def test_answers_only_go_to_own_questions(self):
+        other = User.objects.create(username='other', role='applicant')
+        other_session = InterviewSession.objects.create(user=other, job_role='Data Analyst', session_type='theoretical')
+        other_question = InterviewQuestion.objects.create(
+            session=other_session, question_text='What is a pivot table?', difficulty_level='easy',
+        )
+        # Posted to the candidate's own session, but naming someone else's question.
+        response = self.client.post(
+            reverse('ai_interviewer:interview_session', args=[self.session.id]),
+            {'question_id': other_question.id, 'answer': 'A summary table.'},
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.post(
+            reverse('ai_interviewer:voice_answer'),
+            json.dumps({'question_id': other_question.id, 'answer': 'A summary table.'}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(UserAnswer.objects.exists())
+
+    def test_voice_answer_needs_login(self):
+        self.client.logout()
+        response = self.client.post(
+            reverse('ai_interviewer:voice_answer'),
+            json.dumps({'question_id': self.question.id, 'answer': 'It speeds up lookups.'}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(UserAnswer.objects.exists())
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=False)
+    def test_queued_answer_waits_for_the_worker(self):
+        with mock.patch('ai_interviewer.tasks.evaluate_answer.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    reverse('ai_interviewer:interview_session', args=[self.session.id]),
+                    {'question_id': self.question.id, 'answer': 'A structure that speeds up lookups.'},
+                )
+        answer = UserAnswer.objects.get(question=self.question)
+        delay.assert_called_once_with(answer.pk)
+        self.assertFalse(answer.is_evaluated)
+
+
+def fake_client(structured, question=None, hint=None):
+    """
+    A Groq client answering the JSON-mode completion with ``structured`` and
+    the fallback's plain-text pair with ``question`` and ``hint``. Replies
+    that are exceptions are raised.
+    """
+    def create(messages, **options):
+        if 'response_format' in options:
+            content = structured
+        else:
+            content = hint if 'helpful hint' in messages[0]['content'] else question
+        if isinstance(content, Exception):
+            raise content
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+    client = mock.Mock()
+    client.chat.completions.create.side_effect = create
+    return client
+
+
+class QuestionGenerationTests(SimpleTestCase):
+    session = SimpleNamespace(job_role='Software Engineer', session_type='database')
+    valid = {'question': 'How would you index a table of orders?',
+             'hint': 'Think about the queries that run most often.', 'difficulty': 'hard'}
+
+    def generate(self, *replies):
+        client = fake_client(*replies)
+        question = generation.generate(client, self.session, 3, [])
+        return question, client.chat.completions.create.call_args_list
+
+    def test_structured_output(self):
+        question, calls = self.generate(json.dumps(self.valid))
+        self.assertEqual(question, self.valid)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0].kwargs['response_format'], {'type': 'json_object'})
+
+    def test_invalid_output_falls_back_to_plain_text(self):
+        for reply in ('not json', json.dumps(dict(self.valid, difficulty='impossible')),
+                      json.dumps({'question': self.valid['question']}), json.dumps(dict(self.valid, hint=' '))):
+            with self.subTest(reply=reply):
+                question, calls = self.generate(reply, '"What is a covering index?"', 'Consider the columns read.')
+                # The fallback pitches the question at the difficulty of its number.
+                self.assertEqual(question, {'question': 'What is a covering index?',
+                                            'hint': 'Consider the columns read.', 'difficulty': 'medium'})
+                self.assertEqual(len(calls), 3)
+
+    def test_rejected_json_completion_falls_back(self):
+        request = httpx.Request('POST', 'https://api.groq.com/openai/v1/chat/completions')
+        error = BadRequestError('json_validate_failed', response=httpx.Response(400, request=request), body=None)
+        question, calls = self.generate(error, 'What is a covering index?', 'Consider the columns read.')
+        self.assertEqual(question['question'], 'What is a covering index?')
+        self.assertEqual(len(calls), 3)
+
+    def test_other_api_errors_propagate(self):
+        request = httpx.Request('POST', 'https://api.groq.com/openai/v1/chat/completions')
+        with self.assertRaises(APIConnectionError):
+            self.generate(APIConnectionError(request=request))
+
+
+class PrefetchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create(username='candidate', role='applicant')
+        self.session = InterviewSession.objects.create(
+            user=user, job_role='Software Engineer', session_type='theoretical',
+        )
+        self.shown = self.make_question('What is a database index?')
+
+    def make_question(self, text, **fields):
+        return InterviewQuestion.objects.create(
+            session=self.session, question_text=text, difficulty_level='easy', **fields
+        )
+
+    def test_pending_question_is_claimed_once(self):
+        self.assertIsNone(prefetch.claim_next(self.session))
+        pending = self.make_question('What is a foreign key?', is_pending=True)
+        self.assertEqual(list(prefetch.visible_questions(self.session)), [self.shown])
+
+        self.assertEqual(prefetch.claim_next(self.session), pending)
+        self.assertFalse(InterviewQuestion.objects.get(pk=pending.pk).is_pending)
+        self.assertIsNone(prefetch.claim_next(self.session))
+
+    def test_concurrent_claim_loses(self):
+        pending = self.make_question('What is a foreign key?', is_pending=True)
+        # Another request promotes the question between this one's read and its update.
+        InterviewQuestion.objects.filter(pk=pending.pk).update(is_pending=False)
+        with mock.patch('django.db.models.QuerySet.first', return_value=pending):
+            self.assertIsNone(prefetch.claim_next(self.session))
+
+    def test_discard_keeps_shown_questions(self):
+        self.make_question('What is a foreign key?', is_pending=True)
+        prefetch.discard_pending(self.session)
+        self.assertEqual(list(self.session.questions.all()), [self.shown])
+
+    def test_generate_pending_skips_needless_work(self):
+        with mock.patch.object(views, 'generate_question') as generate:
+            # The candidate already has question 1.
+            self.assertIsNone(prefetch.generate_pending(self.session.pk, 1))
+            prefetch.generate_pending(self.session.pk, 2)
+            generate.assert_called_once_with(self.session, 2, pending=True)
+
+            generate.reset_mock()
+            self.make_question('What is a foreign key?', is_pending=True)
+            self.assertIsNone(prefetch.generate_pending(self.session.pk, 2))
+            InterviewSession.objects.filter(pk=self.session.pk).update(completed_at=timezone.now())
+            prefetch.discard_pending(self.session)
+            self.assertIsNone(prefetch.generate_pending(self.session.pk, 2))
+            generate.assert_not_called()
+
+    def test_next_question_is_scheduled_once(self):
+        with mock.patch('ai_interviewer.tasks.prefetch_question.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                prefetch.schedule_next(self.session, 2)
+                prefetch.schedule_next(self.session, 2)
+            delay.assert_called_once_with(self.session.pk, 2)
+            prefetch.scheduled_done(self.session.pk, 2)
+            with self.captureOnCommitCallbacks(execute=True):
+                prefetch.schedule_next(self.session, 2)
+            self.assertEqual(delay.call_count, 2)
+
+    def test_abandoned_questions(self):
+        fresh = self.make_question('What is a foreign key?', is_pending=True)
+        old = self.make_question('What is a view?', is_pending=True)
+        InterviewQuestion.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(hours=3))
+        self.assertEqual(list(prefetch.abandoned_questions()), [old])
+        InterviewSession.objects.filter(pk=self.session.pk).update(completed_at=timezone.now())
+        self.assertEqual(set(prefetch.abandoned_questions()), {fresh, old})
+
+
+class QuestionBankTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='candidate', role='applicant')
+
+    def start(self):
+        return InterviewSession.objects.create(user=self.user, job_role='Software Engineer', session_type='database')
+
+    def test_generated_question_is_filed_under_the_expected_difficulty(self):
+        generated = {'question': 'How would you shard a users table?',
+                     'hint': 'Think about the access patterns.', 'difficulty': 'hard'}
+        with mock.patch.object(views, 'client', mock.Mock()), \
+                mock.patch.object(generation, 'generate', return_value=generated):
+            question = views.generate_question(self.start(), 1)
+        self.assertEqual(question.difficulty_level, 'easy')
+
+        # A later interview is asked it at the same point, from the bank.
+        with mock.patch.object(views, 'client', None):
+            question = views.generate_question(self.start(), 1)
+        self.assertEqual(question.question_text, generated['question'])
+        self.assertIsNotNone(question.bank_entry)
+
+
+class EvaluationCacheTests(SimpleTestCase):
+    reply = ('Feedback: Correct and concise.\nRating: 8/10\n'
+             'Strengths: Names the trade-off.\nImprovements: Mention write costs.')
+
+    def setUp(self):
+        evaluation.get_cache().clear()
+        self.session = InterviewSession(job_role='Software Engineer', session_type='database')
+        self.question = InterviewQuestion(question_text='What is a database index?', difficulty_level='easy')
+
+    def client_replying(self, text):
+        client = mock.Mock()
+        client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text))]
+        )
+        return client
+
+    def evaluate(self, client, answer, question=None):
+        return evaluation.evaluate(client, self.session, question or self.question, answer)
+
+    def test_repeated_answer_is_a_hit(self):
+        client = self.client_replying(self.reply)
+        first = self.evaluate(client, 'A structure that speeds up lookups.')
+        self.assertEqual(first['rating'], 8)
+        # Case, spacing and trailing punctuation do not matter.
+        self.assertEqual(self.evaluate(client, '  a structure that SPEEDS up   lookups!'), first)
+        self.assertEqual(client.chat.completions.create.call_count, 1)
+        self.assertEqual(evaluation.stats(), {'hits': 1, 'misses': 1})
+
+        # A streamed evaluation of a cached answer is only the result.
+        events = evaluation.stream_evaluation(client, self.session, self.question, 'A structure that speeds up lookups')
+        self.assertEqual(list(events), [('result', first)])
+
+    def test_other_questions_and_answers_miss(self):
+        client = self.client_replying(self.reply)
+        self.evaluate(client, 'A structure that speeds up lookups.')
+        self.evaluate(client, 'A sorted copy of some columns.')
+        harder = InterviewQuestion(question_text=self.question.question_text, difficulty_level='hard')
+        self.evaluate(client, 'A structure that speeds up lookups.', harder)
+        self.assertEqual(client.chat.completions.create.call_count, 3)
+        self.assertEqual(evaluation.stats(), {'hits': 0, 'misses': 3})
+
+    def test_unparsed_evaluation_is_not_cached(self):
+        client = self.client_replying('Great answer!')
+        self.assertEqual(self.evaluate(client, 'An index.')['rating'], 5)
+        self.evaluate(client, 'An index.')
+        self.assertEqual(client.chat.completions.create.call_count, 2)
+
+    def test_new_prompt_version_misses(self):
+        client = self.client_replying(self.reply)
+        self.evaluate(client, 'An index.')
+        with mock.patch.object(evaluation, 'PROMPT_VERSION', evaluation.PROMPT_VERSION + 1):
+            self.evaluate(client, 'An index.')
+        self.assertEqual(client.chat.completions.create.call_count, 2)
+
+
+class AnswerSummaryTests(TestCase):
+    def setUp(self):
+        user = User.objects.create(username='candidate', role='applicant')
+        session = InterviewSession.objects.create(user=user, job_role='Software Engineer', session_type='database')
+        question = InterviewQuestion.objects.create(
+            session=session, question_text='What is a database index?', difficulty_level='easy',
+        )
+        self.answer = UserAnswer.objects.create(question=question, answer_text='An index ' * 400, is_evaluated=False)
+
+    def evaluate(self):
+        reply = 'Feedback: Thorough.\nRating: 7\nStrengths: Detail.\nImprovements: Be brief.'
+        with mock.patch.object(views, 'client', mock.Mock()), \
+                mock.patch.object(evaluation, 'evaluate', return_value=evaluation.parse_evaluation(reply)), \
+                mock.patch.object(tasks.prompts, 'summarize', return_value='Repeats itself.') as summarize:
+            tasks.evaluate_answer(self.answer.pk)
+        self.answer.refresh_from_db()
+        self.assertTrue(self.answer.is_evaluated)
+        return summarize
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=False)
+    def test_worker_summarises_long_answers(self):
+        self.evaluate().assert_called_once()
+        self.assertEqual(self.answer.summary, 'Repeats itself.')
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+    def test_inline_evaluation_leaves_the_summary_for_later(self):
+        self.evaluate().assert_not_called()
+        self.assertEqual(self.answer.summary, '')
@@ -7,6 +7,8 @@ urlpatterns = [
     path('', views.start_interview, name='start_interview'),
     path('setup/', views.start_interview, name='setup_interview'),
     path('session/<int:session_id>/', views.interview_session, name='interview_session'),
+    path('session/<int:session_id>/evaluate/', views.evaluate_answer_stream, name='evaluate_answer_stream'),
+    path('session/<int:session_id>/status/', views.interview_status, name='interview_status'),
     path('results/<int:session_id>/', views.interview_results, name='interview_results'),
     path('voice/', views.voice_answer, name='voice_answer'),
     path('history/', views.user_interviews, name='user_interviews'),
@@ -1,10 +1,15 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse, HttpResponse
-from django.views.decorators.csrf import csrf_exempt
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.http import require_POST
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
 from django.utils import timezone
 from .models import InterviewSession, InterviewQuestion, UserAnswer
 from .forms import InterviewSetupForm
+from . import bank, evaluation, generation, prefetch, tasks
 from groq import Groq
 import os
 import json
@@ -18,72 +23,43 @@ except Exception as e:
     print(f"Warning: Groq client initialization failed: {e}")
     print("Please set GROQ_API_KEY environment variable for AI functionality")
 
-def generate_question(session, question_number):
-    """Generate a new interview question with AI hint"""
+def question_from_bank(session, question_number, pending=False):
+    """Ask the next question from the question bank, if it has one left: no LLM call at all"""
+    entry = bank.draw(session, generation.expected_difficulty(question_number))
+    if entry is None:
+        return None
+    return InterviewQuestion.objects.create(
+        session=session,
+        bank_entry=entry,
+        question_text=entry.question_text,
+        ai_hint=entry.ai_hint,
+        difficulty_level=entry.difficulty_level,
+        question_type=session.session_type,
+        is_pending=pending
+    )
+
+def generate_question(session, question_number, pending=False):
+    """Generate a new interview question with AI hint; ``pending`` ones stay hidden until claimed"""
+    # The question bank first
+    question = question_from_bank(session, question_number, pending)
+    if question is not None:
+        return question
+    
     try:
         if client:
             # Get previously asked questions to avoid repetition
-            previous_questions = [q.question_text for q in session.questions.all()]
-            
-            # Create more detailed prompts based on session type and question number
-            session_type_prompts = {
-                'theoretical': f"Generate a theoretical question #{question_number} for a {session.job_role} interview. Focus on concepts, principles, and knowledge.",
-                'problem-solving': f"Create a problem-solving question #{question_number} for a {session.job_role} interview. Present a realistic scenario or challenge.",
-                'database': f"Generate a database-related question #{question_number} for a {session.job_role} interview. Focus on SQL, optimization, design, or architecture.",
-                'mcq': f"Create a technical question #{question_number} for a {session.job_role} interview about tools, technologies, or best practices."
-            }
-            
-            base_prompt = session_type_prompts.get(session.session_type, 
-                f"Generate interview question #{question_number} for {session.job_role} position")
-            
-            if previous_questions:
-                base_prompt += f" Make it different from these previous questions: {previous_questions}"
-            
-            # Generate question
-            question_completion = client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"""You are an expert technical interviewer with 10+ years of experience. 
-                        {base_prompt}
-                        
-                        Guidelines:
-                        - Make the question specific to {session.job_role}
-                        - Ensure it's question #{question_number} in difficulty progression
-                        - Keep it clear, professional, and interview-appropriate
-                        - Only return the question text, nothing else
-                        - Make it unique and different from previous questions"""
-                    }
-                ],
-                model="llama3-8b-8192",
-                temperature=0.8,
-            )
-            new_question_text = question_completion.choices[0].message.content.strip().strip('"').strip("'")
-            
-            # Generate AI hint
-            hint_completion = client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"""For this {session.job_role} interview question: "{new_question_text}"
-                        
-                        Provide a helpful hint that:
-                        - Guides the thinking process without giving away the answer
-                        - Suggests what areas to cover or approach to take
-                        - Is encouraging and constructive
-                        - Is 1-2 sentences long
-                        
-                        Only return the hint text, nothing else."""
-                    }
-                ],
-                model="llama3-8b-8192",
-                temperature=0.7,
-            )
-            ai_hint = hint_completion.choices[0].message.content.strip().strip('"').strip("'")
+            previous_questions = [q.question_text for q in prefetch.visible_questions(session)]
+            generated = generation.generate(client, session, question_number, previous_questions)
+            # File it under the difficulty that was asked for, whatever the model called it,
+            # so the bank serves it at the same point of a later interview.
+            generated = dict(generated, difficulty=generation.expected_difficulty(question_number))
+            new_question_text = generated['question']
+            ai_hint = generated['hint']
+            difficulty = generated['difficulty']
             
-            # Determine difficulty based on question number
-            difficulty_mapping = {1: 'easy', 2: 'easy', 3: 'medium', 4: 'medium', 5: 'hard'}
-            difficulty = difficulty_mapping.get(question_number, 'medium')
+            # Keep it for later sessions
+            entry, _ = bank.add(session.job_role, session.session_type, generated)
+            bank.record_use(entry)
             
         else:
             # Enhanced fallback questions with hints
@@ -185,13 +161,16 @@ def generate_question(session, question_number):
             new_question_text = selected_data['question']
             ai_hint = selected_data['hint']
             difficulty = 'medium'
+            entry = None
             
         return InterviewQuestion.objects.create(
             session=session,
+            bank_entry=entry,
             question_text=new_question_text,
             ai_hint=ai_hint,
             difficulty_level=difficulty,
-            question_type=session.session_type
+            question_type=session.session_type,
+            is_pending=pending
         )
         
     except Exception as e:
@@ -219,7 +198,8 @@ def generate_question(session, question_number):
             question_text=selected_data['question'],
             ai_hint=selected_data['hint'],
             difficulty_level='medium',
-            question_type=session.session_type
+            question_type=session.session_type,
+            is_pending=pending
         )
 
 @login_required
@@ -252,135 +232,48 @@ def interview_session(request, session_id):
     if request.method == 'POST':
         answer_text = request.POST.get('answer')
         question_id = request.POST.get('question_id')
-        question = get_object_or_404(InterviewQuestion, id=question_id)
+        question = get_object_or_404(InterviewQuestion, id=question_id, session=session, is_pending=False)
         
-        # Use Groq to evaluate the answer with comprehensive analysis
-        try:
-            if client:
-                evaluation_completion = client.chat.completions.create(
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": f"""You are an expert {session.job_role} interviewer evaluating this answer:
-                            
-                            Question: "{question.question_text}"
-                            Answer: "{answer_text}"
-                            Difficulty: {question.difficulty_level}
-                            Session Type: {session.session_type}
-                            
-                            Provide a comprehensive evaluation with this EXACT format:
-                            
-                            Feedback: [Detailed constructive feedback about the answer quality, accuracy, and completeness]
-                            Rating: [Single number from 1-10]
-                            Strengths: [What the candidate did well in their answer]
-                            Improvements: [Specific suggestions for improvement]
-                            
-                            Be professional, constructive, and specific. Consider the difficulty level and session type when rating."""
-                        }
-                    ],
-                    model="llama3-8b-8192",
-                    temperature=0.3,  # Lower temperature for consistent evaluation
-                )
-                response_text = evaluation_completion.choices[0].message.content
-                
-                # Parse the comprehensive response
-                try:
-                    feedback = response_text.split("Feedback:")[1].split("Rating:")[0].strip()
-                    rating_str = response_text.split("Rating:")[1].split("Strengths:")[0].strip()
-                    rating = int(''.join(filter(str.isdigit, rating_str.split('/')[0])))
-                    strengths = response_text.split("Strengths:")[1].split("Improvements:")[0].strip()
-                    improvements = response_text.split("Improvements:")[1].strip()
-                except (IndexError, ValueError):
-                    # Fallback parsing if format doesn't match
-                    feedback = "Could not parse detailed AI feedback. Raw response: " + response_text[:200] + "..."
-                    rating = 5
-                    strengths = "Response provided"
-                    improvements = "Please provide more detailed answers"
-            else:
-                # Enhanced fallback evaluation
-                word_count = len(answer_text.split())
-                feedback = f"Thank you for your {word_count}-word response. "
-                
-                if word_count > 100:
-                    feedback += "Your answer is comprehensive and detailed."
-                    rating = 7
-                elif word_count > 50:
-                    feedback += "Your answer covers the key points."
-                    rating = 6
-                else:
-                    feedback += "Consider providing more detailed examples and explanations."
-                    rating = 5
-                
-                strengths = "Clear communication" if word_count > 30 else "Concise response"
-                improvements = "Set up Groq API key for detailed AI evaluation and feedback."
-
-            UserAnswer.objects.create(
-                question=question,
-                answer_text=answer_text,
-                feedback=feedback,
-                rating=rating,
-                strengths=strengths,
-                suggested_improvement=improvements
-            )
-            
-        except Exception as e:
-            # Handle API errors gracefully
-            UserAnswer.objects.create(
-                question=question,
-                answer_text=answer_text,
-                feedback=f"Error getting AI feedback: {str(e)}",
-                rating=5,
-                suggested_improvement="Please try again later."
-            )
+        # Save the answer now and evaluate it in the background
+        answer, created = UserAnswer.objects.get_or_create(
+            question=question,
+            defaults={'answer_text': answer_text, 'is_evaluated': False}
+        )
+        if created:
+            transaction.on_commit(lambda: tasks.evaluate_answer.delay(answer.pk))
         
         return redirect('ai_interviewer:interview_session', session_id=session.id)
 
     # GET request logic
-    questions = session.questions.order_by('created_at')
-    answered_questions = questions.filter(answer__isnull=False)
+    questions = prefetch.visible_questions(session).order_by('created_at')
+    answered_questions = questions.filter(answer__isnull=False).select_related('answer')
     current_question = questions.filter(answer__isnull=True).first()
     
-    # Generate first question if no questions exist
-    if not questions.exists():
-        current_question = generate_question(session, 1)
-    
     # Check if session should be completed (limit to 5 questions)
     if answered_questions.count() >= 5:
-        print(f"DEBUG: Session {session.id} completed with {answered_questions.count()} questions")
         if not session.completed_at:
             session.completed_at = timezone.now()
-            
-            # Generate overall feedback
-            if client:
-                try:
-                    # Get all answers for overall feedback
-                    all_answers = [(q.question_text, q.answer.answer_text, q.answer.rating) 
-                                 for q in answered_questions if hasattr(q, 'answer')]
-                    
-                    feedback_prompt = f"Based on this {session.job_role} interview session, provide overall feedback. "
-                    feedback_prompt += f"Questions and answers: {all_answers}. "
-                    feedback_prompt += "Give a summary of strengths, areas for improvement, and next steps."
-                    
-                    chat_completion = client.chat.completions.create(
-                        messages=[{"role": "system", "content": feedback_prompt}],
-                        model="llama3-8b-8192",
-                    )
-                    session.overall_feedback = chat_completion.choices[0].message.content
-                except Exception as e:
-                    session.overall_feedback = f"Interview completed! You answered {answered_questions.count()} questions. Review your individual feedback for detailed insights."
-            else:
-                session.overall_feedback = f"Interview completed! You answered {answered_questions.count()} questions for the {session.job_role} position."
-            
             session.save()
-            print(f"DEBUG: Session {session.id} marked as completed at {session.completed_at}")
+            prefetch.discard_pending(session)
+            # Overall feedback is written in the background
+            transaction.on_commit(lambda: tasks.write_overall_feedback.delay(session.id))
         
-        print(f"DEBUG: Redirecting to results page for session {session.id}")
         return redirect('ai_interviewer:interview_results', session_id=session.id)
     
-    # Generate next question if current one is answered but we haven't reached 5 questions
-    if not current_question and answered_questions.count() < 5:
-        question_number = answered_questions.count() + 1
-        current_question = generate_question(session, question_number)
+    # Next question: generated ahead of time, or from the question bank, or
+    # queued for generation while the page waits for it
+    question_number = answered_questions.count() + 1
+    if not current_question:
+        current_question = prefetch.claim_next(session) or question_from_bank(session, question_number)
+    if not current_question:
+        prefetch.schedule_next(session, question_number)
+        # Done already when tasks run eagerly
+        current_question = prefetch.claim_next(session)
+    
+    # Generate the question after this one while the candidate answers;
+    # inline, that would only hold up this page
+    if current_question and question_number < 5 and not tasks.run_inline():
+        prefetch.schedule_next(session, question_number + 1)
     
     # Get last answered question for feedback display
     last_answered = answered_questions.last()
@@ -389,12 +282,78 @@ def interview_session(request, session_id):
         'session': session,
         'current_question': current_question,
         'last_answered': last_answered,
-        'question_number': answered_questions.count() + 1,
+        'question_number': question_number,
         'total_questions': 5,
-        'progress_percentage': (answered_questions.count() / 5) * 100
+        'progress_percentage': (answered_questions.count() / 5) * 100,
+        'stream_evaluation': getattr(settings, 'INTERVIEW_STREAM_EVALUATION', False),
     }
     return render(request, 'ai_interviewer/interview_session_modern.html', context)
 
+@login_required
+def interview_status(request, session_id):
+    """What the background tasks of a session have finished, for the pages to poll"""
+    session = get_object_or_404(InterviewSession, id=session_id, user=request.user)
+    answers = UserAnswer.objects.filter(question__session=session).order_by('question__created_at')
+    return JsonResponse({
+        'completed': session.completed_at is not None,
+        'overall_feedback_ready': bool(session.overall_feedback),
+        'next_question_ready': prefetch.has_pending(session),
+        'answers': [
+            {
+                'question_id': answer.question_id,
+                'evaluated': answer.is_evaluated,
+                'rating': answer.rating,
+                'feedback': answer.feedback,
+            }
+            for answer in answers
+        ],
+    })
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _evaluation_events(session, question, answer_text):
+    """Server-Sent Events relaying the evaluation as it is written; the answer is saved at the end"""
+    try:
+        if client:
+            for kind, value in evaluation.stream_evaluation(client, session, question, answer_text):
+                if kind == 'token':
+                    yield _sse('token', value)
+                else:
+                    result = value
+        else:
+            result = evaluation.offline_evaluation(answer_text)
+    except Exception as e:
+        # Handle API errors gracefully
+        result = evaluation.error_evaluation(e)
+    
+    # A double submission keeps the first answer
+    answer, _ = UserAnswer.objects.get_or_create(question=question, defaults=dict(result, answer_text=answer_text))
+    yield _sse('done', {
+        'feedback': answer.feedback,
+        'rating': answer.rating,
+        'strengths': answer.strengths,
+        'improvements': answer.suggested_improvement,
+        'next_url': reverse('ai_interviewer:interview_session', args=[session.id]),
+    })
+
+@login_required
+@require_POST
+def evaluate_answer_stream(request, session_id):
+    """Evaluate an answer, streaming the feedback to the browser while Groq writes it"""
+    session = get_object_or_404(InterviewSession, id=session_id, user=request.user)
+    question = get_object_or_404(InterviewQuestion, id=request.POST.get('question_id'), session=session, is_pending=False)
+    if UserAnswer.objects.filter(question=question).exists():
+        return JsonResponse({'success': False, 'error': 'This question has already been answered'}, status=409)
+    
+    response = StreamingHttpResponse(
+        _evaluation_events(session, question, request.POST.get('answer', '')),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx would otherwise hold the events back
+    return response
+
 @login_required
 def interview_results(request, session_id):
     """Display interview results and analytics"""
@@ -422,7 +381,10 @@ def interview_results(request, session_id):
             'total_questions': total_questions,
             'strong_answers': strong_answers,
             'weak_answers': weak_answers,
-            'completion_percentage': 100 if session.completed_at else 0
+            'completion_percentage': 100 if session.completed_at else 0,
+            'results_pending': session.completed_at is not None and (
+                not session.overall_feedback or any(not q.answer.is_evaluated for q in answered_questions)
+            ),
         }
         
         print(f"DEBUG: Rendering results for session {session_id}")
@@ -439,66 +401,47 @@ def interview_results(request, session_id):
 @login_required
 def user_interviews(request):
     """Display user's interview history"""
-    sessions = InterviewSession.objects.filter(user=request.user).order_by('-created_at')
+    sessions = InterviewSession.objects.filter(user=request.user).annotate(
+        question_count=Count('questions', filter=Q(questions__is_pending=False))
+    ).order_by('-created_at')
     return render(request, 'ai_interviewer/user_interviews_modern.html', {'sessions': sessions})
 
-@csrf_exempt
+@login_required
 def voice_answer(request):
-    """Handle voice answers via AJAX"""
+    """Handle voice answers via AJAX (send the CSRF token in the X-CSRFToken header)"""
     if request.method == 'POST':
         data = json.loads(request.body)
         answer_text = data.get('answer')
         question_id = data.get('question_id')
+        # Only questions of the candidate's own sessions
+        question = get_object_or_404(
+            InterviewQuestion.objects.select_related('session'),
+            id=question_id, session__user=request.user, is_pending=False,
+        )
+        session = question.session
         
         try:
-            question = InterviewQuestion.objects.get(id=question_id)
-            session = question.session
-            
-            if client:
-                chat_completion = client.chat.completions.create(
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": f"You are an expert interviewer. Evaluate this answer for a {session.job_role} {session.session_type} interview question. Provide feedback, rating (1-10), and suggestions for improvement. Format: Feedback: [your feedback] Rating: [1-10]/10 Improvements: [suggestions]"
-                        },
-                        {
-                            "role": "user",
-                            "content": f"Question: {question.question_text}\nAnswer: {answer_text}"
-                        }
-                    ],
-                    model="llama3-8b-8192",
-                )
-                response_text = chat_completion.choices[0].message.content
-                
-                # Parse the response
-                try:
-                    feedback = response_text.split("Feedback:")[1].split("Rating:")[0].strip()
-                    rating_str = response_text.split("Rating:")[1].split("Improvements:")[0].strip()
-                    rating = int(''.join(filter(str.isdigit, rating_str.split('/')[0])))
-                    improvements = response_text.split("Improvements:")[1].strip()
-                except (IndexError, ValueError):
-                    feedback = "Could not parse AI feedback"
-                    rating = 5
-                    improvements = "N/A"
-            else:
-                feedback = "AI evaluation temporarily unavailable"
-                rating = 5
-                improvements = "Set up Groq API key for AI feedback"
-
-            UserAnswer.objects.create(
+            # Evaluated in the background like typed answers; poll the status URL
+            answer, created = UserAnswer.objects.get_or_create(
                 question=question,
-                answer_text=answer_text,
-                feedback=feedback,
-                rating=rating,
-                suggested_improvement=improvements
+                defaults={'answer_text': answer_text, 'is_evaluated': False}
             )
+            if created:
+                transaction.on_commit(lambda: tasks.evaluate_answer.delay(answer.pk))
+            answer.refresh_from_db()
             
-            return JsonResponse({
+            response = {
                 'success': True,
-                'feedback': feedback,
-                'rating': rating,
-                'improvements': improvements
-            })
+                'evaluated': answer.is_evaluated,
+                'status_url': reverse('ai_interviewer:interview_status', args=[session.id]),
+            }
+            if answer.is_evaluated:
+                response.update({
+                    'feedback': answer.feedback,
+                    'rating': answer.rating,
+                    'improvements': answer.suggested_improvement
+                })
+            return JsonResponse(response)
             
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)})
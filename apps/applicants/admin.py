@@ -1,6 +1,20 @@
 from django.contrib import admin
-from .models import Application
+from .models import Application, ResumeBlob, ResumeText
 
 @admin.register(Application)
 class ApplicationAdmin(admin.ModelAdmin):
-    list_display = ('job', 'applicant', 'applied_at')
+    list_display = ('job', 'applicant', 'applied_at', 'is_reviewed')
+    list_filter = ('is_reviewed',)
+
+
+@admin.register(ResumeBlob)
+class ResumeBlobAdmin(admin.ModelAdmin):
+    list_display = ('digest', 'size', 'ref_count', 'updated_at')
+    readonly_fields = ('digest', 'name', 'size', 'ref_count', 'created_at', 'updated_at')
+
+
+@admin.register(ResumeText)
+class ResumeTextAdmin(admin.ModelAdmin):
+    list_display = ('application', 'status', 'page_count', 'attempts', 'updated_at')
+    list_filter = ('status',)
+    readonly_fields = ('application', 'text', 'page_count', 'status', 'attempts', 'error', 'updated_at')
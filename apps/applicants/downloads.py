@@ -0,0 +1,135 @@
+"""
+Serving stored resumes to the people allowed to see them.
+
+The view checks permissions and then, when ``RESUME_SENDFILE`` names a front
+server, only returns a header telling that server which file to send:
+
+* ``'nginx'``: ``X-Accel-Redirect`` to ``RESUME_SENDFILE_ROOT`` + the stored
+  name, which must be an ``internal`` location aliased to ``MEDIA_ROOT``.
+* ``'apache'`` / ``'lighttpd'``: ``X-Sendfile`` with the absolute path.
+
+The front server then handles the transfer, including Range requests, and
+the app worker is free again at once. Without a front server the file is
+streamed from Python in ``CHUNK_SIZE`` pieces, with single-range support so
+PDF viewers can fetch pages incrementally and interrupted downloads resume.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .storage import CHUNK_SIZE, digest_from_name
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+SENDFILE_HEADERS = {
+    'apache': 'X-Sendfile',
+    'lighttpd': 'X-Sendfile',
+}
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_range(header, size):
+    """
+    The ``(start, end)`` byte positions (end inclusive) asked for by a Range
+    header, or None to send the whole file. Multiple ranges are answered with
+    the whole file, which RFC 9110 allows.
+    """
+    match = RANGE_RE.match((header or '').strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # A suffix range: the last N bytes.
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable()
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+def read_range(file, start, end):
+    """Yield bytes ``start`` to ``end`` (inclusive) of ``file``, then close it."""
+    with file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining:
+            chunk = file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def sendfile_backend():
+    return getattr(settings, 'RESUME_SENDFILE', '') or ''
+
+
+def serve_stored_file(request, storage, name, filename, max_age=3600, immutable=False):
+    """
+    Respond with the file stored as ``name`` in ``storage``, presented to
+    the browser as ``filename``. Pass ``immutable`` for URLs that change
+    whenever the file does.
+    """
+    path = storage.path(name)
+    stat = os.stat(path)
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    # Content-addressed names never change content, so their hash is a strong ETag.
+    etag = quote_etag(digest_from_name(name) or '%x-%x' % (stat.st_mtime_ns, stat.st_size))
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        backend = sendfile_backend()
+        if backend == 'nginx':
+            response = HttpResponse(content_type=content_type)
+            root = getattr(settings, 'RESUME_SENDFILE_ROOT', '/protected-media/')
+            response['X-Accel-Redirect'] = quote(root.rstrip('/') + '/' + name)
+        elif backend in SENDFILE_HEADERS:
+            response = HttpResponse(content_type=content_type)
+            response[SENDFILE_HEADERS[backend]] = path
+        else:
+            response = _stream(request, path, stat.st_size, etag, content_type)
+        response['Content-Disposition'] = 'inline; filename="%s"' % filename.replace('"', '')
+        response['X-Content-Type-Options'] = 'nosniff'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    # Personal data: browsers may keep it, shared caches must not.
+    if immutable:
+        patch_cache_control(response, private=True, max_age=max_age, immutable=True)
+    else:
+        patch_cache_control(response, private=True, max_age=max_age)
+    return response
+
+
+def _stream(request, path, size, etag, content_type):
+    byte_range = None
+    if request.headers.get('If-Range', etag) == etag:
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */%d' % size
+            return response
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+        response.block_size = CHUNK_SIZE
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(read_range(open(path, 'rb'), start, end), status=206, content_type=content_type)
+        response['Content-Range'] = 'bytes %d-%d/%d' % (start, end, size)
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,108 @@
+"""
+Streaming ZIP export of a job's applicants.
+
+The archive is produced by a generator: ``zipfile`` writes into a small
+buffer that is drained after every chunk, so the response starts at once and
+memory use stays at one chunk however many resumes are exported. The CSV
+manifest is written first, row by row, then each resume is copied into the
+archive in ``CHUNK_SIZE`` pieces.
+"""
+import csv
+import io
+import os
+import zipfile
+
+from django.utils.text import slugify
+
+from .storage import CHUNK_SIZE
+
+MANIFEST_NAME = 'applicants.csv'
+MANIFEST_HEADER = ['name', 'email', 'applied_at', 'resume_file', 'cover_letter']
+
+
+class _StreamBuffer(io.RawIOBase):
+    """An unseekable sink that collects what zipfile writes until drained."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class _CsvRows:
+    """Holds the last line written by csv.writer, so rows can be encoded one at a time."""
+
+    def __init__(self):
+        self.line = ''
+
+    def write(self, line):
+        self.line = line
+
+
+def _entry_name(application):
+    # Named by pk, not position: the two passes may not see the same rows.
+    user = application.applicant.user
+    name = slugify(user.get_full_name() or user.username) or 'applicant'
+    ext = os.path.splitext(application.resume.name)[1].lower()
+    return 'resumes/%d-%s%s' % (application.pk, name, ext)
+
+
+def stream_applicants_zip(applications):
+    """
+    Yield a ZIP archive of ``applications`` (a queryset) as byte chunks.
+    The queryset is iterated twice, once for the manifest and once for the
+    files, without caching it; only the pks listed with a file in the
+    manifest are kept in between, so applications added or removed in the
+    meantime cannot make the archive disagree with its manifest.
+    """
+    applications = applications.select_related('applicant__user').order_by('applied_at', 'pk')
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        rows = _CsvRows()
+        writer = csv.writer(rows)
+        listed = set()
+        with archive.open(MANIFEST_NAME, mode='w', force_zip64=True) as manifest:
+            writer.writerow(MANIFEST_HEADER)
+            manifest.write(rows.line.encode('utf-8'))
+            for application in applications.iterator(chunk_size=500):
+                user = application.applicant.user
+                has_file = bool(application.resume.name) and application.resume.storage.exists(application.resume.name)
+                if has_file:
+                    listed.add(application.pk)
+                writer.writerow([
+                    user.get_full_name() or user.username,
+                    user.email,
+                    application.applied_at.isoformat(),
+                    _entry_name(application) if has_file else '',
+                    application.cover_letter,
+                ])
+                manifest.write(rows.line.encode('utf-8'))
+                yield buffer.drain()
+        yield buffer.drain()
+
+        for application in applications.iterator(chunk_size=500):
+            if application.pk not in listed:
+                continue
+            try:
+                source = application.resume.storage.open(application.resume.name, 'rb')
+            except (OSError, ValueError):
+                continue  # deleted since the manifest was written
+            info = zipfile.ZipInfo(_entry_name(application), date_time=application.applied_at.timetuple()[:6])
+            # Resumes are mostly PDFs, which are already compressed.
+            info.compress_type = zipfile.ZIP_STORED
+            with source, archive.open(info, mode='w', force_zip64=True) as entry:
+                for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                    entry.write(chunk)
+                    yield buffer.drain()
+            yield buffer.drain()
+    yield buffer.drain()
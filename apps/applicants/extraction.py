@@ -0,0 +1,188 @@
+"""
+Background resume text extraction.
+
+Once an application commits, its resume is parsed in a small process pool
+(PDF parsing is CPU-bound and must not hold up a request worker) and the
+text and page count are stored as a ResumeText row. Failed attempts are
+retried with exponential backoff up to ``MAX_ATTEMPTS`` times. Resumes are
+content-addressed, so a file already extracted for another application is
+copied instead of parsed again.
+
+``extract_text`` runs in the child processes and must not touch the
+database or Django settings.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 30  # seconds, doubled after each failed attempt
+MAX_PAGES = 50
+MAX_TEXT_LENGTH = 100_000
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class UnsupportedFormat(ValueError):
+    """The file type cannot be parsed; retrying will not help."""
+
+
+# Runs in the worker processes ---------------------------------------------
+
+def _extract_pdf(path):
+    try:
+        import pdfplumber
+
+        with pdfplumber.open(path) as pdf:
+            pages = pdf.pages
+            text = '\n'.join(page.extract_text() or '' for page in pages[:MAX_PAGES])
+            return text, len(pages)
+    except Exception:
+        # pdfplumber is stricter about malformed files; PyPDF2 often copes.
+        from PyPDF2 import PdfReader
+
+        reader = PdfReader(path)
+        text = '\n'.join(page.extract_text() or '' for page in reader.pages[:MAX_PAGES])
+        return text, len(reader.pages)
+
+
+def extract_text(path):
+    """Return ``(text, page_count)`` for the resume file at ``path``."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.pdf':
+        text, pages = _extract_pdf(path)
+    elif ext in ('.txt', '.md'):
+        with open(path, encoding='utf-8', errors='replace') as f:
+            text, pages = f.read(MAX_TEXT_LENGTH), 1
+    else:
+        raise UnsupportedFormat('Unsupported resume format: %s' % (ext or 'no extension'))
+    return ' '.join(text.split())[:MAX_TEXT_LENGTH], pages
+
+
+# Runs in the web process ----------------------------------------------------
+
+def pool_size():
+    return getattr(settings, 'RESUME_EXTRACTION_WORKERS', 2)
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the web process has threads and open connections.
+            _pool = ProcessPoolExecutor(max_workers=pool_size(), mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def schedule_extraction(application_id, restart=False):
+    """
+    Extract the application's resume after the current transaction commits.
+    Pass ``restart`` when the resume was replaced, to reset the retry budget.
+    """
+    if restart:
+        from .models import ResumeText
+        ResumeText.objects.filter(application_id=application_id).update(attempts=0, status=ResumeText.PENDING)
+    transaction.on_commit(lambda: submit(application_id))
+
+
+def _start(application_id):
+    """
+    Mark the application's resume as pending and return the file path to
+    parse, or None when there is nothing to parse.
+    """
+    from .models import Application, ResumeText
+    from .storage import resume_storage
+
+    name = Application.objects.filter(pk=application_id).values_list('resume', flat=True).first()
+    if name is None:
+        return None
+    record, _ = ResumeText.objects.get_or_create(application_id=application_id)
+    done = (ResumeText.objects.filter(application__resume=name, status=ResumeText.DONE)
+            .exclude(application_id=application_id).first())
+    if done is not None:
+        record.text, record.page_count, record.status, record.error = done.text, done.page_count, ResumeText.DONE, ''
+        record.save()
+        return None
+    record.status = ResumeText.PENDING
+    record.save(update_fields=['status', 'updated_at'])
+    return resume_storage.path(name)
+
+
+def submit(application_id):
+    path = _start(application_id)
+    if path is None:
+        return
+    if pool_size() == 0:
+        # Inline mode, for development and tests.
+        try:
+            result = extract_text(path)
+        except Exception as exc:
+            record_failure(application_id, exc)
+        else:
+            record_success(application_id, *result)
+        return
+    future = get_pool().submit(extract_text, path)
+    future.add_done_callback(lambda f: _on_done(application_id, f))
+
+
+def _on_done(application_id, future):
+    # Called on the executor's management thread, which has its own connection.
+    try:
+        exc = future.exception()
+        if exc is None:
+            record_success(application_id, *future.result())
+        else:
+            record_failure(application_id, exc)
+    except Exception:
+        logger.exception('Could not store extracted resume text for application %s', application_id)
+    finally:
+        connections.close_all()
+
+
+def record_success(application_id, text, page_count):
+    from .models import ResumeText
+
+    record = ResumeText.objects.filter(application_id=application_id).first()
+    if record is None:  # the application was deleted meanwhile
+        return
+    record.text, record.page_count, record.status, record.error = text, page_count, ResumeText.DONE, ''
+    record.attempts += 1
+    record.save()
+
+
+def record_failure(application_id, exc, retry=True):
+    """
+    Count a failed attempt and, if ``retry``, schedule another one; after
+    ``MAX_ATTEMPTS`` the resume is marked as failed.
+    """
+    from .models import ResumeText
+
+    record = ResumeText.objects.filter(application_id=application_id).first()
+    if record is None:
+        return
+    record.attempts += 1
+    record.error = '%s: %s' % (type(exc).__name__, exc)
+    if record.attempts >= MAX_ATTEMPTS or isinstance(exc, UnsupportedFormat):
+        record.status = ResumeText.FAILED
+        logger.warning('Giving up on resume text for application %s: %s', application_id, record.error)
+    elif retry:
+        delay = RETRY_DELAY * 2 ** (record.attempts - 1)
+        timer = threading.Timer(delay, _retry, (application_id,))
+        timer.daemon = True
+        timer.start()
+    record.save()
+
+
+def _retry(application_id):
+    try:
+        submit(application_id)
+    finally:
+        connections.close_all()
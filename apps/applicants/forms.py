@@ -1,7 +1,24 @@
 from django import forms
+from django.template.defaultfilters import filesizeformat
 from .models import Application
+from .storage import max_upload_size
 
 class ApplicationForm(forms.ModelForm):
     class Meta:
         model = Application
         fields = ['resume', 'cover_letter']
+
+    def __init__(self, *args, oversized_uploads=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'resume' in oversized_uploads:
+            # The upload handler dropped the file, so the field looks empty.
+            self.fields['resume'].error_messages['required'] = self.too_large_message()
+
+    def too_large_message(self):
+        return f'Resume must be at most {filesizeformat(max_upload_size())}.'
+
+    def clean_resume(self):
+        resume = self.cleaned_data['resume']
+        if resume and resume.size > max_upload_size():
+            raise forms.ValidationError(self.too_large_message())
+        return resume
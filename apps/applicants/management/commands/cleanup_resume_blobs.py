@@ -0,0 +1,85 @@
+import os
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from apps.applicants.models import Application, ResumeBlob
+from apps.applicants.previews import delete_previews, preview_source
+from apps.applicants.storage import RESUME_DIR, acquire_blob, digest_from_name, resume_storage
+
+
+class Command(BaseCommand):
+    help = 'Delete stored resume files that no application references any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=float, default=24,
+                            help='Keep unreferenced files this long, in case an upload is about to reuse them')
+        parser.add_argument('--recount', action='store_true',
+                            help='Recompute reference counts from the applications table first')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be deleted')
+
+    def recount(self):
+        counts = dict(
+            Application.objects.values_list('resume').annotate(n=Count('id')).order_by().values_list('resume', 'n')
+        )
+        with transaction.atomic():
+            ResumeBlob.objects.update(ref_count=0)
+            for name, n in counts.items():
+                if digest_from_name(name) is None:
+                    continue
+                if not ResumeBlob.objects.filter(digest=digest_from_name(name)).update(ref_count=n):
+                    acquire_blob(name)
+                    ResumeBlob.objects.filter(digest=digest_from_name(name)).update(ref_count=n)
+        self.stdout.write(f'Recounted references for {len(counts)} resume files.')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        if options['recount'] and not dry_run:
+            self.recount()
+
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        deleted, freed = 0, 0
+        for blob in ResumeBlob.objects.filter(ref_count=0, updated_at__lt=cutoff).iterator():
+            if dry_run:
+                self.stdout.write(f'Would delete {blob.name}')
+            # Re-check the count in the DELETE itself: an upload may have just reused the blob.
+            elif ResumeBlob.objects.filter(pk=blob.pk, ref_count=0).delete()[0]:
+                resume_storage.delete(blob.name)
+                delete_previews(blob.name)
+            else:
+                continue
+            deleted += 1
+            freed += blob.size
+
+        # Files without a row: crashed uploads, interrupted temporary files and
+        # previews of resumes that are gone.
+        known = set(ResumeBlob.objects.values_list('name', flat=True))
+        oldest = time.time() - options['grace_hours'] * 3600
+        root = resume_storage.path(RESUME_DIR)
+        orphans = 0
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, resume_storage.location).replace(os.sep, '/')
+                source = preview_source(name)
+                if source is not None:
+                    stray = not os.path.exists(resume_storage.path(source))
+                else:
+                    stray = filename.startswith('.upload-') or (digest_from_name(name) and name not in known)
+                if not stray or os.path.getmtime(path) > oldest:
+                    continue
+                if digest_from_name(name) and Application.objects.filter(resume=name).exists():
+                    continue  # referenced but never counted; --recount adds its row
+                orphans += 1
+                if dry_run:
+                    self.stdout.write(f'Would delete {name}')
+                else:
+                    os.remove(path)
+
+        verb = 'Would delete' if dry_run else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {deleted} unreferenced resumes ({freed} bytes) and {orphans} orphaned files.'
+        ))
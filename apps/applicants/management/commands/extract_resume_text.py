@@ -0,0 +1,69 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from apps.applicants.extraction import extract_text, pool_size, record_failure, record_success
+from apps.applicants.models import Application, ResumeText
+from apps.applicants.storage import resume_storage
+
+
+class Command(BaseCommand):
+    help = 'Extract the text of resumes that have not been processed yet, in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=max(pool_size(), os.cpu_count() or 1))
+        parser.add_argument('--retry-failed', action='store_true', help='Also retry resumes marked as failed')
+        parser.add_argument('--all', action='store_true', help='Re-extract every resume')
+
+    def handle(self, *args, **options):
+        applications = Application.objects.all()
+        if not options['all']:
+            skip = [ResumeText.DONE] if options['retry_failed'] else [ResumeText.DONE, ResumeText.FAILED]
+            applications = applications.exclude(resume_text__status__in=skip)
+
+        # Identical files are stored once, so parse each file once.
+        by_file = {}
+        for pk, name in applications.values_list('pk', 'resume').iterator(chunk_size=2000):
+            by_file.setdefault(name, []).append(pk)
+        ResumeText.objects.bulk_create(
+            [ResumeText(application_id=pk) for ids in by_file.values() for pk in ids], ignore_conflicts=True
+        )
+        total = len(by_file)
+        if not total:
+            self.stdout.write(self.style.SUCCESS('No resumes to extract.'))
+            return
+        self.stdout.write(f'Extracting {total} resume files for {sum(map(len, by_file.values()))} applications '
+                          f'with {options["workers"]} workers...')
+
+        done = failed = 0
+        step = max(1, total // 20)
+        pending = {}
+        files = iter(by_file.items())
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=options['workers'], mp_context=context) as pool:
+            while True:
+                # Keep a bounded number of files in flight.
+                while len(pending) < options['workers'] * 4:
+                    item = next(files, None)
+                    if item is None:
+                        break
+                    name, ids = item
+                    pending[pool.submit(extract_text, resume_storage.path(name))] = ids
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    ids = pending.pop(future)
+                    exc = future.exception()
+                    for pk in ids:
+                        if exc is None:
+                            record_success(pk, *future.result())
+                        else:
+                            record_failure(pk, exc, retry=False)
+                    failed += exc is not None
+                    done += 1
+                    if done % step == 0 or done == total:
+                        self.stdout.write(f'  {done}/{total} files ({done * 100 // total}%), {failed} failed')
+
+        self.stdout.write(self.style.SUCCESS(f'Extracted {done - failed} resume files, {failed} failed.'))
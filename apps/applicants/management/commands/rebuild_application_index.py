@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.applicants.models import Application
+from apps.applicants.search import application_index, application_document, DOCUMENT_FIELDS
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index over applicants' resumes and cover letters"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if not application_index.is_supported():
+            raise CommandError('Full-text search is not supported on this database backend.')
+
+        batch_size = options['batch_size']
+        total = 0
+        with transaction.atomic():
+            application_index.clear()
+            batch = []
+            for row in Application.objects.values(*DOCUMENT_FIELDS).iterator(chunk_size=batch_size):
+                batch.append((row['pk'], application_document(row)))
+                if len(batch) >= batch_size:
+                    application_index.bulk_insert(batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                application_index.bulk_insert(batch)
+                total += len(batch)
+        application_index.optimize()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} applications.'))
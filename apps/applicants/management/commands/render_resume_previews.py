@@ -0,0 +1,55 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from apps.applicants.extraction import UnsupportedFormat, pool_size
+from apps.applicants.models import Application
+from apps.applicants.previews import delete_previews, missing_previews, render_previews
+from apps.applicants.storage import resume_storage
+
+
+class Command(BaseCommand):
+    help = 'Render the preview thumbnails of resumes that do not have them yet, in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=max(pool_size(), os.cpu_count() or 1))
+        parser.add_argument('--all', action='store_true', help='Re-render every preview')
+
+    def handle(self, *args, **options):
+        names = Application.objects.values_list('resume', flat=True).distinct().order_by()
+        if options['all']:
+            for name in names.iterator(chunk_size=2000):
+                delete_previews(name)
+        jobs = ((name, missing_previews(name)) for name in names.iterator(chunk_size=2000))
+        jobs = ((name, targets) for name, targets in jobs if targets)
+
+        done = failed = skipped = 0
+        pending = {}
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=options['workers'], mp_context=context) as pool:
+            while True:
+                # Keep a bounded number of files in flight.
+                while len(pending) < options['workers'] * 4:
+                    item = next(jobs, None)
+                    if item is None:
+                        break
+                    name, targets = item
+                    pending[pool.submit(render_previews, resume_storage.path(name), targets)] = name
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = pending.pop(future)
+                    exc = future.exception()
+                    if isinstance(exc, UnsupportedFormat):
+                        skipped += 1
+                    elif exc is not None:
+                        failed += 1
+                        self.stderr.write(f'  {name}: {type(exc).__name__}: {exc}')
+                    else:
+                        done += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rendered previews for {done} resume files, {failed} failed, {skipped} skipped.'
+        ))
@@ -0,0 +1,78 @@
+from django.db import migrations
+
+# The index as it was created here, frozen so later changes to
+# apps.applicants.search do not change what this migration does.
+SQLITE_CREATE = [
+    ('CREATE VIRTUAL TABLE "applicants_application_fts" USING fts5(resume, cover_letter, scope, '
+     "tokenize='porter unicode61 remove_diacritics 2')", None),
+    ('INSERT INTO "applicants_application_fts"("applicants_application_fts", rank) VALUES (\'rank\', %s)',
+     ['bm25(10.0, 4.0, 0.0)']),
+]
+SQLITE_INSERT = (
+    'INSERT INTO "applicants_application_fts"(rowid, resume, cover_letter, scope) VALUES (%s, %s, %s, %s)'
+)
+SQLITE_PARAMS = ('resume', 'cover_letter', 'scope')
+
+POSTGRES_CREATE = [
+    ('CREATE TABLE "applicants_application_fts" (rowid bigint PRIMARY KEY REFERENCES "applicants_application" (id) '
+     'ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "text" tsvector NOT NULL, "scope" tsvector NOT NULL, '
+     '"resume_text" text NOT NULL, "cover_letter_text" text NOT NULL)', None),
+    ('CREATE INDEX "applicants_application_fts_scope_gin" ON "applicants_application_fts" USING gin ("scope")', None),
+    ('CREATE INDEX "applicants_application_fts_text_gin" ON "applicants_application_fts" USING gin ("text")', None),
+]
+POSTGRES_INSERT = (
+    'INSERT INTO "applicants_application_fts" (rowid, "text", "scope", "resume_text", "cover_letter_text") '
+    "VALUES (%s, setweight(to_tsvector('english', %s), 'A') || setweight(to_tsvector('english', %s), 'B'), "
+    "to_tsvector('simple', %s), %s, %s) "
+    'ON CONFLICT (rowid) DO UPDATE SET "text" = EXCLUDED."text", "scope" = EXCLUDED."scope", '
+    '"resume_text" = EXCLUDED."resume_text", "cover_letter_text" = EXCLUDED."cover_letter_text"'
+)
+POSTGRES_PARAMS = ('resume', 'cover_letter', 'scope', 'resume', 'cover_letter')
+
+STATEMENTS = {
+    'sqlite': (SQLITE_CREATE, SQLITE_INSERT, SQLITE_PARAMS),
+    'postgresql': (POSTGRES_CREATE, POSTGRES_INSERT, POSTGRES_PARAMS),
+}
+
+
+def document(row):
+    return {
+        'resume': row['resume_text__text'] or '',
+        'cover_letter': row['cover_letter'] or '',
+        'scope': 'job%d employer%d' % (row['job_id'], row['job__posted_by_id']),
+    }
+
+
+def create_application_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in STATEMENTS:
+        return
+    create, insert, params = STATEMENTS[vendor]
+    for sql, sql_params in create:
+        schema_editor.execute(sql, sql_params)
+    Application = apps.get_model('applicants', 'Application')
+    rows = []
+    for row in Application.objects.using(schema_editor.connection.alias).values(
+        'pk', 'cover_letter', 'job_id', 'job__posted_by_id', 'resume_text__text'
+    ):
+        values = document(row)
+        rows.append([row['pk']] + [values[column] for column in params])
+    if rows:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(insert, rows)
+
+
+def drop_application_index(apps, schema_editor):
+    if schema_editor.connection.vendor in STATEMENTS:
+        schema_editor.execute('DROP TABLE IF EXISTS "applicants_application_fts"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applicants', '0005_resume_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_application_index, drop_application_index),
+    ]
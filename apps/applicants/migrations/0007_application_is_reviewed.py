@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applicants', '0006_application_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='is_reviewed',
+            field=models.BooleanField(default=False, help_text='Set once the employer has opened the resume'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth import get_user_model
-from apps.jobs.models import Job
+from apps.jobs.models import Job, ChangeTrackingMixin
+from .storage import resume_storage
 
 User = get_user_model()
 
@@ -10,12 +11,59 @@ class Applicant(models.Model):
     def __str__(self):
         return self.user.username
 
-class Application(models.Model):
+class Application(ChangeTrackingMixin, models.Model):
     job = models.ForeignKey(Job, on_delete=models.CASCADE)
     applicant = models.ForeignKey(Applicant, on_delete=models.CASCADE)
-    resume = models.FileField(upload_to='resumes/')
+    resume = models.FileField(upload_to='resumes/', storage=resume_storage, db_index=True)
     cover_letter = models.TextField()
     applied_at = models.DateTimeField(auto_now_add=True)
+    is_reviewed = models.BooleanField(default=False, help_text="Set once the employer has opened the resume")
+
+    class Meta:
+        indexes = [
+            # Newest applications per job, used by the employer dashboard rollup.
+            models.Index(fields=['job', '-applied_at'], name='application_job_applied_idx'),
+        ]
 
     def __str__(self):
         return f"{self.applicant.user.username}'s application for {self.job.title}"
+
+
+class ResumeBlob(models.Model):
+    """A stored resume file, shared by every application that uploaded the same bytes."""
+    digest = models.CharField(max_length=64, unique=True, help_text="SHA-256 of the file content")
+    name = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ref_count', 'updated_at'], name='resume_blob_unreferenced_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
+class ResumeText(models.Model):
+    """Plain text extracted from an application's resume in the background."""
+    PENDING = 'pending'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+    application = models.OneToOneField(Application, on_delete=models.CASCADE, primary_key=True, related_name='resume_text')
+    text = models.TextField(blank=True)
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Resume text for application {self.application_id} ({self.status})"
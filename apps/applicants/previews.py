@@ -0,0 +1,166 @@
+"""
+Resume preview thumbnails.
+
+After an application commits, the first page of its resume is rendered once,
+in the resume extraction process pool, and saved as WebP at each of
+``PREVIEW_SIZES`` next to the resume itself (``resumes/ab/<digest>.sm.webp``).
+Resumes are content-addressed, so a file shared by many applications is
+rendered once, and a preview that exists is always up to date. Requests only
+ever read the finished files; nothing is rendered on demand.
+
+``render_previews`` runs in the worker processes and must not touch the
+database or Django settings.
+"""
+import hashlib
+import io
+import logging
+import os
+import tempfile
+
+from django.db import transaction
+
+from .extraction import UnsupportedFormat, get_pool, pool_size
+
+logger = logging.getLogger(__name__)
+
+# Preview name -> width in pixels.
+PREVIEW_SIZES = {
+    'sm': 160,
+    'lg': 640,
+}
+WEBP_QUALITY = 80
+
+
+# Runs in the worker processes ---------------------------------------------
+
+def _render_first_page(path, width):
+    # pypdfium2 is the renderer pdfplumber itself uses for page images.
+    import pypdfium2
+
+    document = pypdfium2.PdfDocument(path)
+    try:
+        if len(document) == 0:
+            raise UnsupportedFormat('The PDF has no pages')
+        page = document[0]
+        try:
+            return page.render(scale=width / page.get_width()).to_pil().convert('RGB')
+        finally:
+            page.close()
+    finally:
+        document.close()
+
+
+def render_previews(path, targets):
+    """
+    Render the first page of the PDF at ``path`` and write one WebP file per
+    ``{width: output path}`` entry of ``targets``.
+    """
+    if os.path.splitext(path)[1].lower() != '.pdf':
+        raise UnsupportedFormat('Previews are only rendered for PDFs')
+    image = _render_first_page(path, max(targets))
+    for width, target in sorted(targets.items(), reverse=True):
+        image.thumbnail((width, width * 4))
+        buffer = io.BytesIO()
+        image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                temp.write(buffer.getvalue())
+            os.replace(temp_path, target)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+# Runs in the web process ----------------------------------------------------
+
+def preview_name(resume_name, size):
+    return '%s.%s.webp' % (os.path.splitext(resume_name)[0], size)
+
+
+def preview_names(resume_name):
+    return [preview_name(resume_name, size) for size in PREVIEW_SIZES]
+
+
+def preview_version(resume_name):
+    """A short token that changes whenever the resume, and so its previews, change."""
+    return hashlib.blake2b(resume_name.encode('utf-8'), digest_size=6).hexdigest()
+
+
+def can_preview(resume_name):
+    return os.path.splitext(resume_name)[1].lower() == '.pdf'
+
+
+def has_previews(resume_name):
+    """
+    Whether every preview of ``resume_name`` has been rendered. A PDF may
+    still be queued, or may have failed to render (encrypted, corrupt).
+    """
+    from .storage import resume_storage
+
+    return can_preview(resume_name) and all(resume_storage.exists(name) for name in preview_names(resume_name))
+
+
+def preview_source(name):
+    """The resume a stored preview was rendered from, or None if ``name`` is not a preview."""
+    base, ext = os.path.splitext(name)
+    base, size = os.path.splitext(base)
+    if ext == '.webp' and size[1:] in PREVIEW_SIZES:
+        return base + '.pdf'
+    return None
+
+
+def missing_previews(resume_name):
+    """``{width: path}`` of the previews of ``resume_name`` not rendered yet."""
+    from .storage import resume_storage
+
+    if not can_preview(resume_name):
+        return {}
+    return {
+        width: resume_storage.path(preview_name(resume_name, size))
+        for size, width in PREVIEW_SIZES.items()
+        if not resume_storage.exists(preview_name(resume_name, size))
+    }
+
+
+def delete_previews(resume_name):
+    from .storage import resume_storage
+
+    for name in preview_names(resume_name):
+        resume_storage.delete(name)
+
+
+def schedule_previews(resume_name):
+    """Render the previews of ``resume_name`` after the current transaction commits."""
+    transaction.on_commit(lambda: submit(resume_name))
+
+
+def submit(resume_name):
+    from .storage import resume_storage
+
+    targets = missing_previews(resume_name)
+    if not targets:
+        return
+    path = resume_storage.path(resume_name)
+    if pool_size() == 0:
+        # Inline mode, for development and tests.
+        try:
+            render_previews(path, targets)
+        except Exception as exc:
+            _log_failure(resume_name, exc)
+        return
+    future = get_pool().submit(render_previews, path, targets)
+    future.add_done_callback(lambda f: _on_done(resume_name, f))
+
+
+def _on_done(resume_name, future):
+    exc = future.exception()
+    if exc is not None:
+        _log_failure(resume_name, exc)
+
+
+def _log_failure(resume_name, exc):
+    if isinstance(exc, UnsupportedFormat):
+        logger.info('No preview for %s: %s', resume_name, exc)
+    else:
+        logger.warning('Could not render a preview of %s: %s: %s', resume_name, type(exc).__name__, exc)
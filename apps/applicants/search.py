@@ -0,0 +1,54 @@
+"""
+Full-text index over applications, for employers searching their applicants.
+
+Each row holds the application's cover letter and extracted resume text and
+is scoped by ``job<id>`` and ``employer<id>`` tokens, so a search within one
+job or across one employer's jobs only ever touches that employer's rows.
+"""
+from apps.jobs.search import FullTextIndex
+
+application_index = FullTextIndex(
+    table='applicants_application_fts',
+    source_table='applicants_application',
+    columns={
+        'resume': 'A',
+        'cover_letter': 'B',
+    },
+    groups={
+        'text': ('resume', 'cover_letter'),
+    },
+    scoped=True,
+    store_text=True,
+)
+
+
+def job_scope(job_id):
+    return 'job%d' % job_id
+
+
+def employer_scope(employer_id):
+    return 'employer%d' % employer_id
+
+
+DOCUMENT_FIELDS = ('pk', 'cover_letter', 'job_id', 'job__posted_by_id', 'resume_text__text')
+
+
+def application_document(row):
+    """Index values for a row of ``DOCUMENT_FIELDS``."""
+    return {
+        'resume': row['resume_text__text'],
+        'cover_letter': row['cover_letter'],
+        'scope': '%s %s' % (job_scope(row['job_id']), employer_scope(row['job__posted_by_id'])),
+    }
+
+
+def index_application(pk):
+    from .models import Application
+
+    row = Application.objects.filter(pk=pk).values(*DOCUMENT_FIELDS).first()
+    if row is not None:
+        application_index.update(pk, application_document(row))
+
+
+def unindex_application(pk):
+    application_index.delete(pk)
@@ -0,0 +1,72 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.jobs.dashboard import invalidate_employer_dashboard
+from apps.jobs.counters import record_application_saved, record_application_deleted
+from .models import Application, ResumeText
+from .storage import acquire_blob, release_blob
+from .extraction import schedule_extraction
+from .previews import schedule_previews
+from .search import index_application, unindex_application
+
+
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+def invalidate_employer_dashboard_on_application_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_employer_dashboard(instance.job.posted_by_id)
+
+
+@receiver(post_save, sender=Application)
+def update_job_application_counts_on_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        record_application_saved(instance, created)
+
+
+@receiver(post_delete, sender=Application)
+def update_job_application_counts_on_delete(sender, instance, **kwargs):
+    record_application_deleted(instance)
+
+
+@receiver(post_save, sender=Application)
+def count_resume_references_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        acquire_blob(instance.resume.name)
+    elif instance.field_changed('resume'):
+        acquire_blob(instance.resume.name)
+        release_blob(instance._loaded_values['resume'])
+
+
+@receiver(post_delete, sender=Application)
+def release_resume_on_delete(sender, instance, **kwargs):
+    release_blob(instance.resume.name)
+
+
+@receiver(post_save, sender=Application)
+def extract_resume_text(sender, instance, created, raw=False, **kwargs):
+    if not raw and (created or instance.field_changed('resume')):
+        schedule_extraction(instance.pk, restart=not created)
+
+
+@receiver(post_save, sender=Application)
+def render_resume_previews(sender, instance, created, raw=False, **kwargs):
+    if not raw and (created or instance.field_changed('resume')):
+        schedule_previews(instance.resume.name)
+
+
+@receiver(post_save, sender=Application)
+def update_application_search_index(sender, instance, created, raw=False, **kwargs):
+    if not raw and (created or instance.field_changed('cover_letter')):
+        index_application(instance.pk)
+
+
+@receiver(post_save, sender=ResumeText)
+def index_extracted_resume_text(sender, instance, raw=False, **kwargs):
+    if not raw and instance.status == ResumeText.DONE:
+        index_application(instance.application_id)
+
+
+@receiver(post_delete, sender=Application)
+def remove_application_from_search_index(sender, instance, **kwargs):
+    unindex_application(instance.pk)
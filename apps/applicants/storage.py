@@ -0,0 +1,197 @@
+"""
+Content-addressed resume storage.
+
+Uploaded resumes are stored once per distinct content, under the SHA-256 of
+their bytes (``resumes/ab/abcdef....pdf``), so the same PDF sent with twenty
+applications occupies disk once and is only written the first time. A
+ResumeBlob row per file counts the applications referencing it; files whose
+count drops to zero are removed by the ``cleanup_resume_blobs`` command.
+
+Uploads are capped early by ``ResumeUploadHandler``, which stops accepting
+bytes for a resume field as soon as it exceeds ``RESUME_MAX_UPLOAD_SIZE``
+instead of spooling the whole request first.
+"""
+import hashlib
+import os
+import re
+import tempfile
+
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+RESUME_DIR = 'resumes'
+RESUME_FIELDS = ('resume',)
+CHUNK_SIZE = 64 * 1024
+
+BLOB_NAME_RE = re.compile(r'^%s/[0-9a-f]{2}/([0-9a-f]{64})(\.[a-z0-9]{1,10})?$' % RESUME_DIR)
+
+
+def max_upload_size():
+    return getattr(settings, 'RESUME_MAX_UPLOAD_SIZE', 5 * 1024 * 1024)
+
+
+def blob_name(digest, original_name):
+    ext = os.path.splitext(original_name)[1].lower()
+    if not re.fullmatch(r'\.[a-z0-9]{1,10}', ext):
+        ext = ''
+    return '%s/%s/%s%s' % (RESUME_DIR, digest[:2], digest, ext)
+
+
+def digest_from_name(name):
+    """The content hash a stored name was derived from, or None for legacy names."""
+    match = BLOB_NAME_RE.match(name or '')
+    return match.group(1) if match else None
+
+
+@deconstructible
+class ResumeStorage(FileSystemStorage):
+    """
+    A FileSystemStorage that ignores the requested name and stores content
+    under its hash. Saving content that is already stored writes nothing.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Names are content hashes: an existing file with the same name already
+        # holds exactly these bytes, so there is nothing to avoid.
+        return name
+
+    def _save(self, name, content):
+        limit = max_upload_size()
+        if hasattr(content, 'temporary_file_path') or isinstance(content, InMemoryUploadedFile):
+            return self._save_hashed_first(name, content, limit)
+        return self._save_streamed(name, content, limit)
+
+    def _hash(self, content, limit):
+        sha = hashlib.sha256()
+        size = 0
+        for chunk in content.chunks(CHUNK_SIZE):
+            size += len(chunk)
+            if size > limit:
+                raise ValueError('Resume exceeds the %d byte limit.' % limit)
+            sha.update(chunk)
+        return sha.hexdigest()
+
+    def _save_hashed_first(self, name, content, limit):
+        # The bytes are already on local disk or in memory: read them once to
+        # hash, and only move or write them if this content is new.
+        stored = blob_name(self._hash(content, limit), name)
+        if self.exists(stored):
+            return stored
+        path = self.path(stored)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if hasattr(content, 'temporary_file_path'):
+            # Same content either way if a concurrent upload got here first.
+            file_move_safe(content.temporary_file_path(), path, allow_overwrite=True)
+        else:
+            self._write_atomic(content, path)
+        self._apply_permissions(path)
+        return stored
+
+    def _save_streamed(self, name, content, limit):
+        # Unknown size: hash while spooling to a temporary file next to the
+        # blobs, then rename it into place (or drop it if the blob exists).
+        directory = self.path(RESUME_DIR)
+        os.makedirs(directory, exist_ok=True)
+        sha = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                for chunk in content.chunks(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > limit:
+                        raise ValueError('Resume exceeds the %d byte limit.' % limit)
+                    sha.update(chunk)
+                    temp.write(chunk)
+            stored = blob_name(sha.hexdigest(), name)
+            path = self.path(stored)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(temp_path, path)
+                self._apply_permissions(path)
+            return stored
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _write_atomic(self, content, path):
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                for chunk in content.chunks(CHUNK_SIZE):
+                    temp.write(chunk)
+            # A concurrent upload of the same file may win; both wrote the same bytes.
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _apply_permissions(self, path):
+        if self.file_permissions_mode is not None:
+            os.chmod(path, self.file_permissions_mode)
+
+
+resume_storage = ResumeStorage()
+
+
+class ResumeUploadHandler(FileUploadHandler):
+    """
+    Rejects oversized resumes while the request is still being read. Bytes
+    past the limit are discarded instead of handed to the next handler, and
+    the field name is recorded in ``request.oversized_uploads`` so the form
+    can report it.
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.field_name not in RESUME_FIELDS:
+            return raw_data
+        self.received += len(raw_data)
+        if self.received > max_upload_size():
+            if not hasattr(self.request, 'oversized_uploads'):
+                self.request.oversized_uploads = set()
+            self.request.oversized_uploads.add(self.field_name)
+            raise SkipFile()
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+def acquire_blob(name):
+    """Count one more reference to the blob stored as ``name``."""
+    from .models import ResumeBlob
+
+    digest = digest_from_name(name)
+    if digest is None:
+        return
+    # update() skips auto_now; the cleanup grace period counts from updated_at.
+    if ResumeBlob.objects.filter(digest=digest).update(ref_count=F('ref_count') + 1, updated_at=timezone.now()):
+        return
+    try:
+        with transaction.atomic():
+            ResumeBlob.objects.create(digest=digest, name=name, size=resume_storage.size(name), ref_count=1)
+    except IntegrityError:
+        # Another request created the row first.
+        ResumeBlob.objects.filter(digest=digest).update(ref_count=F('ref_count') + 1, updated_at=timezone.now())
+
+
+def release_blob(name):
+    """Drop one reference; unreferenced blobs are deleted later by cleanup."""
+    from .models import ResumeBlob
+
+    digest = digest_from_name(name)
+    if digest is not None:
+        ResumeBlob.objects.filter(digest=digest, ref_count__gt=0).update(
+            ref_count=F('ref_count') - 1, updated_at=timezone.now(),
+        )
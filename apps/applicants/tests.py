@@ -1,3 +1,271 @@
-from django.test import TestCase
+import csv
+import io
+import re
+import shutil
+import tempfile
+import zipfile
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.jobs.models import Employer, Job
+from apps.users.models import User
+from .downloads import RangeNotSatisfiable, parse_range
+from .export import MANIFEST_NAME, stream_applicants_zip
+from .models import Applicant, Application
+from .previews import preview_names
+from .views import APPLICANTS_PER_PAGE, ApplicantDashboardView
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, RESUME_EXTRACTION_WORKERS=0, SKILL_INDEX_WORKERS=0)
+class ApplicantsTestCase(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.employer_user = User.objects.create(username='employer', role='employer')
+        self.employer = Employer.objects.create(user=self.employer_user)
+        self.applicant_user = User.objects.create(username='applicant', role='applicant')
+        self.applicant = Applicant.objects.create(user=self.applicant_user)
+        self.job = self.make_job(0)
+        self.sequence = 0
+
+    def make_job(self, n):
+        return Job.objects.create(
+            title=f'Python developer {n}', company_name=f'Company {n}', location='Dhaka',
+            description='Build Django services.', requirements='Python, Django', posted_by=self.employer,
+        )
+
+    def apply(self, job, applicant=None):
+        self.sequence += 1
+        if applicant is None:
+            user = User.objects.create(username=f'candidate{self.sequence}', role='applicant',
+                                       first_name='Candidate', email=f'candidate{self.sequence}@example.com')
+            applicant = Applicant.objects.create(user=user)
+        # Run the background indexing (resume text, skills) inline, as a commit would.
+        with self.captureOnCommitCallbacks(execute=True):
+            return Application.objects.create(
+                job=job, applicant=applicant, cover_letter=f'I know Django and Python ({self.sequence}).',
+                resume=SimpleUploadedFile('resume.txt', f'Resume {self.sequence}: Python, Django'.encode()),
+            )
+
+
+class QueryCountTestCase(ApplicantsTestCase):
+    """The number of queries a page makes must not grow with the number of rows it shows."""
+
+    def count_queries(self, url):
+        self.client.get(url)  # warm per-process caches such as the match vectors
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def assertConstantQueries(self, url, add_rows, expected_rows):
+        few, response = self.count_queries(url)
+        self.assertEqual(len(response.context['applications']), expected_rows[0])
+        add_rows()
+        many, response = self.count_queries(url)
+        self.assertEqual(len(response.context['applications']), expected_rows[1])
+        self.assertEqual(few, many)
+
+
+class ApplicantDashboardQueryTests(QueryCountTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.applicant_user)
+        self.url = reverse('applicant_dashboard')
+
+    def add_applications(self, count):
+        for _ in range(count):
+            self.apply(self.make_job(self.sequence), self.applicant)
+
+    def test_query_count_does_not_grow_with_applications(self):
+        self.add_applications(2)
+        self.assertConstantQueries(self.url, lambda: self.add_applications(6), (2, 8))
+
+    def test_paginated(self):
+        self.add_applications(ApplicantDashboardView.paginate_by + 1)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context['applications']), ApplicantDashboardView.paginate_by)
+        self.assertEqual(response.context['application_count'], ApplicantDashboardView.paginate_by + 1)
+        response = self.client.get(self.url, {'cursor': response.context['page_obj'].next_cursor})
+        self.assertEqual(len(response.context['applications']), 1)
+
+
+class ViewApplicantsQueryTests(QueryCountTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.employer_user)
+        self.url = reverse('view_applicants', args=[self.job.pk])
+
+    def add_applications(self, count):
+        for _ in range(count):
+            self.apply(self.job)
+
+    def test_query_count_does_not_grow_with_applicants(self):
+        self.add_applications(2)
+        self.assertConstantQueries(self.url, lambda: self.add_applications(6), (2, 8))
+
+    def test_query_count_sorted_by_match(self):
+        self.add_applications(2)
+        self.assertConstantQueries(self.url + '?sort=match', lambda: self.add_applications(6), (2, 8))
+
+    def test_query_count_with_search_and_skill_filter(self):
+        self.add_applications(2)
+        url = self.url + '?q=django&skill=Python'
+        self.assertConstantQueries(url, lambda: self.add_applications(6), (2, 8))
+
+    def test_paginated(self):
+        self.add_applications(APPLICANTS_PER_PAGE + 1)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context['applications']), APPLICANTS_PER_PAGE)
+        self.assertEqual(response.context['page_obj'].paginator.count, APPLICANTS_PER_PAGE + 1)
+        response = self.client.get(self.url, {'page': 2, 'sort': 'match'})
+        self.assertEqual(len(response.context['applications']), 1)
+
+
+class ExportTests(ApplicantsTestCase):
+    def export(self, after_manifest=None):
+        """The exported archive; ``after_manifest`` runs between the manifest and the files."""
+        applications = Application.objects.filter(job=self.job)
+        manifest_chunks = applications.count() + 1  # one per row, one as the manifest closes
+        chunks = []
+        for chunk in stream_applicants_zip(applications):
+            chunks.append(chunk)
+            if len(chunks) == manifest_chunks and after_manifest:
+                after_manifest()
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+        manifest = list(csv.DictReader(io.StringIO(archive.read(MANIFEST_NAME).decode())))
+        return archive, manifest
+
+    def assertFilesMatchManifest(self, archive, manifest):
+        files = set(archive.namelist()) - {MANIFEST_NAME}
+        listed = {row['resume_file']: row for row in manifest if row['resume_file']}
+        self.assertLessEqual(files, set(listed))
+        for name in files:
+            # Each file belongs to the applicant its manifest row names.
+            sequence = re.search(r'\((\d+)\)', listed[name]['cover_letter']).group(1)
+            self.assertEqual(archive.read(name).decode(), f'Resume {sequence}: Python, Django')
+
+    def test_manifest_lists_every_file(self):
+        for _ in range(3):
+            self.apply(self.job)
+        missing = self.apply(self.job)
+        missing.resume.storage.delete(missing.resume.name)
+        archive, manifest = self.export()
+        self.assertEqual(len(manifest), 4)
+        self.assertEqual(manifest[3]['resume_file'], '')
+        self.assertEqual(len(archive.namelist()), 4)
+        self.assertFilesMatchManifest(archive, manifest)
+
+    def test_changes_during_the_export(self):
+        first, *_ = [self.apply(self.job) for _ in range(3)]
+
+        def change():
+            first.delete()
+            self.apply(self.job)
+        archive, manifest = self.export(after_manifest=change)
+        self.assertEqual(len(manifest), 3)
+        self.assertEqual(len(archive.namelist()), 3)
+        self.assertFilesMatchManifest(archive, manifest)
+
+
+class ResumeDownloadTests(ApplicantsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.application = self.apply(self.job)
+        self.content = b'Resume 1: Python, Django'
+        self.url = reverse('download_resume', args=[self.application.pk])
+
+    def download(self, user, **headers):
+        self.client.force_login(user)
+        return self.client.get(self.url, headers=headers)
+
+    def test_applicant_and_employer_can_download(self):
+        response = self.download(self.application.applicant.user)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertFalse(Application.objects.get(pk=self.application.pk).is_reviewed)
+        response = self.download(self.employer_user)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(Application.objects.get(pk=self.application.pk).is_reviewed)
+
+    def test_others_are_forbidden(self):
+        other_employer = User.objects.create(username='other-employer', role='employer')
+        Employer.objects.create(user=other_employer)
+        for user in (self.applicant_user, other_employer):
+            with self.subTest(user=user.username):
+                self.assertEqual(self.download(user).status_code, 403)
+
+    def test_range_requests(self):
+        user = self.application.applicant.user
+        response = self.download(user, Range='bytes=0-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 0-5/%d' % len(self.content))
+        self.assertEqual(b''.join(response.streaming_content), self.content[:6])
+
+        response = self.download(user, Range='bytes=-6')
+        self.assertEqual(b''.join(response.streaming_content), self.content[-6:])
+
+        response = self.download(user, Range='bytes=%d-' % len(self.content))
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */%d' % len(self.content))
+
+        # A range for another version of the file gets the whole file.
+        response = self.download(user, Range='bytes=0-5', **{'If-Range': '"stale"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_ranges(self):
+        cases = [
+            ('bytes=0-99', (0, 99)),
+            ('bytes=10-', (10, 99)),
+            ('bytes=90-500', (90, 99)),   # the end is clamped to the file
+            ('bytes=-10', (90, 99)),      # suffix: the last 10 bytes
+            ('bytes=-500', (0, 99)),      # a suffix longer than the file is all of it
+            ('bytes=0-0', (0, 0)),
+        ]
+        for header, expected in cases:
+            with self.subTest(header=header):
+                self.assertEqual(parse_range(header, 100), expected)
+
+    def test_whole_file(self):
+        for header in (None, '', 'bytes=-', 'bytes=0-1,5-9', 'items=0-9', 'bytes=a-b'):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_range(header, 100))
+
+    def test_not_satisfiable(self):
+        for header in ('bytes=100-', 'bytes=150-200', 'bytes=-0', 'bytes=9-5'):
+            with self.subTest(header=header):
+                with self.assertRaises(RangeNotSatisfiable):
+                    parse_range(header, 100)
+
+
+class ResumePreviewTests(ApplicantsTestCase):
+    def test_thumbnail_is_shown_once_rendered(self):
+        user = User.objects.create(username='candidate', role='applicant')
+        with self.assertLogs('apps.applicants.previews', 'WARNING'), self.captureOnCommitCallbacks(execute=True):
+            # Not a valid PDF, so rendering its previews fails.
+            application = Application.objects.create(
+                job=self.job, applicant=Applicant.objects.create(user=user), cover_letter='Hello',
+                resume=SimpleUploadedFile('resume.pdf', b'%PDF-1.4 truncated'),
+            )
+        preview_url = reverse('resume_preview', args=[application.pk, 'sm'])
+        self.client.force_login(self.employer_user)
+        page = reverse('view_applicants', args=[self.job.pk])
+        self.assertNotContains(self.client.get(page), preview_url)
+        self.assertEqual(self.client.get(preview_url).status_code, 404)
+
+        for name in preview_names(application.resume.name):
+            with open(application.resume.storage.path(name), 'wb') as preview:
+                preview.write(b'RIFF0000WEBP')
+        self.assertContains(self.client.get(page), preview_url)
+        self.assertEqual(self.client.get(preview_url).status_code, 200)
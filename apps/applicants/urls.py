@@ -1,8 +1,11 @@
 from django.urls import path
-from .views import ApplicationCreateView, ApplicantDashboardView, view_applicants
+from .views import ApplicationCreateView, ApplicantDashboardView, view_applicants, export_applicants, download_resume, resume_preview
 
 urlpatterns = [
     path('apply/<int:job_pk>/', ApplicationCreateView.as_view(), name='apply_job'),
     path('dashboard/', ApplicantDashboardView.as_view(), name='applicant_dashboard'),
     path('view/<int:job_pk>/', view_applicants, name='view_applicants'),
+    path('view/<int:job_pk>/export/', export_applicants, name='export_applicants'),
+    path('resume/<int:pk>/', download_resume, name='download_resume'),
+    path('resume/<int:pk>/preview/<slug:size>/', resume_preview, name='resume_preview'),
 ]
@@ -1,11 +1,31 @@
-from django.shortcuts import render, redirect
+import os
+from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import CreateView, ListView
 from .models import Application, Applicant
 from apps.jobs.models import Job
+from apps.jobs.pagination import KeysetPaginator, InvalidCursor
+from apps.jobs.counters import mark_reviewed
+from apps.jobs.dashboard import invalidate_employer_dashboard
 from .forms import ApplicationForm
+from apps.jobs.search import highlight_html
+from apps.matching.engine import top_jobs_for_applicant, application_scores_for_job
+from apps.matching.skills import application_ids_with_skills, known_skills, skill_counts_for_job
+from .search import application_index, job_scope, employer_scope
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.db.models import Count, Q
+from django.http import Http404, StreamingHttpResponse
+from urllib.parse import urlencode
+from django.utils import timezone
+from django.utils.text import slugify
+from .export import stream_applicants_zip
+from .downloads import serve_stored_file
+from .previews import PREVIEW_SIZES, can_preview, has_previews, preview_name, preview_version
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.core.exceptions import PermissionDenied
 
+APPLICANTS_PER_PAGE = 25
+
 class ApplicantRequiredMixin(UserPassesTestMixin):
     def test_func(self):
         return self.request.user.is_authenticated and self.request.user.role == 'applicant'
@@ -23,6 +43,11 @@ class ApplicationCreateView(LoginRequiredMixin, ApplicantRequiredMixin, CreateVi
     def get_success_url(self):
         return '/applicants/dashboard'
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['oversized_uploads'] = getattr(self.request, 'oversized_uploads', ())
+        return kwargs
+
     def form_valid(self, form):
         form.instance.applicant = Applicant.objects.get(user=self.request.user)
         form.instance.job = Job.objects.get(pk=self.kwargs['job_pk'])
@@ -32,10 +57,159 @@ class ApplicantDashboardView(LoginRequiredMixin, ApplicantRequiredMixin, ListVie
     model = Application
     template_name = 'applicants/applicant_dashboard.html'
     context_object_name = 'applications'
+    paginate_by = 10
+    ordering = ('-applied_at', '-id')
 
     def get_queryset(self):
-        return Application.objects.filter(applicant__user=self.request.user)
+        # The cards show job fields for every row: join the job in, without its large text columns.
+        return (Application.objects.filter(applicant__user=self.request.user)
+                .select_related('job').defer('job__description', 'job__requirements', 'job__minhash'))
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, self.get_ordering(), page_size)
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404('Invalid page cursor.')
+        return paginator, page, page.object_list, page.has_other_pages()
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        month_start = timezone.localtime().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        context.update(Application.objects.filter(applicant__user=self.request.user).aggregate(
+            application_count=Count('id'),
+            unreviewed_application_count=Count('id', filter=Q(is_reviewed=False)),
+            month_application_count=Count('id', filter=Q(applied_at__gte=month_start)),
+        ))
+        applicant = Applicant.objects.filter(user=self.request.user).first()
+        context['recommended_jobs'] = top_jobs_for_applicant(applicant, limit=5) if applicant else []
+        return context
+
+def get_owned_job(request, job_pk):
+    """The job ``job_pk``, provided the logged-in user is the employer who posted it."""
+    job = get_object_or_404(Job.objects.select_related('posted_by'), pk=job_pk)
+    if job.posted_by.user_id != request.user.pk:
+        raise PermissionDenied
+    return job
+
+@login_required
 def view_applicants(request, job_pk):
-    applications = Application.objects.filter(job_id=job_pk)
-    return render(request, 'applicants/view_applicants.html', {'applications': applications})
+    job = get_owned_job(request, job_pk)
+    query = request.GET.get('q', '').strip()
+    search_all = bool(query) and request.GET.get('scope') == 'all'
+    taxonomy = set(known_skills())
+    skills = [skill for skill in dict.fromkeys(request.GET.getlist('skill')) if skill in taxonomy]
+
+    applications = (Application.objects.select_related('applicant__user', 'job')
+                    .defer('job__description', 'job__requirements', 'job__minhash'))
+    if search_all:
+        applications = applications.filter(job__posted_by_id=job.posted_by_id)
+        scope = [employer_scope(job.posted_by_id)]
+    else:
+        applications = applications.filter(job_id=job_pk)
+        scope = [job_scope(job_pk)]
+    if skills:
+        applications = applications.filter(
+            pk__in=application_ids_with_skills(skills, job_id=None if search_all else job_pk)
+        )
+    ordering = ('-applied_at', '-id')
+    if query:
+        results = application_index.search(applications, scope=scope, snippet=True, text=query)
+        if results is None:
+            applications = applications.filter(
+                Q(cover_letter__icontains=query) | Q(resume_text__text__icontains=query)
+            )
+        else:
+            applications = results
+            ordering = ('-search_rank',) + ordering
+    applications = applications.order_by(*ordering)
+
+    sort_by_match = request.GET.get('sort') == 'match'
+    if sort_by_match:
+        # Match scores are not a column: rank every id (scores come from the
+        # in-memory vector index), then load only the rows of one page.
+        rows = list(applications.values_list('pk', 'job_id'))
+        scores = application_scores_for_job(job, [pk for pk, job_id in rows if job_id == job.pk])
+        ranked = sorted((pk for pk, _ in rows), key=lambda pk: scores.get(pk, 0), reverse=True)
+        page = Paginator(ranked, APPLICANTS_PER_PAGE).get_page(request.GET.get('page'))
+        found = applications.prefetch_related('skills').in_bulk(page.object_list)
+        page.object_list = [found[pk] for pk in page.object_list if pk in found]
+    else:
+        page = Paginator(applications.prefetch_related('skills'), APPLICANTS_PER_PAGE).get_page(request.GET.get('page'))
+        page.object_list = list(page.object_list)
+        scores = application_scores_for_job(job, [a.pk for a in page.object_list if a.job_id == job.pk])
+
+    for application in page.object_list:
+        application.match_score = round(scores[application.pk] * 100) if application.pk in scores else None
+        if has_previews(application.resume.name):
+            application.preview_version = preview_version(application.resume.name)
+        if getattr(application, 'search_snippet', None):
+            application.highlight = highlight_html(application.search_snippet)
+    skill_choices = skill_counts_for_job(job_pk)
+    skill_choices += [(skill, 0) for skill in skills if skill not in dict(skill_choices)]
+    filters = {'q': query, 'scope': 'all' if search_all else '', 'skill': skills}
+    filters = {key: value for key, value in filters.items() if value}
+    page_filters = dict(filters, sort='match') if sort_by_match else filters
+    return render(request, 'applicants/view_applicants.html', {
+        'applications': page.object_list,
+        'page_obj': page,
+        'page_query': urlencode(page_filters, doseq=True),
+        'job': job,
+        'query': query,
+        'search_all': search_all,
+        'selected_skills': skills,
+        'skill_choices': skill_choices,
+        'job_skills': set(job.skills.values_list('skill', flat=True)),
+        'filter_query': urlencode(filters, doseq=True),
+    })
+
+@login_required
+def export_applicants(request, job_pk):
+    """Download every applicant of a job as a ZIP of resumes plus a CSV manifest."""
+    job = get_owned_job(request, job_pk)
+    response = StreamingHttpResponse(
+        stream_applicants_zip(Application.objects.filter(job=job)), content_type='application/zip'
+    )
+    filename = 'applicants-%s-%s.zip' % (slugify(job.title) or job.pk, timezone.now().strftime('%Y%m%d'))
+    response['Content-Disposition'] = 'attachment; filename="%s"' % filename
+    return response
+
+def get_visible_application(request, pk):
+    """The application ``pk``, provided the logged-in user sent it or posted its job."""
+    application = get_object_or_404(
+        Application.objects.select_related('applicant__user', 'job__posted_by'), pk=pk
+    )
+    if request.user.pk not in (application.applicant.user_id, application.job.posted_by.user_id):
+        raise PermissionDenied
+    return application
+
+@login_required
+def download_resume(request, pk):
+    """A resume, for the applicant who sent it and the employer who posted the job."""
+    application = get_visible_application(request, pk)
+    if request.user.pk == application.job.posted_by.user_id and not application.is_reviewed:
+        mark_reviewed(application)
+        invalidate_employer_dashboard(application.job.posted_by_id)
+    user = application.applicant.user
+    extension = os.path.splitext(application.resume.name)[1].lower()
+    filename = 'resume-%s%s' % (slugify(user.get_full_name() or user.username) or application.pk, extension)
+    try:
+        return serve_stored_file(request, application.resume.storage, application.resume.name, filename)
+    except FileNotFoundError:
+        raise Http404('Resume file is missing.')
+
+@login_required
+def resume_preview(request, pk, size):
+    """A pre-rendered first-page thumbnail of a resume; never rendered on request."""
+    application = get_visible_application(request, pk)
+    name = application.resume.name
+    if size not in PREVIEW_SIZES or not can_preview(name):
+        raise Http404
+    versioned = request.GET.get('v') == preview_version(name)
+    try:
+        return serve_stored_file(
+            request, application.resume.storage, preview_name(name, size), 'preview-%s-%s.webp' % (pk, size),
+            max_age=365 * 24 * 3600 if versioned else 3600, immutable=versioned,
+        )
+    except FileNotFoundError:
+        raise Http404('The preview has not been rendered yet.')
@@ -1,20 +1,29 @@
 from django.contrib import admin
+from django.utils import timezone
 from .models import Job
+from .feed import schedule_homepage_feed_refresh
+from .detail import forget_job_versions
 
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
     list_display = ('title', 'company_name', 'posted_by', 'is_featured', 'posted_at')
-    list_filter = ('is_featured', 'posted_at', 'location')
+    list_filter = ('is_featured', 'posted_at', 'location', ('duplicate_of', admin.EmptyFieldListFilter))
     search_fields = ('title', 'company_name', 'description')
     list_editable = ('is_featured',)
+    raw_id_fields = ('duplicate_of',)
     actions = ['make_featured', 'remove_featured']
     
     def make_featured(self, request, queryset):
-        updated = queryset.update(is_featured=True)
+        updated = queryset.update(is_featured=True, updated_at=timezone.now())
+        # QuerySet.update() skips model signals, so refresh the feed and job versions explicitly.
+        schedule_homepage_feed_refresh()
+        forget_job_versions(list(queryset.values_list('pk', flat=True)))
         self.message_user(request, f'{updated} jobs marked as featured.')
     make_featured.short_description = "Mark selected jobs as featured"
     
     def remove_featured(self, request, queryset):
-        updated = queryset.update(is_featured=False)
+        updated = queryset.update(is_featured=False, updated_at=timezone.now())
+        schedule_homepage_feed_refresh()
+        forget_job_versions(list(queryset.values_list('pk', flat=True)))
         self.message_user(request, f'{updated} jobs removed from featured.')
     remove_featured.short_description = "Remove featured status from selected jobs"
@@ -0,0 +1,180 @@
+"""
+In-process typeahead index for job titles, companies and locations.
+
+Each field keeps a sorted list of lowercase keys searched with ``bisect``, so
+a suggestion lookup is a binary search plus a short scan and never touches the
+database. Every word of a value is indexed as a key, so "dev" suggests
+"Senior Django Developer". The index is built from the Job table on first use
+(or at worker start via ``warm()``) and patched by model signals once the
+transaction commits, so a rolled-back save leaves no suggestions behind;
+other workers notice changes through a version counter in the shared cache.
+Such a rebuild scans the whole table, so it runs on a background thread while
+requests keep using the old index until the new one is swapped in.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+FIELDS = {
+    'title': 'title',
+    'company': 'company_name',
+    'location': 'location',
+}
+VERSION_KEY = 'jobs:autocomplete:version'
+VERSION_CHECK_INTERVAL = 5  # seconds
+# Upper bound on staleness when the cache is per-process and versions never
+# propagate between workers.
+MAX_AGE = 600
+SCAN_LIMIT = 200  # keys examined per lookup before ranking
+
+
+def _keys(value):
+    words = value.lower().split()
+    return [' '.join(words[i:]) for i in range(len(words))]
+
+
+class PrefixIndex:
+    """A multiset of display values searchable by word prefix."""
+
+    def __init__(self):
+        self.keys = []  # sorted (key, display) pairs
+        self.counts = Counter()  # display -> number of jobs using it
+
+    def add(self, value):
+        value = (value or '').strip()
+        if not value:
+            return
+        self.counts[value] += 1
+        if self.counts[value] == 1:
+            for key in _keys(value):
+                insort(self.keys, (key, value))
+
+    def remove(self, value):
+        value = (value or '').strip()
+        if not self.counts.get(value):
+            return
+        self.counts[value] -= 1
+        if self.counts[value] == 0:
+            del self.counts[value]
+            for key in _keys(value):
+                i = bisect_left(self.keys, (key, value))
+                if i < len(self.keys) and self.keys[i] == (key, value):
+                    del self.keys[i]
+
+    def suggest(self, prefix, limit=8):
+        prefix = ' '.join(prefix.lower().split())
+        if not prefix:
+            return []
+        matches = set()
+        i = bisect_left(self.keys, (prefix,))
+        for key, value in self.keys[i:i + SCAN_LIMIT]:
+            if not key.startswith(prefix):
+                break
+            matches.add(value)
+        # Most used values first, then alphabetically.
+        return sorted(matches, key=lambda v: (-self.counts[v], v.lower()))[:limit]
+
+
+class AutocompleteIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes = None
+        self._version = None
+        self._checked_at = 0.0
+        self._built_at = 0.0
+        self._rebuilding = False
+
+    def _build(self):
+        from .models import Job
+
+        indexes = {name: PrefixIndex() for name in FIELDS}
+        for row in Job.objects.values_list(*FIELDS.values()).iterator(chunk_size=5000):
+            for name, value in zip(FIELDS, row):
+                indexes[name].add(value)
+        return indexes
+
+    def warm(self):
+        with self._lock:
+            cache.add(VERSION_KEY, 0, None)
+            self._version = cache.get(VERSION_KEY)
+            self._indexes = self._build()
+            self._checked_at = self._built_at = time.monotonic()
+
+    def _rebuild(self):
+        try:
+            # Read before the scan: a change committed during it bumps the
+            # version again and triggers another rebuild.
+            version = cache.get(VERSION_KEY)
+            indexes = self._build()
+            with self._lock:
+                self._indexes, self._version = indexes, version
+                self._built_at = time.monotonic()
+        except Exception:
+            logger.exception('Could not rebuild the autocomplete index')
+        finally:
+            self._rebuilding = False
+            connections.close_all()
+
+    def _ensure_current(self):
+        if self._indexes is None:
+            # Nothing to serve yet: build in this request.
+            self.warm()
+            return
+        now = time.monotonic()
+        if now - self._checked_at < VERSION_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        if cache.get(VERSION_KEY) != self._version or now - self._built_at > MAX_AGE:
+            # Another worker changed jobs; this one only saw its own edits.
+            with self._lock:
+                if self._rebuilding:
+                    return
+                self._rebuilding = True
+            threading.Thread(target=self._rebuild, name='autocomplete-rebuild', daemon=True).start()
+
+    def suggest(self, field, prefix, limit=8):
+        self._ensure_current()
+        return self._indexes[field].suggest(prefix, limit)
+
+    def _bump_version(self):
+        try:
+            version = cache.incr(VERSION_KEY)
+        except ValueError:
+            version = 1
+            cache.set(VERSION_KEY, version, None)
+        # If another worker bumped the version in between, our index is missing
+        # its change; leaving the version unknown forces a rebuild on next use.
+        self._version = version if self._version is not None and version == self._version + 1 else None
+
+    def _apply(self, removed, added):
+        """Patch the index with ``(field, value)`` pairs and announce the change."""
+        with self._lock:
+            if self._indexes is not None:
+                for name, value in removed:
+                    self._indexes[name].remove(value)
+                for name, value in added:
+                    self._indexes[name].add(value)
+            self._bump_version()
+
+    def job_saved(self, job, created):
+        changed = [name for name, attr in FIELDS.items() if created or job.field_changed(attr)]
+        if not changed:
+            return
+        # Read the values now; the instance may change before the commit.
+        removed = [] if created else [(name, job._loaded_values[FIELDS[name]]) for name in changed]
+        added = [(name, getattr(job, FIELDS[name])) for name in changed]
+        transaction.on_commit(lambda: self._apply(removed, added))
+
+    def job_deleted(self, job):
+        removed = [(name, getattr(job, attr)) for name, attr in FIELDS.items()]
+        transaction.on_commit(lambda: self._apply(removed, []))
+
+
+autocomplete_index = AutocompleteIndex()
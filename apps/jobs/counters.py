@@ -0,0 +1,129 @@
+"""
+Per-job application counters.
+
+Each job carries its total and unreviewed application counts, and
+JobDailyApplicationCount holds applications per job per day. All of them are
+adjusted by +/-1 with F() expressions as applications are created, reviewed
+and deleted, so reading them never counts applications. ``reconcile``
+recomputes everything from the applications table and repairs only the rows
+that drifted.
+"""
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from .models import COUNTER_FIELDS, Job, JobDailyApplicationCount
+
+
+def _adjust(value, delta):
+    # Never below zero: a counter that drifted low is repaired by reconcile().
+    return Greatest(F(value) + delta, Value(0))
+
+
+def _bump_day(job_id, day, delta):
+    key = {'job_id': job_id, 'day': day}
+    if JobDailyApplicationCount.objects.filter(**key).update(application_count=_adjust('application_count', delta)):
+        return
+    if delta > 0:
+        try:
+            with transaction.atomic():
+                JobDailyApplicationCount.objects.create(application_count=delta, **key)
+        except IntegrityError:
+            # Another request created the row first.
+            JobDailyApplicationCount.objects.filter(**key).update(application_count=F('application_count') + delta)
+
+
+def _apply(application, delta, unreviewed_delta):
+    updates = {'application_count': _adjust('application_count', delta)}
+    if unreviewed_delta:
+        updates['unreviewed_application_count'] = _adjust('unreviewed_application_count', unreviewed_delta)
+    Job.objects.filter(pk=application.job_id).update(**updates)
+    _bump_day(application.job_id, timezone.localdate(application.applied_at), delta)
+
+
+def record_application_saved(application, created):
+    if created:
+        _apply(application, 1, 0 if application.is_reviewed else 1)
+    elif application.field_changed('is_reviewed'):
+        delta = -1 if application.is_reviewed else 1
+        Job.objects.filter(pk=application.job_id).update(
+            unreviewed_application_count=_adjust('unreviewed_application_count', delta)
+        )
+
+
+def record_application_deleted(application):
+    _apply(application, -1, 0 if application.is_reviewed else -1)
+
+
+def mark_reviewed(application):
+    """Flag ``application`` as reviewed, once; returns whether it changed."""
+    from apps.applicants.models import Application
+
+    # Only the request that flips the flag adjusts the counter.
+    if not Application.objects.filter(pk=application.pk, is_reviewed=False).update(is_reviewed=True):
+        return False
+    application.is_reviewed = True
+    Job.objects.filter(pk=application.job_id).update(
+        unreviewed_application_count=_adjust('unreviewed_application_count', -1)
+    )
+    return True
+
+
+def recent_application_counts(job_ids, days):
+    """Applications received in the last ``days`` days per job, from the daily rollup."""
+    since = timezone.localdate() - timedelta(days=days - 1)
+    rows = (JobDailyApplicationCount.objects.filter(job_id__in=job_ids, day__gte=since)
+            .values('job_id').annotate(n=Sum('application_count')).order_by())
+    return {row['job_id']: row['n'] for row in rows}
+
+
+def reconcile(dry_run=False, batch_size=1000):
+    """
+    Recompute the job counters and the daily rollup from the applications
+    table and write back only what differs. Returns how many rows of each
+    kind were (or, with ``dry_run``, would be) repaired.
+    """
+    from apps.applicants.models import Application
+
+    totals = {
+        row['job_id']: (row['total'], row['unreviewed'])
+        for row in Application.objects.values('job_id').annotate(
+            total=Count('id'), unreviewed=Count('id', filter=Q(is_reviewed=False)),
+        ).order_by()
+    }
+    jobs = []
+    for job in Job.objects.only(*COUNTER_FIELDS).iterator(chunk_size=batch_size):
+        expected = totals.get(job.pk, (0, 0))
+        if (job.application_count, job.unreviewed_application_count) != expected:
+            job.application_count, job.unreviewed_application_count = expected
+            jobs.append(job)
+
+    expected_days = {
+        (row['job_id'], row['day']): row['n']
+        for row in Application.objects.annotate(day=TruncDate('applied_at'))
+        .values('job_id', 'day').annotate(n=Count('id')).order_by()
+    }
+    changed, stale = [], []
+    for row in JobDailyApplicationCount.objects.iterator(chunk_size=batch_size):
+        n = expected_days.pop((row.job_id, row.day), 0)
+        if n == 0:
+            stale.append(row.pk)
+        elif n != row.application_count:
+            row.application_count = n
+            changed.append(row)
+    missing = [
+        JobDailyApplicationCount(job_id=job_id, day=day, application_count=n)
+        for (job_id, day), n in expected_days.items()
+    ]
+
+    if not dry_run:
+        with transaction.atomic():
+            Job.objects.bulk_update(jobs, COUNTER_FIELDS, batch_size=batch_size)
+            JobDailyApplicationCount.objects.bulk_update(changed, ['application_count'], batch_size=batch_size)
+            for start in range(0, len(stale), batch_size):
+                JobDailyApplicationCount.objects.filter(pk__in=stale[start:start + batch_size]).delete()
+            JobDailyApplicationCount.objects.bulk_create(missing, batch_size=batch_size)
+    return {'jobs': len(jobs), 'days_changed': len(changed), 'days_added': len(missing), 'days_removed': len(stale)}
@@ -0,0 +1,73 @@
+"""
+Cached employer dashboard rollup.
+
+Per-job application totals are the counters kept on each job, recent counts
+come from the daily rollup (see ``apps.jobs.counters``), and the latest and
+newest applications from indexed queries, so nothing counts applications.
+The result is cached per employer and dropped after commits that add,
+remove or change that employer's jobs or applications, so a dashboard hit
+normally costs a single cache read however many applications exist.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+DASHBOARD_KEY = 'jobs:employer_dashboard:%s'
+# Also bounds how stale the "last 7 days" counts can get.
+DASHBOARD_TIMEOUT = 300
+RECENT_DAYS = 7
+ACTIVITY_SIZE = 5
+
+
+def build_employer_dashboard(employer_id):
+    from apps.applicants.models import Application
+    from .counters import recent_application_counts
+    from .models import Job
+
+    latest = Application.objects.filter(job=OuterRef('pk')).order_by('-applied_at').values('applied_at')[:1]
+    jobs = list(
+        Job.objects.filter(posted_by_id=employer_id)
+        .defer('requirements', 'minhash')
+        .annotate(latest_application_at=Subquery(latest))
+        .order_by('-posted_at', '-id')
+    )
+    recent = recent_application_counts([job.pk for job in jobs], RECENT_DAYS)
+    for job in jobs:
+        job.recent_application_count = recent.get(job.pk, 0)
+    activity = [
+        {
+            'applicant': application.applicant.user.get_full_name() or application.applicant.user.username,
+            'job_id': application.job_id,
+            'job_title': application.job.title,
+            'applied_at': application.applied_at,
+        }
+        for application in Application.objects.filter(job__posted_by_id=employer_id)
+        .select_related('applicant__user', 'job')
+        .only('applied_at', 'job__title', 'applicant__user__username',
+              'applicant__user__first_name', 'applicant__user__last_name')
+        .order_by('-applied_at')[:ACTIVITY_SIZE]
+    ]
+    return {
+        'jobs': jobs,
+        'job_count': len(jobs),
+        'featured_count': sum(job.is_featured for job in jobs),
+        'application_count': sum(job.application_count for job in jobs),
+        'unreviewed_application_count': sum(job.unreviewed_application_count for job in jobs),
+        'recent_application_count': sum(job.recent_application_count for job in jobs),
+        'recent_days': RECENT_DAYS,
+        'activity': activity,
+    }
+
+
+def get_employer_dashboard(employer_id):
+    key = DASHBOARD_KEY % employer_id
+    dashboard = cache.get(key)
+    if dashboard is None:
+        dashboard = build_employer_dashboard(employer_id)
+        cache.set(key, dashboard, DASHBOARD_TIMEOUT)
+    return dashboard
+
+
+def invalidate_employer_dashboard(employer_id):
+    """Drop the cached rollup once the current transaction commits."""
+    transaction.on_commit(lambda: cache.delete(DASHBOARD_KEY % employer_id))
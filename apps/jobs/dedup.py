@@ -0,0 +1,168 @@
+"""
+Near-duplicate job detection with MinHash and locality-sensitive hashing.
+
+Each job's title, company and description are reduced to a set of word
+3-shingles and summarised by a MinHash signature of ``NUM_PERM`` values; the
+fraction of equal positions in two signatures estimates the Jaccard
+similarity of their shingle sets. The signature is cut into ``BANDS`` bands
+of ``ROWS`` values and every band is hashed into a JobLSHBucket row, so the
+candidates for a new posting are the jobs sharing at least one bucket: an
+indexed lookup whose cost depends on the number of near matches, not on the
+size of the table. With 16 bands of 4 rows, pairs at 0.8 similarity collide
+in some band ~99.9% of the time and pairs at 0.3 only ~12% of the time.
+"""
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+DUPLICATE_THRESHOLD = 0.8  # estimated Jaccard similarity
+SIGNATURE_FIELDS = ('title', 'company_name', 'description')
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+# Fixed seed: signatures are stored, so the permutations must never change.
+_random = np.random.RandomState(20240607)
+_A = _random.randint(1, 2 ** 31 - 1, size=NUM_PERM).astype(np.uint64)
+_B = _random.randint(0, 2 ** 31 - 1, size=NUM_PERM).astype(np.uint64)
+
+
+def shingles(text):
+    tokens = TOKEN_RE.findall((text or '').lower())
+    if len(tokens) <= SHINGLE_SIZE:
+        return {' '.join(tokens)} if tokens else set()
+    return {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    """Return the MinHash signature of ``text`` as a ``uint32`` array, or None for empty text."""
+    values = shingles(text)
+    if not values:
+        return None
+    x = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in values), dtype=np.uint64, count=len(values))
+    # a < 2**31 and x < 2**32, so a * x + b cannot overflow 64 bits.
+    hashes = (np.outer(x, _A) + _B) % _PRIME & _MAX_HASH
+    return hashes.min(axis=0).astype('<u4')
+
+
+def job_text(job):
+    return ' '.join(filter(None, (getattr(job, name) for name in SIGNATURE_FIELDS)))
+
+
+def job_signature(job):
+    signature = minhash(job_text(job))
+    return None if signature is None else signature.tobytes()
+
+
+def unpack(signature):
+    return np.frombuffer(bytes(signature), dtype='<u4')
+
+
+def similarity(a, b):
+    return float(np.mean(unpack(a) == unpack(b)))
+
+
+def band_buckets(signature):
+    """``(band, bucket)`` pairs for a packed signature."""
+    values = unpack(signature)
+    buckets = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(values[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, 'big', signed=True)))
+    return buckets
+
+
+def index_job_signature(job):
+    """Replace the LSH bucket rows of ``job`` with those of its current signature."""
+    from .models import JobLSHBucket
+
+    JobLSHBucket.objects.filter(job=job).delete()
+    if job.minhash:
+        JobLSHBucket.objects.bulk_create(
+            JobLSHBucket(job=job, band=band, bucket=bucket) for band, bucket in band_buckets(job.minhash)
+        )
+
+
+def find_duplicates(job, threshold=DUPLICATE_THRESHOLD, queryset=None):
+    """
+    Existing jobs whose estimated similarity to ``job`` (saved or not) is at
+    least ``threshold``, most similar first, each annotated with
+    ``similarity``.
+    """
+    from django.db.models import Q
+    from .models import Job, JobLSHBucket
+
+    signature = job.minhash or job_signature(job)
+    if not signature:
+        return []
+    condition = Q()
+    for band, bucket in band_buckets(signature):
+        condition |= Q(band=band, bucket=bucket)
+    candidate_ids = JobLSHBucket.objects.filter(condition).values('job_id')
+    candidates = (queryset if queryset is not None else Job.objects.all()).filter(pk__in=candidate_ids)
+    if job.pk is not None:
+        candidates = candidates.exclude(pk=job.pk)
+
+    duplicates = []
+    for candidate in candidates.select_related('posted_by'):
+        candidate.similarity = similarity(signature, candidate.minhash)
+        if candidate.similarity >= threshold:
+            duplicates.append(candidate)
+    duplicates.sort(key=lambda j: (-j.similarity, j.posted_at, j.pk))
+    return duplicates
+
+
+def cluster_duplicates(threshold=DUPLICATE_THRESHOLD):
+    """
+    Group every job into clusters of near-duplicates. Returns a list of
+    clusters (lists of job ids, oldest first) with more than one member.
+
+    Only jobs that share a bucket are ever compared, and a pair already known
+    to be in the same cluster is skipped.
+    """
+    from .models import Job, JobLSHBucket
+
+    signatures = dict(Job.objects.exclude(minhash=None).values_list('pk', 'minhash').iterator(chunk_size=5000))
+    parent = {}
+
+    def find(x):
+        root = x
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while x != root:
+            parent[x], x = root, parent.get(x, x)
+        return root
+
+    def scan(group):
+        for i, a in enumerate(group):
+            for b in group[i + 1:]:
+                root_a, root_b = find(a), find(b)
+                if root_a != root_b and similarity(signatures[a], signatures[b]) >= threshold:
+                    parent.setdefault(root_a, root_a)
+                    parent[root_b] = root_a
+
+    rows = JobLSHBucket.objects.order_by('band', 'bucket', 'job_id').values_list('band', 'bucket', 'job_id')
+    current, group = None, []
+    for band, bucket, job_id in rows.iterator(chunk_size=5000):
+        if (band, bucket) != current:
+            scan(group)
+            current, group = (band, bucket), []
+        if job_id in signatures:
+            group.append(job_id)
+    scan(group)
+
+    clusters = {}
+    for job_id in parent:
+        clusters.setdefault(find(job_id), []).append(job_id)
+    order = dict(Job.objects.filter(pk__in=parent).values_list('pk', 'posted_at'))
+    return [
+        sorted(members, key=lambda pk: (order[pk], pk))
+        for members in clusters.values() if len(members) > 1
+    ]
@@ -0,0 +1,74 @@
+"""
+Conditional GET and caching for job detail pages.
+
+Every job has a version, its ``updated_at`` timestamp, kept in the cache so
+the ETag/Last-Modified check of a detail request needs no query. On a
+version match the browser or proxy gets a 304; otherwise the job instance
+and the rendered page body are looked up under keys that include the
+version, so a save makes old entries unreachable instead of having to find
+and delete them.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db import transaction
+
+JOB_VERSION_KEY = 'jobs:job_version:%s'
+JOB_KEY = 'jobs:job:%s:%s'
+# Rendered body fragments only hold relative dates ("posted 3 days ago"),
+# so they need not live long.
+JOB_DETAIL_TIMEOUT = 3600
+
+
+def get_job_version(pk):
+    """The job's ``updated_at``, or None when it does not exist."""
+    from .models import Job
+
+    key = JOB_VERSION_KEY % pk
+    version = cache.get(key)
+    if version is None:
+        version = Job.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+        if version is not None:
+            cache.set(key, version, JOB_DETAIL_TIMEOUT)
+    return version
+
+
+def get_cached_job(pk, version):
+    from .models import Job
+
+    key = JOB_KEY % (pk, version.timestamp())
+    job = cache.get(key)
+    if job is None:
+        # The signature is a memoryview on PostgreSQL, which cannot be pickled.
+        job = Job.objects.defer('minhash').filter(pk=pk).first()
+        if job is not None and job.updated_at == version:
+            cache.set(key, job, JOB_DETAIL_TIMEOUT)
+    return job
+
+
+def job_saved(job):
+    """Publish the new version once the save commits."""
+    transaction.on_commit(lambda: cache.set(JOB_VERSION_KEY % job.pk, job.updated_at, JOB_DETAIL_TIMEOUT))
+
+
+def job_deleted(pk):
+    forget_job_versions([pk])
+
+
+def forget_job_versions(pks):
+    """For changes that bypass ``save()``, e.g. ``QuerySet.update()``."""
+    keys = [JOB_VERSION_KEY % pk for pk in pks]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def job_detail_etag(request, pk, **kwargs):
+    version = get_job_version(pk)
+    if version is None:
+        return None
+    # The page also shows who is logged in and embeds their CSRF token.
+    parts = [pk, version.timestamp(), request.user.pk or 0, request.META.get('CSRF_COOKIE', '')]
+    return hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def job_detail_last_modified(request, pk, **kwargs):
+    return get_job_version(pk)
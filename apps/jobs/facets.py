@@ -0,0 +1,158 @@
+"""
+Location and company facet counts for the job search.
+
+Counts live in rollup tables (JobFacetCount for each dimension on its own,
+JobFacetPairCount for location x company) that are adjusted by +/-1 with F()
+expressions as jobs are created, edited and deleted. Reading facets is then
+an indexed lookup on a small table instead of a GROUP BY over every job.
+
+Searches by company and location are answered from the pair table too, by
+matching the search words against its values as word prefixes. A keyword search cannot be,
+so its facets are counted over the best ``FACET_SCAN_LIMIT`` matches only.
+"""
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F
+
+from .models import JobFacetCount, JobFacetPairCount
+from .search import tokenize
+
+FACET_LIMIT = 10
+# Keyword searches count facets over at most this many of the best matches.
+FACET_SCAN_LIMIT = 2000
+
+
+def _bump(model, delta, **key):
+    if not model.objects.filter(**key).update(job_count=F('job_count') + delta) and delta > 0:
+        try:
+            with transaction.atomic():
+                model.objects.create(job_count=delta, **key)
+        except IntegrityError:
+            # Another request created the row first.
+            model.objects.filter(**key).update(job_count=F('job_count') + delta)
+
+
+def _apply(location, company_name, delta):
+    _bump(JobFacetCount, delta, facet=JobFacetCount.LOCATION, value=location)
+    _bump(JobFacetCount, delta, facet=JobFacetCount.COMPANY, value=company_name)
+    _bump(JobFacetPairCount, delta, location=location, company_name=company_name)
+
+
+def record_job_saved(job, created):
+    if created:
+        _apply(job.location, job.company_name, 1)
+    elif job.field_changed('location') or job.field_changed('company_name'):
+        loaded = job._loaded_values
+        _apply(loaded['location'], loaded['company_name'], -1)
+        _apply(job.location, job.company_name, 1)
+
+
+def record_job_deleted(job):
+    _apply(job.location, job.company_name, -1)
+
+
+def rebuild_facets():
+    """Recompute every rollup row from the jobs table."""
+    from .models import Job
+
+    pairs = list(Job.objects.values('location', 'company_name').annotate(n=Count('id')).order_by())
+    totals = {}
+    for row in pairs:
+        for facet, value in ((JobFacetCount.LOCATION, row['location']), (JobFacetCount.COMPANY, row['company_name'])):
+            totals[facet, value] = totals.get((facet, value), 0) + row['n']
+    with transaction.atomic():
+        JobFacetPairCount.objects.all().delete()
+        JobFacetCount.objects.all().delete()
+        JobFacetPairCount.objects.bulk_create(
+            JobFacetPairCount(location=row['location'], company_name=row['company_name'], job_count=row['n'])
+            for row in pairs
+        )
+        JobFacetCount.objects.bulk_create(
+            JobFacetCount(facet=facet, value=value, job_count=n) for (facet, value), n in totals.items()
+        )
+    return len(totals)
+
+
+def facet_counts(location=None, company=None, limit=FACET_LIMIT):
+    """
+    Facet counts from the rollup tables, given the selected location and
+    company facets (if any). Each dimension is counted under the other
+    dimension's selection, so picking a location narrows the company counts
+    and vice versa.
+    """
+    if company:
+        locations = JobFacetPairCount.objects.filter(company_name=company).values_list('location', 'job_count')
+    else:
+        locations = JobFacetCount.objects.filter(facet=JobFacetCount.LOCATION).values_list('value', 'job_count')
+    if location:
+        companies = JobFacetPairCount.objects.filter(location=location).values_list('company_name', 'job_count')
+    else:
+        companies = JobFacetCount.objects.filter(facet=JobFacetCount.COMPANY).values_list('value', 'job_count')
+    return {
+        'location': list(locations.filter(job_count__gt=0).order_by('-job_count')[:limit]),
+        'company': list(companies.filter(job_count__gt=0).order_by('-job_count')[:limit]),
+    }
+
+
+def _matches_words(value, tokens, phrase):
+    """
+    Whether ``value`` matches the search words the way the full-text index
+    does: each word is the prefix of a word in ``value``, and on SQLite (where
+    the words are searched as a phrase) they follow each other in order.
+    """
+    words = tokenize(value)
+    if not phrase:
+        return all(any(word.startswith(token) for word in words) for token in tokens)
+    return any(
+        all(word.startswith(token) for word, token in zip(words[start:], tokens))
+        for start in range(len(words) - len(tokens) + 1)
+    )
+
+
+def facet_counts_for_search(location_text=None, company_text=None, location=None, company=None, limit=FACET_LIMIT):
+    """
+    Facet counts from the pair table for a search by location and/or company:
+    the pairs whose values match the words searched for as the full-text index
+    matches them (word prefixes, not substrings, so "erlin" finds neither the
+    jobs nor the facets for Berlin). The index also stems words and folds
+    diacritics, which this does not; the counts can then miss a pair, but never
+    show one the search did not find. Each dimension is counted under the
+    other's selection, as in ``facet_counts``.
+    """
+    searched = [('location', tokenize(location_text)), ('company_name', tokenize(company_text))]
+    pairs = JobFacetPairCount.objects.filter(job_count__gt=0)
+    for field, tokens in searched:
+        # A substring match narrows the rows in SQL; words are checked below.
+        for token in tokens:
+            pairs = pairs.filter(**{'%s__icontains' % field: token})
+    phrase = connection.vendor == 'sqlite'
+    rows = [
+        row for row in pairs.values_list('location', 'company_name', 'job_count')
+        if all(_matches_words(row[0] if field == 'location' else row[1], tokens, phrase)
+               for field, tokens in searched if tokens)
+    ]
+
+    def top(index, selected):
+        counts = {}
+        for row in rows:
+            if not selected or row[1 - index] == selected:
+                counts[row[index]] = counts.get(row[index], 0) + row[2]
+        return sorted(counts.items(), key=lambda item: -item[1])[:limit]
+    return {
+        'location': top(0, company),
+        'company': top(1, location),
+    }
+
+
+def facet_counts_for_queryset(queryset, limit=FACET_LIMIT, scan_limit=FACET_SCAN_LIMIT):
+    """
+    Facet counts for an already narrowed queryset (e.g. a keyword search),
+    grouped over its first ``scan_limit`` rows in the queryset's order, so a
+    broad search does not group every match.
+    """
+    matches = queryset.model.objects.filter(pk__in=queryset.values('pk')[:scan_limit])
+
+    def top(field):
+        return list(
+            matches.order_by().values_list(field).annotate(n=Count('pk')).order_by('-n')[:limit]
+        )
+    return {'location': top('location'), 'company': top('company_name')}
@@ -0,0 +1,58 @@
+"""
+Precomputed homepage feed.
+
+The homepage shows the newest featured jobs topped up with the newest regular
+jobs, plus the number of featured jobs. That is built once, kept in the cache
+and rebuilt after commits that could change it, so a homepage hit normally
+costs a single cache read.
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+HOMEPAGE_FEED_KEY = 'jobs:homepage_feed'
+HOMEPAGE_FEED_SIZE = 6
+# Safety net for per-process caches (LocMemCache), where a refresh in one
+# worker is invisible to the others.
+HOMEPAGE_FEED_TIMEOUT = 600
+
+
+def build_homepage_feed(size=HOMEPAGE_FEED_SIZE):
+    from .models import Job
+
+    ordering = ('-posted_at', '-id')
+    # The signature is a memoryview on PostgreSQL, which cannot be pickled into the cache.
+    queryset = Job.objects.defer('minhash').order_by(*ordering)
+    jobs = list(queryset.filter(is_featured=True)[:size])
+    if len(jobs) < size:
+        jobs += list(queryset.filter(is_featured=False)[:size - len(jobs)])
+    return {
+        'jobs': jobs,
+        'job_ids': {job.pk for job in jobs},
+        'featured_count': Job.objects.filter(is_featured=True).count(),
+    }
+
+
+def refresh_homepage_feed():
+    feed = build_homepage_feed()
+    cache.set(HOMEPAGE_FEED_KEY, feed, HOMEPAGE_FEED_TIMEOUT)
+    return feed
+
+
+def get_homepage_feed():
+    feed = cache.get(HOMEPAGE_FEED_KEY)
+    if feed is None:
+        feed = refresh_homepage_feed()
+    return feed
+
+
+def schedule_homepage_feed_refresh():
+    """Rebuild the feed once the current transaction commits."""
+    transaction.on_commit(refresh_homepage_feed)
+
+
+def affects_homepage_feed(job, created=False):
+    """Whether saving ``job`` could change what the homepage shows."""
+    if created or job.field_changed('is_featured'):
+        return True
+    feed = cache.get(HOMEPAGE_FEED_KEY)
+    return feed is None or job.pk in feed['job_ids']
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.jobs.dedup import DUPLICATE_THRESHOLD, cluster_duplicates, index_job_signature, job_signature
+from apps.jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Cluster near-duplicate jobs and point each duplicate at the earliest posting of its cluster'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=DUPLICATE_THRESHOLD,
+                            help='Minimum estimated similarity (0-1) for two jobs to be duplicates')
+        parser.add_argument('--dry-run', action='store_true', help='Report clusters without saving them')
+
+    def handle(self, *args, **options):
+        # Jobs created through bulk_create or raw SQL have no signature yet.
+        missing = Job.objects.filter(minhash=None).only('title', 'company_name', 'description')
+        for job in missing.iterator(chunk_size=2000):
+            job.minhash = job_signature(job)
+            if job.minhash is not None:
+                Job.objects.filter(pk=job.pk).update(minhash=job.minhash)
+                index_job_signature(job)
+
+        clusters = cluster_duplicates(options['threshold'])
+        duplicates = sum(len(cluster) - 1 for cluster in clusters)
+        if options['dry_run']:
+            for cluster in clusters:
+                self.stdout.write(f'{cluster[0]}: {", ".join(map(str, cluster[1:]))}')
+            self.stdout.write(f'{len(clusters)} clusters, {duplicates} duplicate jobs (not saved).')
+            return
+
+        with transaction.atomic():
+            Job.objects.exclude(duplicate_of=None).update(duplicate_of=None)
+            for cluster in clusters:
+                Job.objects.filter(pk__in=cluster[1:]).update(duplicate_of=cluster[0])
+        self.stdout.write(self.style.SUCCESS(f'Found {len(clusters)} clusters, {duplicates} duplicate jobs.'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps.jobs.facets import rebuild_facets
+
+
+class Command(BaseCommand):
+    help = 'Recompute the location and company facet counts from the jobs table'
+
+    def handle(self, *args, **options):
+        count = rebuild_facets()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} facet values.'))
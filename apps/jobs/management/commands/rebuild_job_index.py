@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.jobs.models import Job
+from apps.jobs.search import job_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for job postings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if not job_index.is_supported():
+            raise CommandError('Full-text search is not supported on this database backend.')
+
+        batch_size = options['batch_size']
+        columns = list(job_index.columns)
+        total = 0
+        with transaction.atomic():
+            job_index.clear()
+            batch = []
+            for row in Job.objects.values_list('pk', *columns).iterator(chunk_size=batch_size):
+                batch.append((row[0], dict(zip(columns, row[1:]))))
+                if len(batch) >= batch_size:
+                    job_index.bulk_insert(batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                job_index.bulk_insert(batch)
+                total += len(batch)
+        job_index.optimize()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} jobs.'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from apps.jobs.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = ('Recompute per-job application counters and daily rollups from the applications table '
+            'and repair any that drifted')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without repairing it')
+
+    def handle(self, *args, **options):
+        repaired = reconcile(dry_run=options['dry_run'], batch_size=options['batch_size'])
+        verb = 'Would repair' if options['dry_run'] else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {repaired['jobs']} job counters; daily rollups: {repaired['days_changed']} changed, "
+            f"{repaired['days_added']} added, {repaired['days_removed']} removed."
+        ))
@@ -0,0 +1,72 @@
+from django.db import migrations
+
+# The index as it was created here, frozen so later changes to
+# apps.jobs.search do not change what this migration does.
+COLUMNS = ('title', 'requirements', 'description', 'company_name', 'location')
+
+SQLITE_CREATE = [
+    ('CREATE VIRTUAL TABLE "jobs_job_fts" USING fts5(title, requirements, description, company_name, location, '
+     "tokenize='porter unicode61 remove_diacritics 2')", None),
+    ('INSERT INTO "jobs_job_fts"("jobs_job_fts", rank) VALUES (\'rank\', %s)', ['bm25(10.0, 4.0, 2.0, 10.0, 10.0)']),
+]
+SQLITE_INSERT = (
+    'INSERT INTO "jobs_job_fts"(rowid, title, requirements, description, company_name, location) '
+    'VALUES (%s, %s, %s, %s, %s, %s)'
+)
+SQLITE_PARAMS = COLUMNS
+
+POSTGRES_CREATE = [
+    ('CREATE TABLE "jobs_job_fts" (rowid bigint PRIMARY KEY REFERENCES "jobs_job" (id) ON DELETE CASCADE '
+     'DEFERRABLE INITIALLY DEFERRED, "keywords" tsvector NOT NULL, "company" tsvector NOT NULL, '
+     '"location" tsvector NOT NULL)', None),
+    ('CREATE INDEX "jobs_job_fts_keywords_gin" ON "jobs_job_fts" USING gin ("keywords")', None),
+    ('CREATE INDEX "jobs_job_fts_company_gin" ON "jobs_job_fts" USING gin ("company")', None),
+    ('CREATE INDEX "jobs_job_fts_location_gin" ON "jobs_job_fts" USING gin ("location")', None),
+]
+POSTGRES_INSERT = (
+    'INSERT INTO "jobs_job_fts" (rowid, "keywords", "company", "location") VALUES (%s, '
+    "setweight(to_tsvector('english', %s), 'A') || setweight(to_tsvector('english', %s), 'C') || "
+    "setweight(to_tsvector('english', %s), 'B'), "
+    "setweight(to_tsvector('english', %s), 'A'), setweight(to_tsvector('english', %s), 'A')) "
+    'ON CONFLICT (rowid) DO UPDATE SET "keywords" = EXCLUDED."keywords", "company" = EXCLUDED."company", '
+    '"location" = EXCLUDED."location"'
+)
+POSTGRES_PARAMS = ('title', 'description', 'requirements', 'company_name', 'location')
+
+STATEMENTS = {
+    'sqlite': (SQLITE_CREATE, SQLITE_INSERT, SQLITE_PARAMS),
+    'postgresql': (POSTGRES_CREATE, POSTGRES_INSERT, POSTGRES_PARAMS),
+}
+
+
+def create_job_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in STATEMENTS:
+        return
+    create, insert, params = STATEMENTS[vendor]
+    for sql, sql_params in create:
+        schema_editor.execute(sql, sql_params)
+    Job = apps.get_model('jobs', 'Job')
+    rows = [
+        [job['pk']] + [job[column] or '' for column in params]
+        for job in Job.objects.using(schema_editor.connection.alias).values('pk', *COLUMNS)
+    ]
+    if rows:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(insert, rows)
+
+
+def drop_job_index(apps, schema_editor):
+    if schema_editor.connection.vendor in STATEMENTS:
+        schema_editor.execute('DROP TABLE IF EXISTS "jobs_job_fts"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_job_requirements'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_job_index, drop_job_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_job_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['-posted_at', '-id'], name='job_posted_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:16
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_facets(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    JobFacetCount = apps.get_model('jobs', 'JobFacetCount')
+    JobFacetPairCount = apps.get_model('jobs', 'JobFacetPairCount')
+    pairs = Job.objects.values('location', 'company_name').annotate(n=Count('id')).order_by()
+    totals = {}
+    for row in pairs:
+        for facet, value in (('location', row['location']), ('company', row['company_name'])):
+            totals[facet, value] = totals.get((facet, value), 0) + row['n']
+    JobFacetPairCount.objects.bulk_create(
+        JobFacetPairCount(location=row['location'], company_name=row['company_name'], job_count=row['n'])
+        for row in pairs
+    )
+    JobFacetCount.objects.bulk_create(
+        JobFacetCount(facet=facet, value=value, job_count=n) for (facet, value), n in totals.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_job_posted_at_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('location', 'Location'), ('company', 'Company')], max_length=20)),
+                ('value', models.CharField(max_length=100)),
+                ('job_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JobFacetPairCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', models.CharField(max_length=100)),
+                ('company_name', models.CharField(max_length=100)),
+                ('job_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['location'], name='job_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['company_name'], name='job_company_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobfacetcount',
+            index=models.Index(fields=['facet', '-job_count'], name='job_facet_count_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='jobfacetcount',
+            constraint=models.UniqueConstraint(fields=('facet', 'value'), name='unique_job_facet_value'),
+        ),
+        migrations.AddIndex(
+            model_name='jobfacetpaircount',
+            index=models.Index(fields=['company_name'], name='job_facet_pair_company_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='jobfacetpaircount',
+            constraint=models.UniqueConstraint(fields=('location', 'company_name'), name='unique_job_facet_pair'),
+        ),
+        migrations.RunPython(populate_facets, migrations.RunPython.noop),
+    ]
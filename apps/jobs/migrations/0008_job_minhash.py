@@ -0,0 +1,94 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:27
+
+import hashlib
+import re
+import zlib
+
+import django.db.models.deletion
+import numpy as np
+from django.db import migrations, models
+
+# apps.jobs.dedup as of this migration, frozen so that later changes to it
+# do not change what this migration stores.
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_random = np.random.RandomState(20240607)
+_A = _random.randint(1, 2 ** 31 - 1, size=NUM_PERM).astype(np.uint64)
+_B = _random.randint(0, 2 ** 31 - 1, size=NUM_PERM).astype(np.uint64)
+
+
+def job_signature(job):
+    text = ' '.join(filter(None, (job.title, job.company_name, job.description)))
+    tokens = TOKEN_RE.findall(text.lower())
+    if len(tokens) <= SHINGLE_SIZE:
+        shingles = {' '.join(tokens)} if tokens else set()
+    else:
+        shingles = {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    if not shingles:
+        return None
+    x = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+    hashes = (np.outer(x, _A) + _B) % _PRIME & _MAX_HASH
+    return hashes.min(axis=0).astype('<u4').tobytes()
+
+
+def band_buckets(signature):
+    values = np.frombuffer(bytes(signature), dtype='<u4')
+    buckets = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(values[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, 'big', signed=True)))
+    return buckets
+
+
+def populate_signatures(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    JobLSHBucket = apps.get_model('jobs', 'JobLSHBucket')
+    buckets = []
+    for job in Job.objects.only('title', 'company_name', 'description').iterator(chunk_size=2000):
+        job.minhash = job_signature(job)
+        if job.minhash is None:
+            continue
+        Job.objects.filter(pk=job.pk).update(minhash=job.minhash)
+        buckets.extend(JobLSHBucket(job_id=job.pk, band=band, bucket=bucket) for band, bucket in band_buckets(job.minhash))
+        if len(buckets) >= 5000:
+            JobLSHBucket.objects.bulk_create(buckets)
+            buckets = []
+    JobLSHBucket.objects.bulk_create(buckets)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_job_facets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, help_text='Earliest posting this job is a near-duplicate of', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='jobs.job'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='minhash',
+            field=models.BinaryField(help_text='MinHash signature used for near-duplicate detection', null=True),
+        ),
+        migrations.CreateModel(
+            name='JobLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='jobs.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'bucket'], name='job_lsh_bucket_idx')],
+            },
+        ),
+        migrations.RunPython(populate_signatures, migrations.RunPython.noop),
+    ]
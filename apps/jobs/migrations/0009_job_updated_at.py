@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:40
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_posted_at(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Job.objects.update(updated_at=F('posted_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_job_minhash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_posted_at, migrations.RunPython.noop),
+    ]
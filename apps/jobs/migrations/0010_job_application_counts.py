@@ -0,0 +1,60 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def populate_counts(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Application = apps.get_model('applicants', 'Application')
+    JobDailyApplicationCount = apps.get_model('jobs', 'JobDailyApplicationCount')
+
+    def count(**filters):
+        counts = (Application.objects.filter(job=OuterRef('pk'), **filters).order_by().values('job')
+                  .annotate(n=Count('id')).values('n'))
+        return Coalesce(Subquery(counts), 0)
+
+    Job.objects.update(application_count=count(), unreviewed_application_count=count(is_reviewed=False))
+    JobDailyApplicationCount.objects.bulk_create(
+        (JobDailyApplicationCount(job_id=row['job_id'], day=row['day'], application_count=row['n'])
+         for row in Application.objects.annotate(day=TruncDate('applied_at'))
+         .values('job_id', 'day').annotate(n=Count('id')).order_by()),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applicants', '0007_application_is_reviewed'),
+        ('jobs', '0009_job_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='application_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='unreviewed_application_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='JobDailyApplicationCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('application_count', models.PositiveIntegerField(default=0)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_application_counts', to='jobs.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='job_daily_application_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('job', 'day'), name='unique_job_daily_application_count')],
+            },
+        ),
+        migrations.RunPython(populate_counts, migrations.RunPython.noop),
+    ]
@@ -10,7 +10,31 @@ class Employer(models.Model):
     def __str__(self):
         return self.user.username
 
-class Job(models.Model):
+COUNTER_FIELDS = ('application_count', 'unreviewed_application_count')
+
+
+class ChangeTrackingMixin:
+    """Lets post_save handlers ask which fields a save changed."""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded state so signal handlers can tell what a save changed.
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = {f.attname: getattr(self, f.attname) for f in self._meta.concrete_fields}
+
+    def field_changed(self, name):
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None or name not in loaded:
+            return False
+        return loaded[name] != getattr(self, name)
+
+
+class Job(ChangeTrackingMixin, models.Model):
     title = models.CharField(max_length=100)
     company_name = models.CharField(max_length=100)
     location = models.CharField(max_length=100)
@@ -18,7 +42,115 @@ class Job(models.Model):
     requirements = models.TextField(blank=True, null=True, help_text="Job requirements and qualifications")
     posted_by = models.ForeignKey(Employer, on_delete=models.CASCADE)
     posted_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     is_featured = models.BooleanField(default=False, help_text="Mark this job as featured to display it prominently")
+    minhash = models.BinaryField(null=True, editable=False, help_text="MinHash signature used for near-duplicate detection")
+    duplicate_of = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='duplicates',
+        help_text="Earliest posting this job is a near-duplicate of",
+    )
+    # Maintained with F() updates by apps.jobs.counters; save() re-reads them first.
+    application_count = models.PositiveIntegerField(default=0, editable=False)
+    unreviewed_application_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # Backs keyset pagination of the job list on (posted_at, id).
+            models.Index(fields=['-posted_at', '-id'], name='job_posted_at_id_idx'),
+            models.Index(fields=['location'], name='job_location_idx'),
+            models.Index(fields=['company_name'], name='job_company_name_idx'),
+        ]
 
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        from .dedup import SIGNATURE_FIELDS, job_signature
+
+        if kwargs.get('update_fields') is None and (
+            self.pk is None or self.minhash is None or any(self.field_changed(f) for f in SIGNATURE_FIELDS)
+        ):
+            self.minhash = job_signature(self)
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Don't write back counters loaded before concurrent applications
+            # arrived. A row deleted meanwhile is re-inserted, as usual.
+            current = type(self)._base_manager.filter(pk=self.pk).values_list(*COUNTER_FIELDS).first()
+            if current is not None:
+                for name, value in zip(COUNTER_FIELDS, current):
+                    setattr(self, name, value)
+        super().save(*args, **kwargs)
+
+
+class JobFacetCount(models.Model):
+    """Number of jobs per location or per company, maintained incrementally."""
+    LOCATION = 'location'
+    COMPANY = 'company'
+    FACET_CHOICES = (
+        (LOCATION, 'Location'),
+        (COMPANY, 'Company'),
+    )
+    facet = models.CharField(max_length=20, choices=FACET_CHOICES)
+    value = models.CharField(max_length=100)
+    job_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['facet', 'value'], name='unique_job_facet_value'),
+        ]
+        indexes = [
+            models.Index(fields=['facet', '-job_count'], name='job_facet_count_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.facet}={self.value} ({self.job_count})"
+
+
+class JobFacetPairCount(models.Model):
+    """Number of jobs per (location, company), used to intersect the two facets."""
+    location = models.CharField(max_length=100)
+    company_name = models.CharField(max_length=100)
+    job_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['location', 'company_name'], name='unique_job_facet_pair'),
+        ]
+        indexes = [
+            models.Index(fields=['company_name'], name='job_facet_pair_company_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.location} / {self.company_name} ({self.job_count})"
+
+
+class JobLSHBucket(models.Model):
+    """One band of a job's MinHash signature, hashed; jobs sharing a bucket are duplicate candidates."""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='lsh_buckets')
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['band', 'bucket'], name='job_lsh_bucket_idx'),
+        ]
+
+    def __str__(self):
+        return f"job {self.job_id} band {self.band}"
+
+
+class JobDailyApplicationCount(models.Model):
+    """Applications received by a job per day, maintained incrementally."""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='daily_application_counts')
+    day = models.DateField()
+    application_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'day'], name='unique_job_daily_application_count'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='job_daily_application_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"job {self.job_id} on {self.day} ({self.application_count})"
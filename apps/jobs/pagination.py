@@ -0,0 +1,164 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are addressed by the sort key of their boundary row rather than by an
+offset, so fetching page 500 costs the same index range scan as page 1 and
+never loads more than ``per_page + 1`` rows. Cursors are signed so clients
+cannot forge arbitrary filter values.
+"""
+import datetime
+import json
+
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+CURSOR_SALT = 'apps.jobs.pagination'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class KeysetPage:
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return self.paginator.encode_cursor(self.object_list[-1], 'next')
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return self.paginator.encode_cursor(self.object_list[0], 'previous')
+        return None
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` by ``ordering``, a sequence of field or annotation
+    names (prefixed with ``-`` for descending) whose last entry must be unique,
+    e.g. ``('-posted_at', '-id')``.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = int(per_page)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def encode_cursor(self, obj, direction):
+        values = [getattr(obj, field) for field in self.fields]
+        return signing.dumps(
+            {'d': direction, 'v': values}, salt=CURSOR_SALT, serializer=_CursorSerializer, compress=True
+        )
+
+    def decode_cursor(self, cursor):
+        try:
+            data = signing.loads(cursor, salt=CURSOR_SALT, serializer=_CursorSerializer)
+            direction, raw_values = data['d'], data['v']
+        except (signing.BadSignature, KeyError, TypeError):
+            raise InvalidCursor('Invalid cursor.')
+        if direction not in ('next', 'previous') or len(raw_values) != len(self.fields):
+            raise InvalidCursor('Invalid cursor.')
+        try:
+            values = [self._to_python(field, value) for field, value in zip(self.fields, raw_values)]
+        except ValidationError:
+            raise InvalidCursor('Invalid cursor.')
+        return direction, values
+
+    def _to_python(self, name, value):
+        try:
+            field = self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Annotations such as a search rank are plain JSON numbers.
+            return value
+        return field.to_python(value)
+
+    def _seek(self, values, forward):
+        # (a, b, c) after (x, y, z) == a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z),
+        # with each comparison flipped for descending columns.
+        condition = Q()
+        for i, name in enumerate(self.ordering):
+            descending = name.startswith('-')
+            lookup = 'lt' if descending == forward else 'gt'
+            clause = Q(**{'%s__%s' % (self.fields[i], lookup): values[i]})
+            for j in range(i):
+                clause &= Q(**{self.fields[j]: values[j]})
+            condition |= clause
+        return condition
+
+    def page(self, cursor=None):
+        direction, values = ('next', None) if not cursor else self.decode_cursor(cursor)
+        forward = direction == 'next'
+
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, forward))
+        if forward:
+            queryset = queryset.order_by(*self.ordering)
+        else:
+            queryset = queryset.order_by(*[_reverse(name) for name in self.ordering])
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if forward:
+            return KeysetPage(rows, self, has_next=has_more, has_previous=values is not None)
+        rows.reverse()
+        return KeysetPage(rows, self, has_next=True, has_previous=has_more)
+
+    def estimated_count(self, limit=1000):
+        """
+        Count matching rows, stopping at ``limit``. Returns ``(count, exact)``;
+        when ``exact`` is False there are at least ``count`` rows.
+        """
+        count = self.queryset.order_by()[:limit + 1].count()
+        if count > limit:
+            return limit, False
+        return count, True
+
+
+def _reverse(name):
+    return name[1:] if name.startswith('-') else '-' + name
+
+
+class _CursorEncoder(json.JSONEncoder):
+    # Unlike DjangoJSONEncoder this keeps full microsecond precision, which
+    # the seek predicate needs to land exactly on the boundary row.
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.date)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class _CursorSerializer:
+    def dumps(self, obj):
+        return _CursorEncoder(separators=(',', ':')).encode(obj).encode('latin-1')
+
+    def loads(self, data):
+        return json.loads(data.decode('latin-1'))
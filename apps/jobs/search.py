@@ -0,0 +1,307 @@
+"""
+Full-text search backed by an FTS5 virtual table on SQLite or a tsvector
+side table on PostgreSQL.
+
+An index mirrors a few text columns of a model in a separate table keyed by
+the model's primary key, so searches join against the index instead of
+scanning the base table with LIKE. Other database backends are reported as
+unsupported and callers fall back to plain ``icontains`` filtering.
+
+A scoped index also stores scope tokens per row (e.g. ``job12 employer3``)
+in an unranked column, so restricting a search to one scope is part of the
+index lookup rather than a filter applied to every match afterwards.
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.models import FloatField, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# PostgreSQL weight letters, mirrored as bm25 column weights on SQLite so both
+# backends rank matches on the same columns the same way.
+BM25_WEIGHTS = {'A': 10.0, 'B': 4.0, 'C': 2.0, 'D': 1.0}
+
+PG_CONFIG = 'english'
+
+SCOPE_COLUMN = 'scope'
+
+# Snippets are marked with control characters rather than HTML so the indexed
+# text can be escaped before the markers are turned into <mark> tags.
+HIGHLIGHT_START, HIGHLIGHT_END = '\x02', '\x03'
+
+
+def tokenize(text):
+    """Split user input into lowercase search terms, dropping punctuation."""
+    return [token.lower() for token in TOKEN_RE.findall(text or '')]
+
+
+def highlight_html(snippet):
+    """Escape a ``search_snippet`` and wrap its matched terms in ``<mark>``."""
+    html = escape(snippet or '')
+    return mark_safe(html.replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>'))
+
+
+class FullTextIndex:
+    """
+    A full-text index over ``columns`` of ``source_table``.
+
+    ``columns`` maps each indexed column to its weight letter (A is the most
+    important, D the least). ``groups`` maps the names callers search by to
+    the columns each one covers, e.g. ``{'keywords': ('title', 'description')}``.
+
+    With ``scoped`` the index has an extra ``scope`` column of exact-match
+    tokens that ``search(scope=...)`` restricts on. With ``store_text`` the
+    PostgreSQL side table also keeps the raw text (FTS5 always does), which
+    ``search(snippet=True)`` needs to highlight matches.
+    """
+
+    def __init__(self, table, source_table, columns, groups, scoped=False, store_text=False):
+        self.table = table
+        self.source_table = source_table
+        self.columns = dict(columns)
+        self.groups = {name: tuple(cols) for name, cols in groups.items()}
+        self.scoped = scoped
+        self.store_text = store_text
+
+    @property
+    def fts5_columns(self):
+        return list(self.columns) + ([SCOPE_COLUMN] if self.scoped else [])
+
+    @property
+    def pg_columns(self):
+        columns = list(self.groups) + ([SCOPE_COLUMN] if self.scoped else [])
+        if self.store_text:
+            columns += ['%s_text' % column for column in self.columns]
+        return columns
+
+    def is_supported(self, vendor=None):
+        return (vendor or connection.vendor) in ('sqlite', 'postgresql')
+
+    # Schema -----------------------------------------------------------------
+
+    def create(self, schema_editor):
+        vendor = schema_editor.connection.vendor
+        qn = schema_editor.quote_name
+        if vendor == 'sqlite':
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE %s USING fts5(%s, tokenize='porter unicode61 remove_diacritics 2')"
+                % (qn(self.table), ', '.join(self.fts5_columns))
+            )
+            weights = [str(BM25_WEIGHTS[w]) for w in self.columns.values()]
+            if self.scoped:
+                weights.append('0.0')  # scope tokens never contribute to the rank
+            weights = ', '.join(weights)
+            schema_editor.execute(
+                "INSERT INTO %s(%s, rank) VALUES ('rank', %%s)" % (qn(self.table), qn(self.table)),
+                ['bm25(%s)' % weights],
+            )
+        elif vendor == 'postgresql':
+            group_columns = ', '.join(
+                '%s %s NOT NULL' % (qn(column), 'text' if column.endswith('_text') else 'tsvector')
+                for column in self.pg_columns
+            )
+            schema_editor.execute(
+                'CREATE TABLE %s (rowid bigint PRIMARY KEY REFERENCES %s (id) ON DELETE CASCADE '
+                'DEFERRABLE INITIALLY DEFERRED, %s)' % (qn(self.table), qn(self.source_table), group_columns)
+            )
+            if self.scoped:
+                schema_editor.execute(
+                    'CREATE INDEX %s ON %s USING gin (%s)'
+                    % (qn('%s_%s_gin' % (self.table, SCOPE_COLUMN)), qn(self.table), qn(SCOPE_COLUMN))
+                )
+            for group in self.groups:
+                schema_editor.execute(
+                    'CREATE INDEX %s ON %s USING gin (%s)'
+                    % (qn('%s_%s_gin' % (self.table, group)), qn(self.table), qn(group))
+                )
+
+    def drop(self, schema_editor):
+        if self.is_supported(schema_editor.connection.vendor):
+            schema_editor.execute('DROP TABLE IF EXISTS %s' % schema_editor.quote_name(self.table))
+
+    # Writes -----------------------------------------------------------------
+
+    def _pg_vector_sql(self, group):
+        parts = [
+            "setweight(to_tsvector('%s', %%s), '%s')" % (PG_CONFIG, self.columns[column])
+            for column in self.groups[group]
+        ]
+        return ' || '.join(parts)
+
+    def _row_params(self, pk, values):
+        if connection.vendor == 'sqlite':
+            return [pk] + [values.get(column) or '' for column in self.fts5_columns]
+        params = [pk]
+        for group, cols in self.groups.items():
+            params.extend(values.get(column) or '' for column in cols)
+        if self.scoped:
+            params.append(values.get(SCOPE_COLUMN) or '')
+        if self.store_text:
+            params.extend(values.get(column) or '' for column in self.columns)
+        return params
+
+    def _insert_sql(self):
+        qn = connection.ops.quote_name
+        if connection.vendor == 'sqlite':
+            return 'INSERT INTO %s(rowid, %s) VALUES (%s)' % (
+                qn(self.table), ', '.join(self.fts5_columns), ', '.join(['%s'] * (len(self.fts5_columns) + 1))
+            )
+        values = [self._pg_vector_sql(g) for g in self.groups]
+        if self.scoped:
+            values.append("to_tsvector('simple', %s)")
+        if self.store_text:
+            values.extend(['%s'] * len(self.columns))
+        columns = self.pg_columns
+        return 'INSERT INTO %s (rowid, %s) VALUES (%%s, %s) ON CONFLICT (rowid) DO UPDATE SET %s' % (
+            qn(self.table),
+            ', '.join(qn(c) for c in columns),
+            ', '.join(values),
+            ', '.join('%s = EXCLUDED.%s' % (qn(c), qn(c)) for c in columns),
+        )
+
+    def update(self, pk, values):
+        """Insert or replace the indexed document for ``pk``."""
+        if not self.is_supported():
+            return
+        with transaction.atomic(), connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute('DELETE FROM %s WHERE rowid = %%s' % connection.ops.quote_name(self.table), [pk])
+            cursor.execute(self._insert_sql(), self._row_params(pk, values))
+
+    def bulk_insert(self, rows):
+        """Insert ``(pk, values)`` pairs into an index known not to contain them."""
+        if not self.is_supported():
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(self._insert_sql(), [self._row_params(pk, values) for pk, values in rows])
+
+    def delete(self, pk):
+        if not self.is_supported():
+            return
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM %s WHERE rowid = %%s' % connection.ops.quote_name(self.table), [pk])
+
+    def clear(self):
+        if not self.is_supported():
+            return
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM %s' % connection.ops.quote_name(self.table))
+
+    def optimize(self):
+        """Merge index segments (SQLite) or refresh planner statistics (PostgreSQL)."""
+        qn = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute("INSERT INTO %s(%s) VALUES ('optimize')" % (qn(self.table), qn(self.table)))
+            elif connection.vendor == 'postgresql':
+                cursor.execute('ANALYZE %s' % qn(self.table))
+
+    # Queries ----------------------------------------------------------------
+
+    def _fts5_expression(self, terms, scope):
+        clauses = []
+        for group, tokens in terms.items():
+            phrase = ' '.join('"%s"*' % token for token in tokens)
+            clauses.append('{%s} : (%s)' % (' '.join(self.groups[group]), phrase))
+        if scope:
+            # Exact tokens, no prefix match: job1 must not match job12.
+            clauses.append('{%s} : (%s)' % (SCOPE_COLUMN, ' OR '.join('"%s"' % token for token in scope)))
+        return ' AND '.join(clauses)
+
+    def search(self, queryset, scope=None, snippet=False, **terms):
+        """
+        Restrict ``queryset`` to rows matching every given group and annotate
+        each row with ``search_rank`` (higher is better).
+
+        Each keyword argument names a group and carries the raw user input for
+        it; all of its terms must match as prefixes. ``scope`` (scoped indexes
+        only) is a list of scope tokens of which a row must carry at least one.
+        With ``snippet`` rows are also annotated with ``search_snippet``, an
+        excerpt around the matches for ``highlight_html``. Returns ``None``
+        when the database has no full-text support so the caller can fall back.
+        """
+        if not self.is_supported():
+            return None
+        terms = {group: tokenize(text) for group, text in terms.items()}
+        terms = {group: tokens for group, tokens in terms.items() if tokens}
+        scope = [token for token in scope or () if token.isalnum()]
+        if not terms:
+            queryset = queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+            if snippet:
+                queryset = queryset.annotate(search_snippet=Value('', output_field=TextField()))
+            return queryset
+
+        qn = connection.ops.quote_name
+        table = qn(self.table)
+        join = '%s.rowid = %s.%s' % (table, qn(self.source_table), qn('id'))
+        annotations = {}
+        if connection.vendor == 'sqlite':
+            queryset = queryset.extra(
+                tables=[self.table],
+                where=[join, '%s MATCH %%s' % table],
+                params=[self._fts5_expression(terms, scope)],
+            )
+            annotations['search_rank'] = RawSQL('-%s.rank' % table, (), output_field=FloatField())
+            if snippet:
+                annotations['search_snippet'] = RawSQL(
+                    "snippet(%s, -1, %%s, %%s, '…', 24)" % table, (HIGHLIGHT_START, HIGHLIGHT_END),
+                    output_field=TextField(),
+                )
+        else:
+            where, rank_sql, params, queries = [join], [], [], []
+            tsquery = "to_tsquery('%s', %%s)" % PG_CONFIG
+            for group, tokens in terms.items():
+                query = ' & '.join('%s:*' % token for token in tokens)
+                where.append('%s.%s @@ %s' % (table, qn(group), tsquery))
+                rank_sql.append('ts_rank(%s.%s, %s)' % (table, qn(group), tsquery))
+                params.append(query)
+                queries.append(query)
+            rank_params = list(params)
+            if scope:
+                where.append("%s.%s @@ to_tsquery('simple', %%s)" % (table, qn(SCOPE_COLUMN)))
+                params.append(' | '.join(scope))
+            queryset = queryset.extra(tables=[self.table], where=where, params=params)
+            annotations['search_rank'] = RawSQL(' + '.join(rank_sql), rank_params, output_field=FloatField())
+            if snippet:
+                text = " || ' … ' || ".join('%s.%s' % (table, qn('%s_text' % column)) for column in self.columns)
+                annotations['search_snippet'] = RawSQL(
+                    "ts_headline('%s', %s, %s, %%s)" % (PG_CONFIG, text, tsquery),
+                    [' & '.join(queries),
+                     'StartSel=%s, StopSel=%s, MaxFragments=2, MaxWords=24' % (HIGHLIGHT_START, HIGHLIGHT_END)],
+                    output_field=TextField(),
+                )
+        return queryset.annotate(**annotations)
+
+
+job_index = FullTextIndex(
+    table='jobs_job_fts',
+    source_table='jobs_job',
+    columns={
+        'title': 'A',
+        'requirements': 'B',
+        'description': 'C',
+        'company_name': 'A',
+        'location': 'A',
+    },
+    groups={
+        'keywords': ('title', 'description', 'requirements'),
+        'company': ('company_name',),
+        'location': ('location',),
+    },
+)
+
+
+def job_document(job):
+    return {column: getattr(job, column) for column in job_index.columns}
+
+
+def index_job(job):
+    job_index.update(job.pk, job_document(job))
+
+
+def unindex_job(pk):
+    job_index.delete(pk)
@@ -0,0 +1,78 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Job
+from .search import index_job, unindex_job
+from .feed import affects_homepage_feed, schedule_homepage_feed_refresh
+from .facets import record_job_saved, record_job_deleted
+from .autocomplete import autocomplete_index
+from .dedup import index_job_signature
+from .dashboard import invalidate_employer_dashboard
+from . import detail
+
+
+@receiver(post_save, sender=Job)
+def update_job_search_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_job(instance)
+
+
+@receiver(post_delete, sender=Job)
+def remove_job_from_search_index(sender, instance, **kwargs):
+    unindex_job(instance.pk)
+
+
+@receiver(post_save, sender=Job)
+def refresh_homepage_feed_on_save(sender, instance, created, raw=False, **kwargs):
+    if not raw and affects_homepage_feed(instance, created):
+        schedule_homepage_feed_refresh()
+
+
+@receiver(post_delete, sender=Job)
+def refresh_homepage_feed_on_delete(sender, instance, **kwargs):
+    schedule_homepage_feed_refresh()
+
+
+@receiver(post_save, sender=Job)
+def update_job_facets_on_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        record_job_saved(instance, created)
+
+
+@receiver(post_delete, sender=Job)
+def update_job_facets_on_delete(sender, instance, **kwargs):
+    record_job_deleted(instance)
+
+
+@receiver(post_save, sender=Job)
+def update_autocomplete_on_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        autocomplete_index.job_saved(instance, created)
+
+
+@receiver(post_delete, sender=Job)
+def update_autocomplete_on_delete(sender, instance, **kwargs):
+    autocomplete_index.job_deleted(instance)
+
+
+@receiver(post_save, sender=Job)
+def update_job_lsh_buckets(sender, instance, created, raw=False, **kwargs):
+    if not raw and (created or instance.field_changed('minhash')):
+        index_job_signature(instance)
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_dashboard_on_job_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_employer_dashboard(instance.posted_by_id)
+
+
+@receiver(post_save, sender=Job)
+def publish_job_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        detail.job_saved(instance)
+
+
+@receiver(post_delete, sender=Job)
+def forget_job_version(sender, instance, **kwargs):
+    detail.job_deleted(instance.pk)
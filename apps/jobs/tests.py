@@ -1,3 +1,235 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.applicants.models import Applicant, Application
+from apps.users.models import User
+from . import autocomplete
+from .counters import mark_reviewed, reconcile
+from .models import Employer, Job, JobDailyApplicationCount
+from .views import JobListView
+
+
+@override_settings(SKILL_INDEX_WORKERS=0)
+class JobsTestCase(TestCase):
+    def setUp(self):
+        self.employer_user = User.objects.create(username='employer', role='employer')
+        self.employer = Employer.objects.create(user=self.employer_user)
+
+    def make_job(self, title='Python developer', company_name='Acme', location='Dhaka',
+                 description='Build Django services.', employer=None, **fields):
+        return Job.objects.create(
+            title=title, company_name=company_name, location=location, description=description,
+            posted_by=employer or self.employer, **fields
+        )
+
+
+class KeysetPaginationTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('job_list')
+
+    def pages(self, params):
+        """The job ids of every page, following next cursors from the first."""
+        pages, cursor = [], None
+        while True:
+            response = self.client.get(self.url, {**params, 'cursor': cursor} if cursor else params)
+            self.assertEqual(response.status_code, 200)
+            pages.append([job.pk for job in response.context['jobs']])
+            cursor = response.context['page_obj'].next_cursor
+            if not cursor:
+                return pages, response
+
+    def test_pages_cover_every_job_once(self):
+        now = timezone.now()
+        for n in range(JobListView.paginate_by * 2 + 5):
+            job = self.make_job(title=f'Python developer {n}')
+            # Ties on posted_at must be broken by id.
+            Job.objects.filter(pk=job.pk).update(posted_at=now)
+        pages, _ = self.pages({})
+        ids = [pk for page in pages for pk in page]
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(ids, list(Job.objects.order_by('-posted_at', '-id').values_list('pk', flat=True)))
+
+    def test_ranked_search_pages_have_no_duplicates_or_gaps(self):
+        for n in range(JobListView.paginate_by * 2 + 5):
+            # Ranks vary with how often the term occurs, and some tie.
+            self.make_job(title=f'Engineer {n}', description='django ' * (n % 4 + 1) + 'services')
+        self.make_job(title='Accountant', description='Spreadsheets')
+        pages, response = self.pages({'title': 'django'})
+        ids = [pk for page in pages for pk in page]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(set(ids), set(Job.objects.filter(description__contains='django').values_list('pk', flat=True)))
+
+        # And back again from the last page.
+        previous = response.context['page_obj'].previous_cursor
+        response = self.client.get(self.url, {'title': 'django', 'cursor': previous})
+        self.assertEqual([job.pk for job in response.context['jobs']], pages[-2])
+
+    def test_tampered_cursor_is_404(self):
+        for n in range(JobListView.paginate_by + 1):
+            self.make_job(title=f'Python developer {n}')
+        cursor = self.client.get(self.url).context['page_obj'].next_cursor
+        self.assertEqual(self.client.get(self.url, {'cursor': cursor[:-2] + 'xx'}).status_code, 404)
+        self.assertEqual(self.client.get(self.url, {'cursor': 'garbage'}).status_code, 404)
+
+
+class FacetTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('job_list')
+        for location, company, n in (('Berlin', 'Acme', 2), ('Berlin', 'Globex', 1), ('New York', 'Acme', 1),
+                                     ('York', 'Initech', 1), ('Lincoln', 'Globex', 1)):
+            for _ in range(n):
+                self.make_job(location=location, company_name=company)
+
+    def test_search_facets_count_the_jobs_found(self):
+        for params in ({'location': 'erlin'}, {'location': 'berl'}, {'location': 'york'},
+                       {'location': 'new yo'}, {'location': 'lin'}, {'company': 'acm'},
+                       {'company': 'cme'}, {'location': 'berlin', 'company': 'glob'}):
+            with self.subTest(**params):
+                response = self.client.get(self.url, params)
+                jobs = response.context['jobs']
+                for name, field in (('location', 'location'), ('company', 'company_name')):
+                    found = {}
+                    for job in jobs:
+                        found[getattr(job, field)] = found.get(getattr(job, field), 0) + 1
+                    facets = {facet['value']: facet['count'] for facet in response.context['facets'][name]}
+                    self.assertEqual(facets, found)
+
+    def test_selected_facet_narrows_the_other(self):
+        response = self.client.get(self.url, {'location': 'berlin', 'facet_location': 'Berlin'})
+        facets = {facet['value']: facet['count'] for facet in response.context['facets']['company']}
+        self.assertEqual(facets, {'Acme': 2, 'Globex': 1})
+
+
+class AutocompleteTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.index = autocomplete.AutocompleteIndex()
+
+    def test_stale_index_is_rebuilt_in_the_background(self):
+        self.make_job(title='Python developer')
+        self.assertEqual(self.index.suggest('title', 'py'), ['Python developer'])
+
+        # Another worker adds a job: its signal handlers patch that worker's index only.
+        self.make_job(title='Pyramid engineer')
+        cache.incr(autocomplete.VERSION_KEY)
+        self.index._checked_at = 0
+        with mock.patch.object(autocomplete.threading, 'Thread') as thread:
+            self.assertEqual(self.index.suggest('title', 'py'), ['Python developer'])
+            self.index._checked_at = 0
+            self.index.suggest('title', 'py')
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once()
+
+        with mock.patch.object(autocomplete, 'connections'):
+            thread.call_args.kwargs['target']()
+        self.assertEqual(self.index.suggest('title', 'py'), ['Pyramid engineer', 'Python developer'])
+        self.assertFalse(self.index._rebuilding)
+
+
+class DuplicatePostingTests(JobsTestCase):
+    description = ('We are hiring a backend engineer to design, build and run the Django services '
+                   'behind our payments platform, with PostgreSQL, Celery and Redis.')
+
+    def setUp(self):
+        super().setUp()
+        self.original = self.make_job(title='Backend engineer', description=self.description)
+        self.url = reverse('post_job')
+        self.form = {'title': 'Backend Engineer', 'company_name': 'Acme', 'location': 'Dhaka',
+                     'description': self.description + ' ', 'requirements': ''}
+
+    def test_own_repost_is_rejected(self):
+        self.client.force_login(self.employer_user)
+        response = self.client.post(self.url, self.form)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('re-post of your listing', str(response.context['form'].non_field_errors()))
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_other_employers_copy_is_flagged(self):
+        other = User.objects.create(username='other', role='employer')
+        Employer.objects.create(user=other)
+        self.client.force_login(other)
+        self.assertRedirects(self.client.post(self.url, self.form), reverse('job_list'))
+        copy = Job.objects.exclude(pk=self.original.pk).get()
+        self.assertEqual(copy.duplicate_of, self.original)
+
+    def test_different_job_is_posted(self):
+        self.client.force_login(self.employer_user)
+        form = dict(self.form, title='Accountant', description='Keep the books and prepare monthly reports.')
+        self.assertRedirects(self.client.post(self.url, form), reverse('job_list'))
+        self.assertIsNone(Job.objects.get(title='Accountant').duplicate_of)
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, RESUME_EXTRACTION_WORKERS=0)
+class ApplicationCounterTests(JobsTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        super().setUp()
+        self.job = self.make_job()
+
+    def apply(self):
+        user = User.objects.create(username='candidate%d' % Application.objects.count(), role='applicant')
+        with self.captureOnCommitCallbacks(execute=True):
+            return Application.objects.create(
+                job=self.job, applicant=Applicant.objects.create(user=user), cover_letter='Hello',
+                resume=SimpleUploadedFile('resume.txt', b'Python, Django'),
+            )
+
+    def counters(self):
+        job = Job.objects.get(pk=self.job.pk)
+        return job.application_count, job.unreviewed_application_count
+
+    def test_counters_follow_applications(self):
+        first, second = self.apply(), self.apply()
+        self.assertEqual(self.counters(), (2, 2))
+        self.assertTrue(mark_reviewed(first))
+        self.assertFalse(mark_reviewed(first))
+        self.assertEqual(self.counters(), (2, 1))
+        second.delete()
+        self.assertEqual(self.counters(), (1, 0))
+        self.assertEqual(JobDailyApplicationCount.objects.get(job=self.job).application_count, 1)
+
+    def test_saving_a_stale_job_keeps_the_counters(self):
+        stale = Job.objects.get(pk=self.job.pk)
+        self.apply()
+        stale.title = 'Senior Python developer'
+        stale.save()
+        self.assertEqual(self.counters(), (1, 1))
+        self.assertEqual(Job.objects.get(pk=self.job.pk).title, 'Senior Python developer')
+
+    def test_saving_a_deleted_job_inserts_it_again(self):
+        stale = Job.objects.get(pk=self.job.pk)
+        Job.objects.filter(pk=self.job.pk).delete()
+        stale.save()
+        self.assertTrue(Job.objects.filter(pk=self.job.pk).exists())
+
+    def test_reconcile_repairs_drift(self):
+        self.apply()
+        self.apply()
+        Job.objects.filter(pk=self.job.pk).update(application_count=7, unreviewed_application_count=0)
+        JobDailyApplicationCount.objects.all().delete()
+
+        self.assertEqual(reconcile(dry_run=True), {'jobs': 1, 'days_changed': 0, 'days_added': 1, 'days_removed': 0})
+        self.assertEqual(self.counters(), (7, 0))
+        call_command('reconcile_application_counts', stdout=io.StringIO())
+        self.assertEqual(self.counters(), (2, 2))
+        self.assertEqual(JobDailyApplicationCount.objects.get(job=self.job).application_count, 2)
+        self.assertEqual(reconcile(), {'jobs': 0, 'days_changed': 0, 'days_added': 0, 'days_removed': 0})
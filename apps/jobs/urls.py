@@ -1,9 +1,10 @@
 from django.urls import path
-from .views import JobListView, JobDetailView, JobCreateView, employer_dashboard
+from .views import JobListView, JobDetailView, JobCreateView, employer_dashboard, autocomplete
 
 urlpatterns = [
     path('', JobListView.as_view(), name='job_list'),
     path('<int:pk>/', JobDetailView.as_view(), name='job_detail'),
     path('post/', JobCreateView.as_view(), name='post_job'),
     path('dashboard/', employer_dashboard, name='employer_dashboard'),
+    path('autocomplete/', autocomplete, name='job_autocomplete'),
 ]
@@ -1,7 +1,20 @@
+from django.contrib import messages
+from django.http import Http404, JsonResponse
+from django.utils.decorators import method_decorator
+from django.utils.cache import patch_cache_control
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.shortcuts import render, redirect
 from django.views.generic import ListView, DetailView, CreateView
 from .models import Job, Employer
 from .forms import JobForm
+from .search import job_index
+from .pagination import KeysetPaginator, InvalidCursor
+from .facets import facet_counts, facet_counts_for_queryset, facet_counts_for_search
+from .autocomplete import autocomplete_index, FIELDS as AUTOCOMPLETE_FIELDS
+from .dedup import find_duplicates
+from .dashboard import get_employer_dashboard
+from .detail import get_job_version, get_cached_job, job_detail_etag, job_detail_last_modified, JOB_DETAIL_TIMEOUT
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse_lazy
 
@@ -13,12 +26,28 @@ class JobListView(ListView):
     model = Job
     template_name = 'jobs/job_list.html'
     context_object_name = 'jobs'
+    paginate_by = 20
+    ordering = ('-posted_at', '-id')
 
     def get_queryset(self):
         queryset = super().get_queryset()
         title = self.request.GET.get('title')
         company = self.request.GET.get('company')
         location = self.request.GET.get('location')
+        facet_location = self.request.GET.get('facet_location')
+        facet_company = self.request.GET.get('facet_company')
+        if facet_location:
+            queryset = queryset.filter(location=facet_location)
+        if facet_company:
+            queryset = queryset.filter(company_name=facet_company)
+        if not (title or company or location):
+            return queryset
+
+        # The title box searches titles, descriptions and requirements.
+        results = job_index.search(queryset, keywords=title, company=company, location=location)
+        if results is not None:
+            return results
+
         if title:
             queryset = queryset.filter(title__icontains=title)
         if company:
@@ -27,17 +56,104 @@ class JobListView(ListView):
             queryset = queryset.filter(location__icontains=location)
         return queryset
 
+    def paginate_queryset(self, queryset, page_size):
+        ordering = self.get_ordering()
+        if 'search_rank' in queryset.query.annotations:
+            ordering = ('-search_rank',) + tuple(ordering)
+        paginator = KeysetPaginator(queryset, ordering, page_size)
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404('Invalid page cursor.')
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['job_count'], context['job_count_exact'] = context['paginator'].estimated_count()
+        query = self.request.GET.copy()
+        query.pop('cursor', None)
+        context['search_query'] = query.urlencode()
+        context['facets'] = self.get_facets(query)
+        return context
+
+    def get_facets(self, query):
+        if query.get('title'):
+            # Keyword search: count over the best matching rows.
+            counts = facet_counts_for_queryset(self.object_list)
+        elif query.get('company') or query.get('location'):
+            counts = facet_counts_for_search(
+                location_text=query.get('location'), company_text=query.get('company'),
+                location=query.get('facet_location'), company=query.get('facet_company'),
+            )
+        else:
+            counts = facet_counts(location=query.get('facet_location'), company=query.get('facet_company'))
+
+        facets = {}
+        for name, values in counts.items():
+            param = 'facet_%s' % name
+            selected = query.get(param)
+            facets[name] = []
+            for value, count in values:
+                link = query.copy()
+                if value == selected:
+                    link.pop(param, None)
+                else:
+                    link[param] = value
+                facets[name].append({
+                    'value': value,
+                    'count': count,
+                    'selected': value == selected,
+                    'query': link.urlencode(),
+                })
+        return facets
+
+@method_decorator(condition(etag_func=job_detail_etag, last_modified_func=job_detail_last_modified), name='dispatch')
 class JobDetailView(DetailView):
     model = Job
     template_name = 'jobs/job_detail.html'
 
+    def get_object(self, queryset=None):
+        version = get_job_version(self.kwargs['pk'])
+        job = get_cached_job(self.kwargs['pk'], version) if version else None
+        if job is None:
+            raise Http404('No job found matching the query')
+        return job
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['job_version'] = self.object.updated_at.timestamp()
+        context['fragment_timeout'] = JOB_DETAIL_TIMEOUT
+        return context
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        # Always revalidate; the ETag makes that a cheap 304.
+        if self.request.user.is_authenticated:
+            patch_cache_control(response, no_cache=True, private=True)
+        else:
+            patch_cache_control(response, no_cache=True, public=True)
+        return response
+
 class JobCreateView(LoginRequiredMixin, EmployerRequiredMixin, CreateView):
     model = Job
     form_class = JobForm
     template_name = 'jobs/post_job.html'
 
     def form_valid(self, form):
-        form.instance.posted_by = Employer.objects.get(user=self.request.user)
+        employer = Employer.objects.get(user=self.request.user)
+        form.instance.posted_by = employer
+        duplicates = find_duplicates(form.instance)
+        own = [job for job in duplicates if job.posted_by_id == employer.pk]
+        if own:
+            # Re-posting the same listing: reject, point at the existing one.
+            form.add_error(None, f'This looks like a re-post of your listing "{own[0].title}" '
+                                 f'(posted {own[0].posted_at:%b %d, %Y}). Edit that job instead.')
+            return self.form_invalid(form)
+        if duplicates:
+            # Another employer's near-identical posting: accept, but flag it for review.
+            form.instance.duplicate_of = duplicates[0].duplicate_of or duplicates[0]
+            messages.warning(self.request, 'Your job was posted, but it closely matches an existing '
+                                           'listing and has been flagged for review.')
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -45,10 +161,20 @@ class JobCreateView(LoginRequiredMixin, EmployerRequiredMixin, CreateView):
 
 def employer_dashboard(request):
     if request.user.is_authenticated and request.user.role == 'employer':
-        jobs = Job.objects.filter(posted_by__user=request.user)
-        return render(request, 'jobs/employer_dashboard.html', {'jobs': jobs})
+        employer = Employer.objects.filter(user=request.user).values_list('pk', flat=True).first()
+        dashboard = get_employer_dashboard(employer) if employer else {'jobs': [], 'activity': []}
+        return render(request, 'jobs/employer_dashboard.html', dashboard)
     else:
         return redirect('home')
 
+@cache_control(public=True, max_age=60)
+def autocomplete(request):
+    """Typeahead suggestions for the job search inputs"""
+    field = request.GET.get('field')
+    if field not in AUTOCOMPLETE_FIELDS:
+        return JsonResponse({'error': 'Unknown field'}, status=400)
+    prefix = request.GET.get('q', '')[:100]
+    return JsonResponse({'suggestions': autocomplete_index.suggest(field, prefix)})
+
 def home(request):
     return redirect('job_list')
@@ -0,0 +1,365 @@
+"""
+TF-IDF matching between jobs and applications.
+
+Documents are turned into hashed term-frequency vectors (no vocabulary table
+to keep in sync) and persisted as JobVector / ApplicationVector rows. Each
+worker keeps the vectors of one kind in a sparse matrix; IDF weights come from
+the column document frequencies of that matrix. A query only touches the
+matrix columns of its own terms (CSC slicing, i.e. the posting lists), so
+scoring 100k jobs is a single sparse mat-vec product plus a partial sort.
+"""
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+N_FEATURES = 2 ** 18
+SYNC_INTERVAL = 30  # seconds between checks for vectors written by other workers
+# Up to this many rows, every change is merged: re-weighting is cheap and a
+# small corpus's IDF shifts a lot with each document.
+SMALL_INDEX_ROWS = 5000
+
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]', re.UNICODE)
+
+STOP_WORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both
+but by can could did do does doing down during each etc few for from further had has have having he her here
+hers him his how i if in into is it its itself just me more most my no nor not of off on once only or other
+our ours out over own per same she should so some such than that the their theirs them then there these they
+this those through to too under until up very via was we were what when where which while who whom why will
+with within would you your yours
+""".split())
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall((text or '').lower()) if t not in STOP_WORDS]
+
+
+def term_id(term):
+    # crc32 rather than hash(): it must be stable across processes and restarts.
+    return zlib.crc32(term.encode('utf-8')) % N_FEATURES
+
+
+def vectorize(text):
+    """Return ``(indices, weights)`` with sublinear tf (1 + log tf) per hashed term."""
+    counts = Counter(term_id(token) for token in tokenize(text))
+    indices = np.array(sorted(counts), dtype='<i4')
+    tf = np.array([counts[i] for i in indices], dtype='<f4')
+    return indices, (1 + np.log(tf)).astype('<f4')
+
+
+def pack(indices, weights):
+    return indices.astype('<i4').tobytes(), weights.astype('<f4').tobytes()
+
+
+def unpack(indices, weights):
+    return np.frombuffer(bytes(indices), dtype='<i4'), np.frombuffer(bytes(weights), dtype='<f4')
+
+
+def job_text(job):
+    return ' '.join(filter(None, [job.title, job.description, job.requirements]))
+
+
+def application_text(application):
+    resume = getattr(application, 'resume_text', None)
+    return ' '.join(filter(None, [application.cover_letter, resume.text if resume else None]))
+
+
+def _rows_to_matrix(rows):
+    """Stack ``(indices, weights)`` pairs into a CSR matrix."""
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    for i, (indices, _) in enumerate(rows):
+        indptr[i + 1] = indptr[i] + len(indices)
+    if rows:
+        indices = np.concatenate([r[0] for r in rows]).astype(np.int32)
+        data = np.concatenate([r[1] for r in rows]).astype(np.float32)
+    else:
+        indices, data = np.empty(0, np.int32), np.empty(0, np.float32)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(rows), N_FEATURES))
+
+
+def _l2_normalize(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+
+class VectorIndex:
+    """
+    In-memory TF-IDF matrix over every stored vector of ``model``, keyed by
+    its ``key`` field (``job_id`` / ``application_id``).
+
+    Rows are weighted into a large column-major ``main`` segment plus a small
+    ``delta`` segment for rows added since; IDF weights are only recomputed
+    when the delta is merged, so adding one document to a large index stays
+    cheap. The raw term frequencies are kept the same way (``tf`` for the rows
+    of ``main``, ``delta_tf`` for the rest): appending only stacks onto the
+    small delta, and the large matrix is rebuilt once per merge. Indexes of up to ``SMALL_INDEX_ROWS`` rows are merged on every
+    change.
+
+    Deletions reach other workers at their next sync, which compares the row
+    count with the table's and forgets the keys that are gone.
+    """
+
+    def __init__(self, model_label, key):
+        self.model_label = model_label
+        self.key = key
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._stale = False
+        self._checked_at = 0.0
+        self._synced_at = None
+        self._synced_keys = set()  # keys last written exactly at _synced_at
+        self.keys = np.empty(0, dtype=np.int64)  # row -> key, -1 for superseded rows
+        self.positions = {}                      # key -> row
+        self.tf = _rows_to_matrix([])        # raw tf of the rows in main
+        self.delta_tf = _rows_to_matrix([])  # raw tf of the rows in delta
+        self.df = np.zeros(N_FEATURES, dtype=np.float64)
+        self._idf = np.ones(N_FEATURES, dtype=np.float32)
+        self.main = sparse.csc_matrix((0, N_FEATURES), dtype=np.float32)
+        self.delta = sparse.csr_matrix((0, N_FEATURES), dtype=np.float32)
+
+    @property
+    def model(self):
+        from django.apps import apps
+        return apps.get_model(self.model_label)
+
+    def mark_stale(self):
+        self._stale = True
+
+    def forget(self, key):
+        with self._lock:
+            row = self.positions.pop(key, None)
+            if row is not None:
+                self.keys[row] = -1
+                self.df[self._raw([row]).indices] -= 1
+
+    def _raw(self, rows):
+        """Raw tf of the given row numbers, in ascending order, across both segments."""
+        rows = np.sort(np.asarray(rows, dtype=np.int64))
+        main_rows = self.tf.shape[0]
+        return sparse.vstack(
+            [self.tf[rows[rows < main_rows]], self.delta_tf[rows[rows >= main_rows] - main_rows]], format='csr'
+        )
+
+    def _fetch(self, since=None):
+        queryset = self.model.objects.all()
+        if since is not None:
+            queryset = queryset.filter(updated_at__gte=since)
+        for key, indices, weights, updated_at in queryset.values_list(
+            self.key, 'indices', 'weights', 'updated_at'
+        ).iterator(chunk_size=2000):
+            yield key, unpack(indices, weights), updated_at
+
+    def sync(self, force=False):
+        """Load vectors written since the last sync (by any worker)."""
+        now = time.monotonic()
+        if self._loaded and not (force or self._stale or now - self._checked_at > SYNC_INTERVAL):
+            return
+        with self._lock:
+            self._checked_at, self._stale = now, False
+            since = self._synced_at if self._loaded else None
+            keys, rows, stamps = [], [], []
+            for key, row, updated_at in self._fetch(since):
+                # The >= boundary re-reads rows seen by the previous sync.
+                if updated_at == self._synced_at and key in self._synced_keys:
+                    continue
+                keys.append(key)
+                rows.append(row)
+                stamps.append(updated_at)
+            if rows or not self._loaded:
+                self._append(keys, rows)
+            if stamps:
+                latest = max(stamps)
+                if latest != self._synced_at:
+                    self._synced_at, self._synced_keys = latest, set()
+                self._synced_keys.update(k for k, t in zip(keys, stamps) if t == latest)
+            self._loaded = True
+            self._forget_deleted()
+
+    def _forget_deleted(self):
+        """Forget rows deleted by other workers (post_delete only ran there)."""
+        if self.model.objects.count() == len(self.positions):
+            return
+        live = set(self.model.objects.values_list(self.key, flat=True))
+        for key in [k for k in self.positions if k not in live]:
+            self.forget(key)
+
+    def _append(self, keys, rows):
+        new = _rows_to_matrix(rows)
+        superseded = [self.positions[k] for k in keys if k in self.positions]
+        if superseded:
+            self.df -= np.bincount(self._raw(superseded).indices, minlength=N_FEATURES)
+            self.keys[superseded] = -1
+        offset = len(self.keys)
+        self.delta_tf = sparse.vstack([self.delta_tf, new], format='csr')
+        self.keys = np.concatenate([self.keys, np.asarray(keys, dtype=np.int64)])
+        for i, key in enumerate(keys):
+            self.positions[key] = offset + i
+        self.df += np.bincount(new.indices, minlength=N_FEATURES)
+
+        main_rows, pending = self.tf.shape[0], self.delta_tf.shape[0]
+        if (len(self.keys) <= SMALL_INDEX_ROWS or pending > max(1000, 0.05 * main_rows)
+                or (self.keys < 0).sum() > 0.2 * len(self.keys)):
+            self._merge()
+        else:
+            # IDF is fixed until the next merge, so only the new rows need weighing.
+            self.delta = sparse.vstack([self.delta, self._weigh(new)], format='csr')
+
+    def _merge(self):
+        """Drop superseded rows, recompute IDF and re-weight everything into ``main``."""
+        self.tf = sparse.vstack([self.tf, self.delta_tf], format='csr')
+        self.delta_tf = _rows_to_matrix([])
+        live = self.keys >= 0
+        if not live.all():
+            self.tf = self.tf[live]
+            self.keys = self.keys[live]
+            self.positions = {int(k): i for i, k in enumerate(self.keys)}
+        n_docs = max(len(self.positions), 1)
+        self._idf = (np.log((1 + n_docs) / (1 + self.df)) + 1).astype(np.float32)
+        self.main = self._weigh(self.tf).tocsc()
+        self.delta = sparse.csr_matrix((0, N_FEATURES), dtype=np.float32)
+
+    def _weigh(self, rows):
+        """TF-IDF weight and L2-normalise the rows of a CSR matrix."""
+        rows = rows.tocsr(copy=True).astype(np.float32)
+        rows.data *= self._idf[rows.indices]
+        return _l2_normalize(rows).tocsr()
+
+    def scores(self, queries, keys=None):
+        """
+        Cosine similarity of each query row (a CSR matrix of raw tf) against
+        the indexed rows. Returns ``(scores, row_keys)`` where ``scores`` has
+        one row per entry of ``row_keys`` and one column per query.
+        """
+        self.sync()
+        with self._lock:
+            q = self._weigh(queries)
+            columns = np.unique(q.indices)
+            q_dense = q[:, columns].toarray().T
+            if keys is not None:
+                # A small candidate set is cheaper to score row by row.
+                rows = sorted(self.positions[k] for k in keys if k in self.positions)
+                return self._weigh(self._raw(rows))[:, columns] @ q_dense, self.keys[rows]
+            # Only the posting lists of terms present in the queries contribute.
+            main = self.main[:, columns] @ q_dense
+            delta = self.delta[:, columns] @ q_dense
+            return np.vstack([main, delta]), self.keys.copy()
+
+    def top(self, queries, limit=10, keys=None, exclude=()):
+        """
+        Best ``limit`` ``(key, score)`` pairs for each query row, optionally
+        restricted to ``keys`` and skipping keys in ``exclude``.
+        """
+        scores, row_keys = self.scores(queries, keys)
+        mask = row_keys >= 0
+        if exclude:
+            mask &= ~np.isin(row_keys, np.fromiter(exclude, dtype=np.int64))
+        candidates = np.flatnonzero(mask)
+        results = []
+        for column in range(scores.shape[1]):
+            column_scores = scores[candidates, column]
+            k = min(limit, len(candidates))
+            if k == 0:
+                results.append([])
+                continue
+            best = np.argpartition(-column_scores, k - 1)[:k]
+            best = best[np.argsort(-column_scores[best])]
+            results.append([
+                (int(row_keys[candidates[i]]), float(column_scores[i]))
+                for i in best if column_scores[i] > 0
+            ])
+        return results
+
+
+job_vectors = VectorIndex('matching.JobVector', 'job_id')
+application_vectors = VectorIndex('matching.ApplicationVector', 'application_id')
+
+
+def _save_vector(model, lookup, text):
+    indices, weights = pack(*vectorize(text))
+    model.objects.update_or_create(defaults={'indices': indices, 'weights': weights}, **lookup)
+
+
+def update_job_vector(job):
+    from .models import JobVector
+    _save_vector(JobVector, {'job': job}, job_text(job))
+    job_vectors.mark_stale()
+
+
+def update_application_vector(application):
+    from .models import ApplicationVector
+    _save_vector(ApplicationVector, {'application': application}, application_text(application))
+    application_vectors.mark_stale()
+
+
+def _query_matrix(vectors):
+    return _rows_to_matrix([unpack(v.indices, v.weights) for v in vectors])
+
+
+def _top_found(index, fetch, queries, **options):
+    """
+    ``index.top()`` for a single query with each key looked up by ``fetch``
+    (an ``in_bulk``). Keys whose rows are gone were deleted by another worker
+    since this one last synced: they are forgotten and the ranking redone, so
+    the list is not cut short.
+    """
+    for attempt in range(2):
+        ranked = index.top(queries, **options)[0]
+        found = fetch([key for key, _ in ranked])
+        missing = [key for key, _ in ranked if key not in found]
+        if not missing:
+            break
+        for key in missing:
+            index.forget(key)
+    return [(found[key], score) for key, score in ranked if key in found]
+
+
+def top_jobs_for_applicant(applicant, limit=10, exclude_applied=True):
+    """Jobs most similar to everything ``applicant`` has submitted, as ``(job, score)`` pairs."""
+    from apps.jobs.models import Job
+    from .models import ApplicationVector
+
+    vectors = list(ApplicationVector.objects.filter(application__applicant=applicant))
+    if not vectors:
+        return []
+    # One query row for the applicant: the sum of their application vectors.
+    query = sparse.csr_matrix(_query_matrix(vectors).sum(axis=0))
+    exclude = ()
+    if exclude_applied:
+        exclude = set(applicant.application_set.values_list('job_id', flat=True))
+    return _top_found(job_vectors, Job.objects.in_bulk, query, limit=limit, exclude=exclude)
+
+
+def top_applications_for_job(job, limit=10, applications=None):
+    """
+    Applications most similar to ``job``, as ``(application, score)`` pairs.
+    Pass ``applications`` (a queryset) to rank only within it, e.g. the
+    applicants of this job.
+    """
+    from apps.applicants.models import Application
+    from .models import JobVector
+
+    vector = JobVector.objects.filter(job=job).first()
+    if vector is None:
+        return []
+    keys = None
+    if applications is not None:
+        keys = list(applications.values_list('pk', flat=True))
+    fetch = Application.objects.select_related('applicant__user', 'job').in_bulk
+    return _top_found(application_vectors, fetch, _query_matrix([vector]), limit=limit, keys=keys)
+
+
+def application_scores_for_job(job, application_ids):
+    """Similarity of each of ``application_ids`` to ``job``, as a dict."""
+    from .models import JobVector
+
+    vector = JobVector.objects.filter(job=job).first()
+    if vector is None or not application_ids:
+        return {}
+    ranked = application_vectors.top(_query_matrix([vector]), limit=len(application_ids), keys=application_ids)[0]
+    return dict(ranked)
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.jobs.models import Job
+from apps.applicants.models import Application
+from apps.matching.engine import vectorize, pack, job_text, application_text
+from apps.matching.models import JobVector, ApplicationVector
+
+
+class Command(BaseCommand):
+    help = 'Recompute the TF-IDF term vectors of every job and application'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def rebuild(self, label, queryset, vector_model, key, text):
+        batch_size = self.options['batch_size']
+        total, batch = 0, []
+
+        def flush():
+            vector_model.objects.bulk_create(batch)
+
+        with transaction.atomic():
+            vector_model.objects.all().delete()
+            for obj in queryset.iterator(chunk_size=batch_size):
+                indices, weights = pack(*vectorize(text(obj)))
+                batch.append(vector_model(**{key: obj, 'indices': indices, 'weights': weights}))
+                if len(batch) >= batch_size:
+                    flush()
+                    total += len(batch)
+                    batch = []
+            if batch:
+                flush()
+                total += len(batch)
+        self.stdout.write(f'{label}: {total} vectors')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rebuild('Jobs', Job.objects.all(), JobVector, 'job', job_text)
+        self.rebuild('Applications', Application.objects.select_related('resume_text'), ApplicationVector, 'application', application_text)
+        self.stdout.write(self.style.SUCCESS('Match vectors rebuilt.'))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.jobs.models import Job
+from apps.applicants.models import Application
+from apps.matching.models import JobSkill, ApplicationSkill
+from apps.matching.skills import extract_skills
+
+
+class Command(BaseCommand):
+    help = 'Re-extract the skills of every job and application, e.g. after changing SKILL_TAXONOMY'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def rebuild(self, label, model, rows, postings):
+        batch_size = self.options['batch_size']
+        total, documents, batch = 0, 0, []
+        with transaction.atomic():
+            model.objects.all().delete()
+            for row in rows.iterator(chunk_size=batch_size):
+                documents += 1
+                batch.extend(postings(row))
+                if len(batch) >= batch_size:
+                    model.objects.bulk_create(batch)
+                    total += len(batch)
+                    batch = []
+            model.objects.bulk_create(batch)
+            total += len(batch)
+        self.stdout.write(f'{label}: {total} skills across {documents} documents')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rebuild(
+            'Jobs', JobSkill, Job.objects.values('pk', 'title', 'requirements'),
+            lambda row: [JobSkill(job_id=row['pk'], skill=skill)
+                         for skill in extract_skills(row['title'], row['requirements'])],
+        )
+        self.rebuild(
+            'Applications', ApplicationSkill,
+            Application.objects.values('pk', 'job_id', 'cover_letter', 'resume_text__text'),
+            lambda row: [ApplicationSkill(application_id=row['pk'], job_id=row['job_id'], skill=skill)
+                         for skill in extract_skills(row['cover_letter'], row['resume_text__text'])],
+        )
+        self.stdout.write(self.style.SUCCESS('Skill index rebuilt.'))
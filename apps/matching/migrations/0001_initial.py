@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('applicants', '0002_applicant_alter_application_applicant'),
+        ('jobs', '0007_job_facets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationVector',
+            fields=[
+                ('indices', models.BinaryField()),
+                ('weights', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+                ('application', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='term_vector', serialize=False, to='applicants.application')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='JobVector',
+            fields=[
+                ('indices', models.BinaryField()),
+                ('weights', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='term_vector', serialize=False, to='jobs.job')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from apps.matching.skills import extract_skills
+
+
+def populate_skills(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Application = apps.get_model('applicants', 'Application')
+    JobSkill = apps.get_model('matching', 'JobSkill')
+    ApplicationSkill = apps.get_model('matching', 'ApplicationSkill')
+    rows = []
+    for job in Job.objects.values('pk', 'title', 'requirements').iterator(chunk_size=2000):
+        rows.extend(JobSkill(job_id=job['pk'], skill=skill) for skill in extract_skills(job['title'], job['requirements']))
+        if len(rows) >= 5000:
+            JobSkill.objects.bulk_create(rows)
+            rows = []
+    JobSkill.objects.bulk_create(rows)
+    rows = []
+    for row in Application.objects.values('pk', 'job_id', 'cover_letter', 'resume_text__text').iterator(chunk_size=2000):
+        rows.extend(
+            ApplicationSkill(application_id=row['pk'], job_id=row['job_id'], skill=skill)
+            for skill in extract_skills(row['cover_letter'], row['resume_text__text'])
+        )
+        if len(rows) >= 5000:
+            ApplicationSkill.objects.bulk_create(rows)
+            rows = []
+    ApplicationSkill.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applicants', '0006_application_search_index'),
+        ('jobs', '0009_job_updated_at'),
+        ('matching', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=50)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skills', to='applicants.application')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jobs.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['job', 'skill', 'application'], name='application_job_skill_idx'), models.Index(fields=['skill', 'application'], name='application_skill_idx')],
+                'constraints': [models.UniqueConstraint(fields=('application', 'skill'), name='unique_application_skill')],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=50)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skills', to='jobs.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['skill', 'job'], name='job_skill_idx')],
+                'constraints': [models.UniqueConstraint(fields=('job', 'skill'), name='unique_job_skill')],
+            },
+        ),
+        migrations.RunPython(populate_skills, migrations.RunPython.noop),
+    ]
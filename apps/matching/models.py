@@ -0,0 +1,71 @@
+from django.db import models
+from apps.jobs.models import Job
+from apps.applicants.models import Application
+
+
+class TermVector(models.Model):
+    """
+    Sparse term-frequency vector of a document, stored as packed little-endian
+    arrays: ``indices`` (int32 hashed term ids) and ``weights`` (float32 tf).
+    """
+    indices = models.BinaryField()
+    weights = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        abstract = True
+
+
+class JobVector(TermVector):
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='term_vector')
+
+    def __str__(self):
+        return f"Vector for job {self.job_id}"
+
+
+class ApplicationVector(TermVector):
+    application = models.OneToOneField(
+        Application, on_delete=models.CASCADE, primary_key=True, related_name='term_vector'
+    )
+
+    def __str__(self):
+        return f"Vector for application {self.application_id}"
+
+
+class JobSkill(models.Model):
+    """Posting list entry: ``job`` asks for ``skill`` (see ``apps.matching.skills``)."""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='skills')
+    skill = models.CharField(max_length=50)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'skill'], name='unique_job_skill'),
+        ]
+        indexes = [
+            models.Index(fields=['skill', 'job'], name='job_skill_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.skill} for job {self.job_id}"
+
+
+class ApplicationSkill(models.Model):
+    """
+    Posting list entry: ``application`` mentions ``skill``. The job is
+    denormalised so that skill filters within one job stay on one index.
+    """
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='skills')
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='+')
+    skill = models.CharField(max_length=50)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['application', 'skill'], name='unique_application_skill'),
+        ]
+        indexes = [
+            models.Index(fields=['job', 'skill', 'application'], name='application_job_skill_idx'),
+            models.Index(fields=['skill', 'application'], name='application_skill_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.skill} for application {self.application_id}"
@@ -0,0 +1,59 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.jobs.models import Job
+from apps.applicants.models import Application, ResumeText
+from .engine import update_job_vector, update_application_vector, job_vectors, application_vectors
+from .skills import schedule, index_job_skills, index_application_skills
+
+JOB_TEXT_FIELDS = ('title', 'description', 'requirements')
+JOB_SKILL_FIELDS = ('title', 'requirements')
+
+
+@receiver(post_save, sender=Job)
+def update_job_vector_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created or any(instance.field_changed(f) for f in JOB_TEXT_FIELDS):
+        update_job_vector(instance)
+
+
+@receiver(post_delete, sender=Job)
+def forget_job_vector(sender, instance, **kwargs):
+    job_vectors.forget(instance.pk)
+
+
+@receiver(post_save, sender=Application)
+def update_application_vector_on_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        update_application_vector(instance)
+
+
+@receiver(post_delete, sender=Application)
+def forget_application_vector(sender, instance, **kwargs):
+    application_vectors.forget(instance.pk)
+
+
+@receiver(post_save, sender=ResumeText)
+def update_application_vector_on_resume_text(sender, instance, raw=False, **kwargs):
+    if not raw and instance.status == ResumeText.DONE:
+        update_application_vector(instance.application)
+
+
+@receiver(post_save, sender=Job)
+def index_job_skills_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created or any(instance.field_changed(f) for f in JOB_SKILL_FIELDS):
+        schedule(index_job_skills, instance.pk)
+
+
+@receiver(post_save, sender=Application)
+def index_application_skills_on_save(sender, instance, created, raw=False, **kwargs):
+    if not raw and (created or instance.field_changed('cover_letter')):
+        schedule(index_application_skills, instance.pk)
+
+
+@receiver(post_save, sender=ResumeText)
+def index_application_skills_on_resume_text(sender, instance, raw=False, **kwargs):
+    if not raw and instance.status == ResumeText.DONE:
+        schedule(index_application_skills, instance.application_id)
@@ -0,0 +1,298 @@
+"""
+Skill extraction and the inverted skill index.
+
+Skills come from a taxonomy of canonical names and their aliases (the
+``SKILL_TAXONOMY`` setting, or ``DEFAULT_TAXONOMY``). Only the aliases are
+matched, not the canonical names, so that names which are also ordinary
+English words ("Go", "Excel", "Swift") are listed only in unambiguous forms.
+All aliases are compiled into one Aho-Corasick automaton, so a document is scanned once,
+in time linear in its length, however large the taxonomy grows.
+
+Extracted skills are stored as JobSkill and ApplicationSkill rows: the
+skill -> job and skill -> application posting lists. ApplicationSkill
+carries the job id as well, so "applicants of job X with skills A and B" is
+a GROUP BY over the (job, skill) index rather than a scan of any text.
+Indexing runs on a background thread after the transaction commits.
+"""
+import logging
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TAXONOMY = {
+    'Python': ['python', 'python3'],
+    'Django': ['django', 'django rest framework', 'drf'],
+    'Flask': ['flask'],
+    'FastAPI': ['fastapi'],
+    'Celery': ['celery'],
+    'JavaScript': ['javascript', 'js', 'es6', 'ecmascript'],
+    'TypeScript': ['typescript'],
+    'React': ['react', 'react.js', 'reactjs', 'react native'],
+    'Vue.js': ['vue', 'vue.js', 'vuejs', 'nuxt'],
+    'Angular': ['angular', 'angularjs'],
+    'Node.js': ['node.js', 'nodejs', 'express.js', 'expressjs'],
+    'HTML': ['html', 'html5'],
+    'CSS': ['css', 'css3', 'sass', 'scss'],
+    'Tailwind CSS': ['tailwind', 'tailwindcss', 'tailwind css'],
+    'Java': ['java'],
+    'Spring': ['spring boot', 'springboot', 'spring framework', 'spring mvc'],
+    'Kotlin': ['kotlin'],
+    'Swift': ['swiftui', 'swift programming', 'swift language'],
+    'C++': ['c++', 'cpp'],
+    'C#': ['c#', 'csharp'],
+    '.NET': ['.net', 'dotnet', 'asp.net'],
+    'PHP': ['php'],
+    'Laravel': ['laravel'],
+    'Ruby': ['ruby'],
+    'Ruby on Rails': ['rails', 'ruby on rails'],
+    'Go': ['golang'],
+    'Rust': ['rust'],
+    'SQL': ['sql'],
+    'PostgreSQL': ['postgresql', 'postgres', 'psql'],
+    'MySQL': ['mysql', 'mariadb'],
+    'MongoDB': ['mongodb', 'mongo'],
+    'Redis': ['redis'],
+    'Elasticsearch': ['elasticsearch', 'elastic search', 'opensearch'],
+    'GraphQL': ['graphql'],
+    'REST APIs': ['rest api', 'rest apis', 'restful', 'restful api', 'restful apis'],
+    'Kafka': ['kafka'],
+    'RabbitMQ': ['rabbitmq'],
+    'Docker': ['docker', 'containerization'],
+    'Kubernetes': ['kubernetes', 'k8s', 'helm'],
+    'Terraform': ['terraform'],
+    'AWS': ['aws', 'amazon web services', 'ec2', 's3', 'lambda'],
+    'Google Cloud': ['gcp', 'google cloud', 'google cloud platform'],
+    'Azure': ['azure', 'microsoft azure'],
+    'Linux': ['linux', 'unix', 'bash'],
+    'Git': ['git', 'github', 'gitlab'],
+    'CI/CD': ['ci/cd', 'ci cd', 'continuous integration', 'continuous delivery', 'jenkins', 'github actions'],
+    'Machine Learning': ['machine learning', 'ml'],
+    'Deep Learning': ['deep learning', 'neural networks'],
+    'NLP': ['nlp', 'natural language processing'],
+    'TensorFlow': ['tensorflow', 'keras'],
+    'PyTorch': ['pytorch'],
+    'scikit-learn': ['scikit-learn', 'sklearn'],
+    'Pandas': ['pandas'],
+    'NumPy': ['numpy'],
+    'Data Analysis': ['data analysis', 'data analytics'],
+    'Spark': ['spark', 'pyspark', 'apache spark'],
+    'Tableau': ['tableau'],
+    'Power BI': ['power bi', 'powerbi'],
+    'Excel': ['microsoft excel', 'ms excel', 'advanced excel', 'excel spreadsheets'],
+    'Figma': ['figma'],
+    'UI/UX Design': ['ui/ux', 'ux design', 'ui design', 'user experience'],
+    'Testing': ['unit testing', 'pytest', 'jest', 'selenium', 'test automation', 'tdd'],
+    'Agile': ['agile', 'scrum', 'kanban'],
+    'Project Management': ['project management', 'jira'],
+    'Android': ['android'],
+    'iOS': ['ios'],
+    'Flutter': ['flutter', 'dart'],
+}
+
+# Characters that make up a word; a match must not be glued to one of these.
+_WORD_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789')
+# A leading dot joins a match to the word before it ("node.js" is not "js").
+_BEFORE_CHARS = _WORD_CHARS | {'.'}
+_SPACE_RE = re.compile(r'\s+')
+
+_matcher = None
+_matcher_lock = threading.Lock()
+_executor_lock = threading.Lock()
+_executor = None
+
+
+def normalize(text):
+    return _SPACE_RE.sub(' ', (text or '').lower())
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over the aliases of a taxonomy.
+
+    ``goto`` holds one transition dict per state, ``fail`` the failure link
+    and ``out`` the ``(alias length, skill)`` pairs that end in each state,
+    including those inherited through failure links.
+    """
+
+    def __init__(self, taxonomy):
+        self.skills = tuple(taxonomy)
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for skill, aliases in taxonomy.items():
+            for alias in set(map(normalize, aliases)):
+                alias = alias.strip()
+                if alias:
+                    self._add(alias, skill)
+        self._link()
+
+    def _add(self, alias, skill):
+        state = 0
+        for char in alias:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = next_state
+        self.out[state].append((len(alias), skill))
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def extract(self, text):
+        """The set of skills mentioned in ``text`` as whole words."""
+        text = normalize(text)
+        found = set()
+        state = 0
+        goto, fail, out = self.goto, self.fail, self.out
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not out[state]:
+                continue
+            after = text[end] if end < len(text) else ''
+            for length, skill in out[state]:
+                start = end - length
+                before = text[start - 1] if start else ''
+                if before not in _BEFORE_CHARS and after not in _WORD_CHARS:
+                    found.add(skill)
+        return found
+
+
+def get_matcher():
+    global _matcher
+    with _matcher_lock:
+        if _matcher is None:
+            _matcher = SkillMatcher(getattr(settings, 'SKILL_TAXONOMY', None) or DEFAULT_TAXONOMY)
+        return _matcher
+
+
+def extract_skills(*texts):
+    matcher = get_matcher()
+    found = set()
+    for text in texts:
+        found |= matcher.extract(text)
+    return found
+
+
+def known_skills():
+    return get_matcher().skills
+
+
+# Indexing ---------------------------------------------------------------------
+
+def _replace_skills(model, lookup, skills, **extra):
+    """Make ``model``'s rows for ``lookup`` match ``skills``, touching only the difference."""
+    with transaction.atomic():
+        current = set(model.objects.filter(**lookup).values_list('skill', flat=True))
+        stale = current - skills
+        if stale:
+            model.objects.filter(skill__in=stale, **lookup).delete()
+        model.objects.bulk_create(
+            [model(skill=skill, **lookup, **extra) for skill in skills - current], ignore_conflicts=True
+        )
+
+
+def index_job_skills(job_id):
+    from apps.jobs.models import Job
+    from .models import JobSkill
+
+    job = Job.objects.filter(pk=job_id).values('title', 'requirements').first()
+    if job is not None:
+        _replace_skills(JobSkill, {'job_id': job_id}, extract_skills(job['title'], job['requirements']))
+
+
+def index_application_skills(application_id):
+    from apps.applicants.models import Application
+    from .models import ApplicationSkill
+
+    row = (Application.objects.filter(pk=application_id)
+           .values('job_id', 'cover_letter', 'resume_text__text').first())
+    if row is not None:
+        skills = extract_skills(row['cover_letter'], row['resume_text__text'])
+        _replace_skills(ApplicationSkill, {'application_id': application_id}, skills, job_id=row['job_id'])
+
+
+def worker_count():
+    return getattr(settings, 'SKILL_INDEX_WORKERS', 1)
+
+
+def _run(function, pk):
+    try:
+        function(pk)
+    except Exception:
+        logger.exception('Could not index skills with %s(%s)', function.__name__, pk)
+    finally:
+        connections.close_all()
+
+
+def schedule(function, pk):
+    """Run ``function(pk)`` on the skill indexing thread once the transaction commits."""
+    def submit():
+        global _executor
+        if worker_count() == 0:
+            # Inline mode, for development and tests.
+            function(pk)
+            return
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=worker_count(), thread_name_prefix='skill-index')
+        _executor.submit(_run, function, pk)
+
+    transaction.on_commit(submit)
+
+
+# Queries ----------------------------------------------------------------------
+
+def application_ids_with_skills(skills, job_id=None):
+    """
+    A subquery of the ids of applications having every one of ``skills``,
+    optionally only among the applicants of ``job_id``.
+    """
+    from .models import ApplicationSkill
+
+    skills = set(skills)
+    postings = ApplicationSkill.objects.filter(skill__in=skills)
+    if job_id is not None:
+        postings = postings.filter(job_id=job_id)
+    return (postings.values('application_id').annotate(matched=Count('skill'))
+            .filter(matched=len(skills)).values('application_id'))
+
+
+def job_ids_with_skills(skills):
+    """A subquery of the ids of jobs asking for every one of ``skills``."""
+    from .models import JobSkill
+
+    skills = set(skills)
+    return (JobSkill.objects.filter(skill__in=skills).values('job_id').annotate(matched=Count('skill'))
+            .filter(matched=len(skills)).values('job_id'))
+
+
+def skill_counts_for_job(job_id, limit=20):
+    """The most common skills among the applicants of ``job_id``, as ``(skill, count)`` pairs."""
+    from .models import ApplicationSkill
+
+    return list(
+        ApplicationSkill.objects.filter(job_id=job_id).values_list('skill')
+        .annotate(n=Count('application_id')).order_by('-n', 'skill')[:limit]
+    )
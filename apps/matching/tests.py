@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from apps.jobs.models import Employer, Job
+from apps.users.models import User
+from . import engine
+from .engine import VectorIndex, _rows_to_matrix, vectorize
+from .skills import DEFAULT_TAXONOMY, SkillMatcher
+
+
+@override_settings(SKILL_INDEX_WORKERS=0)
+class VectorIndexTests(TestCase):
+    def setUp(self):
+        employer = User.objects.create(username='employer', role='employer')
+        self.employer = Employer.objects.create(user=employer)
+        self.index = VectorIndex('matching.JobVector', 'job_id')
+
+    def make_job(self, title, description):
+        return Job.objects.create(
+            title=title, company_name='Acme', location='Dhaka', description=description, posted_by=self.employer,
+        )
+
+    def rank(self, text, limit=10):
+        query = _rows_to_matrix([vectorize(text)])
+        return [key for key, _ in self.index.top(query, limit=limit)[0]]
+
+    def test_rare_terms_outweigh_common_ones(self):
+        common = self.make_job('Python developer', 'Python python python')
+        rare = self.make_job('Platform engineer', 'Kubernetes operators')
+        for n in range(3):
+            self.make_job(f'Backend engineer {n}', 'Python services')
+        # By term frequency alone the Python-heavy posting would win.
+        self.assertEqual(self.rank('python kubernetes')[:2], [rare.pk, common.pk])
+
+    def test_small_index_is_merged(self):
+        self.make_job('Python developer', 'Python')
+        self.make_job('Go developer', 'Golang')
+        self.index.sync()
+        self.assertEqual(self.index.delta.shape[0], 0)
+        self.assertEqual(self.index.main.shape[0], 2)
+        self.make_job('Rust developer', 'Rust')
+        self.index.sync(force=True)
+        self.assertEqual(self.index.main.shape[0], 3)
+
+    def test_deletions_by_other_workers_are_forgotten(self):
+        kept = self.make_job('Python developer', 'Django')
+        deleted = self.make_job('Python engineer', 'Flask')
+        self.assertEqual(set(self.rank('python')), {kept.pk, deleted.pk})
+        # post_delete updates the module's index, not this one.
+        deleted.delete()
+        self.index.sync(force=True)
+        self.assertEqual(self.rank('python'), [kept.pk])
+
+    @mock.patch.object(engine, 'SMALL_INDEX_ROWS', 0)
+    def test_rows_added_after_a_merge_stay_in_the_delta(self):
+        python = self.make_job('Python developer', 'Django')
+        self.index.sync()
+        self.index._merge()
+        go = self.make_job('Go developer', 'Golang services')
+        rust = self.make_job('Rust developer', 'Rust services')
+        self.index.sync(force=True)
+        # The merged matrix is left alone until the next merge.
+        self.assertEqual((self.index.tf.shape[0], self.index.delta_tf.shape[0]), (1, 2))
+        self.assertEqual(self.rank('golang'), [go.pk])
+
+        # Delta rows can be scored by key, replaced and forgotten.
+        scores = self.index.top(_rows_to_matrix([vectorize('rust')]), keys=[rust.pk, python.pk])[0]
+        self.assertEqual([key for key, _ in scores], [rust.pk])
+        go.description = 'Kubernetes'
+        go.save()
+        self.index.sync(force=True)
+        self.assertEqual(self.rank('golang'), [])
+        self.assertEqual(self.rank('kubernetes'), [go.pk])
+        self.index.forget(rust.pk)
+        self.assertEqual(self.rank('services'), [])
+
+        self.index._merge()
+        self.assertEqual((self.index.tf.shape[0], self.index.delta_tf.shape[0]), (2, 0))
+        self.assertEqual(self.rank('kubernetes'), [go.pk])
+
+
+class SkillMatcherTests(TestCase):
+    matcher = SkillMatcher(DEFAULT_TAXONOMY)
+
+    def test_aliases_are_matched_as_words(self):
+        self.assertEqual(
+            self.matcher.extract('Built REST APIs with Django, Node.js and golang on k8s.'),
+            {'REST APIs', 'Django', 'Node.js', 'Go', 'Kubernetes'},
+        )
+
+    def test_ordinary_words_are_not_skills(self):
+        prose = ('Ready to go in the spring: a swift learner who will excel at testing ideas '
+                 'and reacting to feedback.')
+        self.assertEqual(self.matcher.extract(prose), set())
@@ -0,0 +1,36 @@
+"""
+Celery application for background work: interview answer evaluation,
+overall feedback and question generation (see ``ai_interviewer.tasks``).
+
+Configuration comes from the ``CELERY_*`` Django settings. Start a worker
+with ``celery -A job_portal worker -l info``; without ``CELERY_BROKER_URL``
+tasks run inline instead.
+"""
+import os
+
+from celery import Celery
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_portal.settings')
+
+app = Celery('job_portal')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
+
+
+@app.on_after_configure.connect
+def create_broker_folders(sender, **kwargs):
+    # The filesystem transport expects its folders to exist.
+    if str(sender.conf.broker_url).startswith('filesystem://'):
+        for folder in ('data_folder_in', 'data_folder_out', 'processed_folder', 'control_folder'):
+            path = sender.conf.broker_transport_options.get(folder)
+            if path:
+                os.makedirs(path, exist_ok=True)
+
+
+@receiver(setting_changed)
+def update_celery_setting(setting, value, **kwargs):
+    # Celery reads the settings once; this lets tests use override_settings.
+    if setting.startswith('CELERY_'):
+        app.conf[setting[len('CELERY_'):].lower()] = value
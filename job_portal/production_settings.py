@@ -73,13 +73,20 @@ LOGGING = {
     },
 }
 
-# Cache configuration (you can use Redis on Cloud Memorystore)
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+# Cache configuration (you can use Redis on Cloud Memorystore by setting REDIS_URL)
+if not os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'unique-snowflake',
+        },
+        'evaluations': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'evaluations',
+            'TIMEOUT': INTERVIEW_EVALUATION_CACHE_TIMEOUT,
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        },
     }
-}
 
 # Email configuration (you can use SendGrid or other services)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
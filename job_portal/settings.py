@@ -46,6 +46,7 @@ INSTALLED_APPS = [
     'apps.jobs',
     'apps.applicants',
     'apps.users',
+    'apps.matching',
 
     'ai_interviewer',
 ]
@@ -91,6 +92,41 @@ DATABASES = {
 }
 
 
+# Cache
+# Set REDIS_URL to share the cache (homepage feed, etc.) between workers.
+
+# 'evaluations' holds cached interview answer evaluations: TIMEOUT is their TTL
+# and, once full, the least recently used are evicted (for Redis, run it with
+# maxmemory-policy allkeys-lru).
+INTERVIEW_EVALUATION_CACHE_TIMEOUT = int(os.getenv('INTERVIEW_EVALUATION_CACHE_TIMEOUT', str(7 * 24 * 3600)))
+
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        },
+        'evaluations': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+            'KEY_PREFIX': 'evaluations',
+            'TIMEOUT': INTERVIEW_EVALUATION_CACHE_TIMEOUT,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'evaluations': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'evaluations',
+            'TIMEOUT': INTERVIEW_EVALUATION_CACHE_TIMEOUT,
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        },
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -135,6 +171,53 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Resumes are size-checked while the upload is read (see apps.applicants.storage).
+RESUME_MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+FILE_UPLOAD_HANDLERS = [
+    'apps.applicants.storage.ResumeUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Resumes are only served through apps.applicants.downloads, never from MEDIA_URL.
+# Set to 'nginx' (X-Accel-Redirect under RESUME_SENDFILE_ROOT, an internal
+# location aliased to MEDIA_ROOT) or 'apache'/'lighttpd' (X-Sendfile) to let the
+# front server send the bytes; empty streams them from Django.
+RESUME_SENDFILE = os.getenv('RESUME_SENDFILE', '')
+RESUME_SENDFILE_ROOT = os.getenv('RESUME_SENDFILE_ROOT', '/protected-media/')
+
+# Processes parsing uploaded resumes in the background; 0 parses inline.
+RESUME_EXTRACTION_WORKERS = int(os.getenv('RESUME_EXTRACTION_WORKERS', '2'))
+
+# Threads that index skills in the background; 0 indexes them inline.
+# SKILL_TAXONOMY = {'Django': ['django', 'drf'], ...} replaces the built-in taxonomy.
+SKILL_INDEX_WORKERS = int(os.getenv('SKILL_INDEX_WORKERS', '1'))
+
+# Celery runs the AI interviewer's LLM calls (answer evaluation, overall
+# feedback, question generation) off the web workers once CELERY_BROKER_URL
+# is set (e.g. to REDIS_URL, or filesystem:// for a single machine) and a
+# worker runs: `celery -A job_portal worker -l info`. Without a broker, tasks
+# run inline in the web process, as does CELERY_TASK_ALWAYS_EAGER=True.
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', '')
+if CELERY_BROKER_URL.startswith('filesystem://'):
+    CELERY_BROKER_TRANSPORT_OPTIONS = {
+        'data_folder_in': str(BASE_DIR / 'celery' / 'queue'),
+        'data_folder_out': str(BASE_DIR / 'celery' / 'queue'),
+        'processed_folder': str(BASE_DIR / 'celery' / 'processed'),
+        'control_folder': str(BASE_DIR / 'celery' / 'control'),
+        'store_processed': False,
+    }
+CELERY_TASK_ALWAYS_EAGER = not CELERY_BROKER_URL or os.getenv('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+# Tasks save their results in the database; nothing reads Celery results.
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TASK_ACKS_LATE = True
+CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+
+# Stream answer evaluations to the browser over Server-Sent Events instead of
+# queueing them. Each stream holds a web worker until the completion ends, so
+# only enable it with async (e.g. gevent) workers.
+INTERVIEW_STREAM_EVALUATION = os.getenv('INTERVIEW_STREAM_EVALUATION', 'False') == 'True'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -16,8 +16,6 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from django.conf import settings
-from django.conf.urls.static import static
 from .views import home
 
 urlpatterns = [
@@ -28,4 +26,4 @@ urlpatterns = [
     path('accounts/', include('django.contrib.auth.urls')),  # Django's built-in views second
     path('jobs/', include('apps.jobs.urls')),
     path('applicants/', include('apps.applicants.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
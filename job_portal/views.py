@@ -1,17 +1,12 @@
 from django.shortcuts import render
-from apps.jobs.models import Job
+from apps.jobs.feed import get_homepage_feed
 
 def home(request):
-    # Get featured jobs first, then fill with latest jobs if needed
-    featured_jobs = Job.objects.filter(is_featured=True).order_by('-posted_at')
-    latest_jobs = Job.objects.exclude(is_featured=True).order_by('-posted_at')
-    
-    # Combine featured and latest jobs, limit to 6 total
-    all_jobs = list(featured_jobs) + list(latest_jobs)
-    display_jobs = all_jobs[:6]
+    # Featured jobs first, topped up with the latest jobs; served from the cache
+    feed = get_homepage_feed()
     
     context = {
-        'latest_jobs': display_jobs,
-        'featured_count': featured_jobs.count()
+        'latest_jobs': feed['jobs'],
+        'featured_count': feed['featured_count']
     }
     return render(request, 'home.html', context)
\ No newline at end of file
@@ -14,3 +14,13 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_portal.settings')
 
 application = get_wsgi_application()
+
+
+# Build the in-memory typeahead index before the first request arrives.
+from django.db import DatabaseError
+from apps.jobs.autocomplete import autocomplete_index
+
+try:
+    autocomplete_index.warm()
+except DatabaseError:
+    pass  # e.g. before the first migrate; the index is built on first use instead
@@ -0,0 +1,11 @@
+#!/bin/sh
+# Container entry point: gunicorn, plus a Celery worker for the AI
+# interviewer's background tasks when a broker is configured. Without
+# CELERY_BROKER_URL those tasks run inline in gunicorn instead.
+set -e
+
+if [ -n "$CELERY_BROKER_URL" ]; then
+    celery -A job_portal worker -l info --concurrency "${CELERY_WORKER_CONCURRENCY:-2}" &
+fi
+
+exec gunicorn --bind 0.0.0.0:8080 --workers 3 job_portal.wsgi:application